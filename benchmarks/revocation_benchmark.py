@@ -0,0 +1,90 @@
+"""Compara la comprobación de revocación basada en consultas a la sesión con el filtro de Bloom local.
+
+Uso: python -m benchmarks.revocation_benchmark [--tokens N] [--revoked N] [--latency-ms MS]
+
+La latencia de MongoDB se simula con una espera por consulta, de modo que el benchmark no necesita base de datos.
+"""
+
+import argparse
+import time
+import uuid
+from unittest.mock import patch
+
+from bson import ObjectId
+
+from src.models.session_model import SessionModel
+from src.services import security_service
+from src.services.revocation_service import RevocationFilter
+
+
+def build_tokens(total: int) -> tuple[list[dict], dict]:
+    payloads, sessions = [], {}
+    for _ in range(total):
+        session_id, jti = str(ObjectId()), str(uuid.uuid4())
+        payloads.append({"sid": session_id, "jti": jti, "type": "access"})
+        sessions[session_id] = {"_id": session_id, "access_jti": jti}
+    return payloads, sessions
+
+
+def run(payloads: list[dict], sessions: dict, latency: float, use_filter: bool):
+    queries = 0
+
+    def get_session(session_id):
+        nonlocal queries
+        queries += 1
+        time.sleep(latency)
+        return sessions.get(session_id)
+
+    revocation_filter = RevocationFilter(sync_seconds=3600, rebuild_seconds=3600)
+    with patch.object(
+        SessionModel, "get_session", side_effect=get_session
+    ), patch.object(
+        SessionModel, "get_revoked_sessions", return_value=[]
+    ), patch.object(
+        security_service, "config", "config.Config"
+    ), patch.object(
+        security_service, "revocation_filter", revocation_filter
+    ):
+        revocation_filter.sync(rebuild=True)
+        for session_id, session in sessions.items():
+            if session.get("revoked"):
+                revocation_filter.add_session(session)
+        if not use_filter:
+            revocation_filter.might_be_revoked = lambda jti: True
+        security_service.sessions_cache.clear()
+        started = time.perf_counter()
+        revoked = sum(
+            security_service.check_if_token_active_callback({}, payload)
+            for payload in payloads
+        )
+        elapsed = time.perf_counter() - started
+    return elapsed, queries, revoked, revocation_filter.get_metrics()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=5000)
+    parser.add_argument("--revoked", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    payloads, sessions = build_tokens(args.tokens)
+    for session_id in list(sessions)[: args.revoked]:
+        sessions[session_id] = {**sessions[session_id], "revoked": True}
+
+    for name, use_filter in (("consulta de sesión", False), ("filtro de Bloom", True)):
+        elapsed, queries, revoked, metrics = run(
+            payloads, sessions, args.latency_ms / 1000, use_filter
+        )
+        print(
+            f"{name}: {elapsed / len(payloads) * 1e6:.1f} µs/token, "
+            f"{queries} consultas, {revoked} revocados"
+        )
+    print(
+        f"Falsos positivos observados: {metrics['false_positives']} "
+        f"(estimado {metrics['estimated_false_positive_rate']:.2e})"
+    )
+
+
+if __name__ == "__main__":
+    main()
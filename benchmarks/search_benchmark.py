@@ -0,0 +1,67 @@
+"""Mide el tiempo por búsqueda del índice de prefijos de "search_service" sobre un catálogo sintético.
+
+Uso: python -m benchmarks.search_benchmark [--items N] [--queries N]
+
+El catálogo se genera en memoria, de modo que el benchmark no necesita base de datos.
+"""
+
+import argparse
+import random
+import time
+
+from src.services.search_service import SearchIndex
+
+WORDS = [
+    "jamón",
+    "ibérico",
+    "croquetas",
+    "tarta",
+    "queso",
+    "ensalada",
+    "piña",
+    "cebolla",
+    "atún",
+    "salmón",
+    "café",
+    "limón",
+    "pan",
+    "tomate",
+    "huevo",
+]
+
+
+def build_catalog(total: int) -> list[dict]:
+    return [
+        {"_id": str(i), "name": " ".join(random.sample(WORDS, 3)) + f" {i}"}
+        for i in range(total)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=10000)
+    args = parser.parse_args()
+
+    catalog = build_catalog(args.items)
+    search_index = SearchIndex("benchmark", lambda: catalog)
+
+    started = time.perf_counter()
+    search_index.search("jamon")
+    print(f"Construcción del índice: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    queries = [
+        " ".join(
+            word[: random.randint(2, len(word))] for word in random.sample(WORDS, 2)
+        )
+        for _ in range(args.queries)
+    ]
+    started = time.perf_counter()
+    for query in queries:
+        search_index.search(query)
+    elapsed = time.perf_counter() - started
+    print(f"Búsqueda: {elapsed / len(queries) * 1e6:.1f} µs/consulta")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,53 @@ from dotenv import load_dotenv
 DATABASE_URI = os.getenv("MONGO_DB_URI")
 GOOGLE_CLIENT_ID = os.getenv("CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("CLIENT_SECRET")
+GOOGLE_METADATA_URL = "https://accounts.google.com/.well-known/openid-configuration"
 SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
 DEFAULT_SENDER_EMAIL = os.getenv("DEFAULT_SENDER_EMAIL")
 PORT = int(os.getenv("PORT", 5000))
+REVOCATION_SYNC_SECONDS = int(os.getenv("REVOCATION_SYNC_SECONDS", 30))
+REVOCATION_REBUILD_SECONDS = int(os.getenv("REVOCATION_REBUILD_SECONDS", 3600))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+TRUST_FLY_CLIENT_IP = os.getenv("TRUST_FLY_CLIENT_IP", "false").lower() == "true"
+
+
+# Límite de solicitudes de una ruta con el formato "<solicitudes>/<segundos>"
+def get_rate_limit(name: str, default: str) -> tuple[int, int]:
+    capacity, per_seconds = os.getenv(name, default).split("/")
+    return int(capacity), int(per_seconds)
+
+
+RATE_LIMIT_REGISTER_IP = get_rate_limit("RATE_LIMIT_REGISTER_IP", "10/3600")
+RATE_LIMIT_LOGIN_IP = get_rate_limit("RATE_LIMIT_LOGIN_IP", "20/60")
+RATE_LIMIT_LOGIN_FAILURES = get_rate_limit("RATE_LIMIT_LOGIN_FAILURES", "5/300")
+RATE_LIMIT_GOOGLE_IP = get_rate_limit("RATE_LIMIT_GOOGLE_IP", "20/60")
+RATE_LIMIT_RESEND_EMAIL_IP = get_rate_limit("RATE_LIMIT_RESEND_EMAIL_IP", "10/3600")
+RATE_LIMIT_RESEND_EMAIL_ACCOUNT = get_rate_limit(
+    "RATE_LIMIT_RESEND_EMAIL_ACCOUNT", "5/86400"
+)
+RATE_LIMIT_ADD_ORDER_ACCOUNT = get_rate_limit("RATE_LIMIT_ADD_ORDER_ACCOUNT", "10/600")
+ENSURE_INDEXES = os.getenv("ENSURE_INDEXES", "false").lower() == "true"
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() == "true"
+SCHEDULER_TICK_SECONDS = int(os.getenv("SCHEDULER_TICK_SECONDS", 30))
+MENU_CACHE_SECONDS = int(os.getenv("MENU_CACHE_SECONDS", 60))
+OPENING_HOURS_CACHE_SECONDS = int(os.getenv("OPENING_HOURS_CACHE_SECONDS", 60))
+ORDER_ARCHIVE_DAYS = int(os.getenv("ORDER_ARCHIVE_DAYS", 90))
+ORDER_ARCHIVE_BATCH_SIZE = int(os.getenv("ORDER_ARCHIVE_BATCH_SIZE", 500))
+ORDER_ARCHIVE_BATCH_PAUSE = float(os.getenv("ORDER_ARCHIVE_BATCH_PAUSE", 0.5))
+ORDER_ARCHIVE_MAX_BATCHES = int(os.getenv("ORDER_ARCHIVE_MAX_BATCHES", 50))
+MENU_SNAPSHOT_DIR = os.getenv(
+    "MENU_SNAPSHOT_DIR", os.path.join(os.path.dirname(__file__), "src", "static")
+)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_CACHE_SIZE = int(os.getenv("COMPRESSION_CACHE_SIZE", 256))
+GOOGLE_OIDC_DEFAULT_TTL = int(os.getenv("GOOGLE_OIDC_DEFAULT_TTL", 3600))
+EMAIL_DELIVERABILITY_MODE = os.getenv("EMAIL_DELIVERABILITY_MODE", "dns")
+EMAIL_DELIVERABILITY_TTL = int(os.getenv("EMAIL_DELIVERABILITY_TTL", 86400))
+EMAIL_DELIVERABILITY_NEGATIVE_TTL = int(
+    os.getenv("EMAIL_DELIVERABILITY_NEGATIVE_TTL", 3600)
+)
+EMAIL_DNS_TIMEOUT = float(os.getenv("EMAIL_DNS_TIMEOUT", 2))
+QUERY_PLAN_CHECK = os.getenv("QUERY_PLAN_CHECK", "false").lower() == "true"
 
 
 class Config:
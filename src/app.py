@@ -1,18 +1,35 @@
 from flask import Flask, jsonify
+from pymongo.errors import PyMongoError
+
+from config import ENSURE_INDEXES, SCHEDULER_ENABLED
 
 from src.routes.auth_route import auth_route
 from src.routes.email_tokens_route import email_tokens_route
 from src.routes.products_route import products_route
-from src.routes.refresh_tokens_route import refresh_tokens_route
-from src.routes.active_tokens_route import active_tokens_route
+from src.routes.sessions_route import sessions_route
 from src.routes.settings_route import settings_route
 from src.routes.users_route import users_route
 from src.routes.orders_route import orders_route
 from src.routes.dishes_route import dishes_route
+from src.routes.metrics_route import metrics_route
+from src.routes.reports_route import reports_route
+from src.routes.inventory_route import inventory_route
+from src.services.archive_service import archive_orders_command
+from src.services.bar_service import get_bar_status
+from src.services.compression_service import compress_response
+from src.services.menu_snapshot_service import send_menu_snapshot
+from src.services.index_service import ensure_indexes, ensure_indexes_command
+from src.services.inventory_service import (
+    replay_inventory_command,
+    seed_inventory_command,
+)
+from src.services.oidc_service import prewarm_google_oidc
+from src.services.scheduler_service import scheduler
 from src.services.security_service import jwt, oauth, bcrypt
 from src.utils.exception_handlers import register_global_exception_handlers
 
 app = Flask(__name__, static_url_path="")
+app.after_request(compress_response)
 
 
 @app.route("/")
@@ -20,6 +37,18 @@ def welcome():
     return "Bienvenidx a la API REST de La Favorita Bar"
 
 
+# Carta completa pregenerada en disco. Se regenera con cada cambio en platos.
+@app.route("/menu.json")
+def menu_snapshot():
+    return send_menu_snapshot()
+
+
+# Estado del bar para el frontend: sólo compara la hora actual con el próximo cambio ya calculado
+@app.route("/status")
+def bar_status():
+    return jsonify(get_bar_status()), 200
+
+
 def run_app(config):
     app.url_map.strict_slashes = False
     app.config.from_object(config)
@@ -32,12 +61,29 @@ def run_app(config):
     app.register_blueprint(products_route, url_prefix="/products")
     app.register_blueprint(settings_route, url_prefix="/settings")
     app.register_blueprint(auth_route, url_prefix="/auth")
-    app.register_blueprint(active_tokens_route, url_prefix="/active-tokens")
-    app.register_blueprint(refresh_tokens_route, url_prefix="/refresh-tokens")
+    app.register_blueprint(sessions_route, url_prefix="/sessions")
     app.register_blueprint(email_tokens_route, url_prefix="/email-tokens")
     app.register_blueprint(orders_route, url_prefix="/orders")
     app.register_blueprint(dishes_route, url_prefix="/dishes")
+    app.register_blueprint(metrics_route, url_prefix="/metrics")
+    app.register_blueprint(reports_route, url_prefix="/reports")
+    app.register_blueprint(inventory_route, url_prefix="/inventory")
 
     register_global_exception_handlers(app)
+    app.cli.add_command(ensure_indexes_command)
+    app.cli.add_command(replay_inventory_command)
+    app.cli.add_command(seed_inventory_command)
+    app.cli.add_command(archive_orders_command)
+
+    prewarm_google_oidc()
+
+    if SCHEDULER_ENABLED:
+        scheduler.start()
+
+    if ENSURE_INDEXES:
+        try:
+            ensure_indexes()
+        except PyMongoError as e:
+            app.logger.warning(f"No se han podido aplicar los índices: {e}")
 
     return app
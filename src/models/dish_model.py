@@ -1,22 +1,32 @@
 from pydantic import BaseModel, Field, model_validator
-from typing import List, Literal, Union, Dict
-from pymongo.results import InsertOneResult, DeleteResult
-from pymongo import ReturnDocument
+from typing import ClassVar, List, Literal, Optional, Union, Dict
+from pymongo.results import InsertOneResult, DeleteResult, UpdateResult
+from pymongo import IndexModel, ReturnDocument
 from bson import ObjectId
 from datetime import datetime
 
-from src.utils.models_helpers import Ingredient, to_json_serializable
+from src.utils.models_helpers import (
+    Ingredient,
+    get_fields_projection,
+    to_json_serializable,
+)
 from src.services.db_service import db
 
 
-# Campos únicos: "name". Está configurado en MongoDB Atlas.
-# Índices: "category", "ingredients.name". Está configurado en MongoDB Atlas.
 class DishModel(BaseModel, extra="forbid"):
+    INDEXES: ClassVar[List[IndexModel]] = [
+        IndexModel("name", unique=True),
+        IndexModel("category"),
+        IndexModel("ingredients.name"),
+    ]
+
     name: str = Field(..., min_length=1, max_length=100)
     category: Literal["starter", "main", "dessert"] = Field(...)
     description: str = Field(..., min_length=1, max_length=200)
     ingredients: List[Ingredient] = Field(..., min_length=1)
     custom: Union[Dict[str, bool], None] = None
+    # Alérgenos de todos los ingredientes, calculados en "validate_model"
+    allergens: List[str] = Field(default_factory=list)
     price: float = Field(..., gt=0)
     available: bool = Field(default=True)
     created_at: datetime = Field(default_factory=datetime.now)
@@ -45,6 +55,13 @@ class DishModel(BaseModel, extra="forbid"):
                     product["waste"] = ingredient["waste"]
 
         self.ingredients = checked_ingredients
+        self.allergens = sorted(
+            {
+                allergen
+                for product in checked_ingredients
+                for allergen in product.get("allergens") or []
+            }
+        )
 
         if not self.custom:
             self.custom = {ingredient: True for ingredient in ingredients_names}
@@ -57,18 +74,31 @@ class DishModel(BaseModel, extra="forbid"):
         return new_dish
 
     @staticmethod
-    def get_dishes(skip: int, per_page: int) -> List[dict]:
-        dishes = db.dishes.find().skip(skip).limit(per_page)
+    def get_dishes(
+        skip: int, per_page: int, fields: Optional[str] = None
+    ) -> List[dict]:
+        projection = get_fields_projection(fields, DISH_FIELDS)
+        dishes = db.dishes.find({}, projection).skip(skip).limit(per_page)
+        return to_json_serializable(dishes)
+
+    # Carta completa para el índice en memoria de "menu_service"
+    @staticmethod
+    def get_menu() -> List[dict]:
+        dishes = db.dishes.find()
         return to_json_serializable(dishes)
 
     @staticmethod
-    def get_dishes_by_category(category: str) -> List[dict]:
-        dishes_by_category = db.dishes.find({"category": category})
+    def get_dishes_by_category(
+        category: str, fields: Optional[str] = None
+    ) -> List[dict]:
+        projection = get_fields_projection(fields, DISH_FIELDS)
+        dishes_by_category = db.dishes.find({"category": category}, projection)
         return to_json_serializable(dishes_by_category)
 
     @staticmethod
-    def get_dish(dish_id: str) -> dict:
-        dish = db.dishes.find_one({"_id": ObjectId(dish_id)}, {"_id": 0})
+    def get_dish(dish_id: str, fields: Optional[str] = None) -> dict:
+        projection = get_fields_projection(fields, DISH_FIELDS, {})
+        dish = db.dishes.find_one({"_id": ObjectId(dish_id)}, {"_id": 0, **projection})
         return to_json_serializable(dish)
 
     def update_dish(self, dish_id: str) -> dict:
@@ -88,7 +118,67 @@ class DishModel(BaseModel, extra="forbid"):
         )
         return to_json_serializable(updated_dishes)
 
+    # Actualiza los alérgenos de un ingrediente en los platos que lo contienen y recalcula los alérgenos de cada plato
+    @staticmethod
+    def update_dishes_allergens(
+        ingredient: str, allergens: Optional[List[str]], session=None
+    ) -> UpdateResult:
+        updated_dishes = db.dishes.update_many(
+            {"ingredients.name": ingredient},
+            [
+                {
+                    "$set": {
+                        "ingredients": {
+                            "$map": {
+                                "input": "$ingredients",
+                                "as": "ingredient",
+                                "in": {
+                                    "$cond": [
+                                        {"$eq": ["$$ingredient.name", ingredient]},
+                                        {
+                                            "$mergeObjects": [
+                                                "$$ingredient",
+                                                {"allergens": {"$literal": allergens}},
+                                            ]
+                                        },
+                                        "$$ingredient",
+                                    ]
+                                },
+                            }
+                        }
+                    }
+                },
+                {
+                    "$set": {
+                        "allergens": {
+                            "$sortArray": {
+                                "input": {
+                                    "$reduce": {
+                                        "input": "$ingredients",
+                                        "initialValue": [],
+                                        "in": {
+                                            "$setUnion": [
+                                                "$$value",
+                                                {"$ifNull": ["$$this.allergens", []]},
+                                            ]
+                                        },
+                                    }
+                                },
+                                "sortBy": 1,
+                            }
+                        }
+                    }
+                },
+            ],
+            session=session,
+        )
+        return updated_dishes
+
     @staticmethod
     def delete_dish(dish_id: str) -> DeleteResult:
         deleted_dish = db.dishes.delete_one({"_id": ObjectId(dish_id)})
         return deleted_dish
+
+
+# Campos que se pueden pedir con "fields"
+DISH_FIELDS = set(DishModel.model_fields)
@@ -0,0 +1,122 @@
+from datetime import datetime
+from typing import ClassVar, List, Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from src.services.db_service import db
+from src.utils.models_helpers import to_json_serializable
+
+
+# Registro de solo inserción de los movimientos de stock: consumo de pedidos ("order"), recuentos y correcciones
+# ("adjustment") y entregas de proveedores ("delivery"). "qty" es la variación, negativa si resta stock. El stock
+# actual sigue guardado en cada producto; el registro sirve para consultar el historial y reconstruirlo.
+# Los movimientos se agrupan por "product_id", así renombrar un producto no separa su historial; "product" guarda el
+# nombre que tenía al registrar el movimiento, sólo para mostrarlo.
+# Cada producto empieza con un movimiento "opening": al crearlo o, para los anteriores al registro, con
+# "seed-inventory". Es el único que puede valer 0.
+class InventoryMovementModel(BaseModel, extra="forbid"):
+    INDEXES: ClassVar[List[IndexModel]] = [
+        IndexModel([("product_id", ASCENDING), ("created_at", ASCENDING)]),
+        IndexModel("created_at"),
+    ]
+
+    product_id: str = Field(..., pattern=r"^[a-f0-9]{24}$")
+    product: str = Field(..., min_length=1, max_length=50)
+    qty: float = Field(...)
+    reason: Literal["opening", "order", "adjustment", "delivery"] = Field(...)
+    order_id: Optional[str] = Field(None, pattern=r"^[a-f0-9]{24}$")
+    user_id: Optional[str] = Field(None, pattern=r"^[a-f0-9]{24}$")
+    notes: Optional[str] = Field(None, min_length=1, max_length=500)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+    @model_validator(mode="after")
+    def validate_model(self) -> "InventoryMovementModel":
+        if self.qty == 0 and self.reason != "opening":
+            raise ValueError("El campo 'qty' debe ser distinto de 0")
+        return self
+
+    # Solicitudes a la colección "inventory_movements"
+    @staticmethod
+    def insert_movements(
+        movements: List["InventoryMovementModel"], session=None
+    ) -> None:
+        if movements:
+            db.inventory_movements.insert_many(
+                [movement.model_dump(exclude_none=True) for movement in movements],
+                ordered=False,
+                session=session,
+            )
+
+    @staticmethod
+    def get_movements(
+        start: datetime,
+        end: datetime,
+        skip: int,
+        per_page: int,
+        product_id: Optional[str] = None,
+    ) -> List[dict]:
+        query = {"created_at": {"$gte": start, "$lt": end}}
+        if product_id:
+            query["product_id"] = product_id
+        movements = (
+            db.inventory_movements.find(query)
+            .sort("created_at", ASCENDING)
+            .skip(skip)
+            .limit(per_page)
+        )
+        return to_json_serializable(movements)
+
+    # Productos con movimiento de apertura: sólo de estos se puede reconstruir el stock completo
+    @staticmethod
+    def get_opened_products() -> set[str]:
+        return set(db.inventory_movements.distinct("product_id", {"reason": "opening"}))
+
+    # Suma de los movimientos de cada producto en el intervalo ("since", "until"], por "product_id"
+    @staticmethod
+    def get_totals(
+        since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> dict[str, float]:
+        created_at = {}
+        if since:
+            created_at["$gt"] = since
+        if until:
+            created_at["$lte"] = until
+        totals = db.inventory_movements.aggregate(
+            [
+                {"$match": {"created_at": created_at} if created_at else {}},
+                {"$group": {"_id": "$product_id", "qty": {"$sum": "$qty"}}},
+            ]
+        )
+        return {total["_id"]: total["qty"] for total in totals}
+
+
+# Instantáneas del registro: el stock de cada producto (por "product_id") acumulado hasta "until". Una reconstrucción parte de la última
+# instantánea y sólo suma los movimientos posteriores.
+class InventorySnapshotModel:
+    INDEXES = [IndexModel([("until", DESCENDING)])]
+
+    @staticmethod
+    def insert_snapshot(until: datetime, stocks: dict[str, float]) -> None:
+        db.inventory_snapshots.insert_one(
+            {
+                "until": until,
+                "stocks": [
+                    {"product_id": product_id, "stock": stock}
+                    for product_id, stock in sorted(stocks.items())
+                ],
+                "created_at": datetime.now(),
+            }
+        )
+
+    @staticmethod
+    def get_latest_snapshot() -> Optional[dict]:
+        snapshot = db.inventory_snapshots.find_one({}, sort=[("until", DESCENDING)])
+        if not snapshot:
+            return None
+        return {
+            "until": snapshot["until"],
+            "stocks": {
+                item["product_id"]: item["stock"] for item in snapshot["stocks"]
+            },
+        }
@@ -1,16 +1,59 @@
 from pydantic import BaseModel, Field, model_validator
-from typing import List, Literal, Optional
+from typing import ClassVar, List, Literal, Optional
 from pymongo.results import InsertOneResult, DeleteResult
-from pymongo import ReturnDocument
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReplaceOne, ReturnDocument
 from bson import ObjectId
 from datetime import datetime
 
 from src.services.db_service import db
-from src.utils.models_helpers import Address, ItemOrder, to_json_serializable
+from src.utils.models_helpers import (
+    Address,
+    ItemOrder,
+    StateEvent,
+    get_delivery_zone,
+    get_fields_projection,
+    to_json_serializable,
+)
+
+
+# Proyección por defecto del historial de pedidos de un usuario
+ORDER_SUMMARY_PROJECTION = {"created_at": 1, "total_price": 1, "state": 1}
+# Proyección por defecto del listado de pedidos: sin los ingredientes de cada artículo
+ORDER_LIST_PROJECTION = {"items.ingredients": 0, "timeline": 0}
+# Estados finales: sólo estos pedidos se mueven a "orders_archive"
+ARCHIVE_STATES = ("delivered", "canceled")
+
+
+# Esquema reducido de un pedido archivado: sin ingredientes de los artículos y de la dirección sólo la zona
+def to_archived_order(order: dict) -> dict:
+    archived_order = {
+        key: value for key, value in order.items() if key not in ("items", "address")
+    }
+    archived_order["items"] = [
+        {key: value for key, value in item.items() if key != "ingredients"}
+        for item in order["items"]
+    ]
+    if order.get("address"):
+        archived_order["zone"] = order["address"].get("zone")
+    archived_order["archived_at"] = datetime.now()
+    return archived_order
 
 
-# Índices: "user_id". Está configurado en MongoDB Atlas.
 class OrderModel(BaseModel, extra="forbid"):
+    # El índice compuesto sirve tanto para filtrar por "user_id" como para el historial ordenado por fecha e id
+    INDEXES: ClassVar[List[IndexModel]] = [
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]
+        ),
+        IndexModel([("state", ASCENDING), ("created_at", ASCENDING)]),
+    ]
+    # Índices de "orders_archive": historial de cada usuario
+    ARCHIVE_INDEXES: ClassVar[List[IndexModel]] = [
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]
+        )
+    ]
+
     user_id: str = Field(..., pattern=r"^[a-f0-9]{24}$")
     items: List[ItemOrder] = Field(..., min_length=1)
     type_order: Literal["delivery", "local", "take_away"] = Field(...)
@@ -21,6 +64,8 @@ class OrderModel(BaseModel, extra="forbid"):
         "pending", "accepted", "cooking", "canceled", "ready", "sent", "delivered"
     ] = Field(default="pending")
     created_at: datetime = Field(default_factory=datetime.now)
+    # Un evento por cada cambio de estado, empezando por el estado inicial. Sólo se amplía con "$push" al actualizar.
+    timeline: List[StateEvent] = Field(default_factory=list)
 
     @model_validator(mode="after")
     def validate_model(self) -> "OrderModel":
@@ -28,6 +73,8 @@ class OrderModel(BaseModel, extra="forbid"):
             raise ValueError(
                 "Cuando el campo 'type_order' tiene el valor 'delivery' el campo 'address' debe tener un valor de tipo diccionario"
             )
+        if self.address:
+            self.address["zone"] = get_delivery_zone(self.address["postal_code"])
         if self.type_order == "local" and self.state == "pending":
             self.state = "accepted"
         for item in self.items:
@@ -40,6 +87,8 @@ class OrderModel(BaseModel, extra="forbid"):
                     }
                 else:
                     item["custom"] = None
+        if not self.timeline:
+            self.timeline = [{"state": self.state, "at": self.created_at}]
         return self
 
     @staticmethod
@@ -58,35 +107,165 @@ class OrderModel(BaseModel, extra="forbid"):
             )
 
     # Solicitudes a la colección "order"
-    def insert_order(self) -> InsertOneResult:
-        new_order = db.orders.insert_one(self.model_dump())
+    def insert_order(self, session=None) -> InsertOneResult:
+        new_order = db.orders.insert_one(self.model_dump(), session=session)
         return new_order
 
     @staticmethod
-    def get_orders(skip: int, per_page: int) -> List[dict]:
-        orders = db.orders.find().skip(skip).limit(per_page)
+    def get_orders(
+        skip: int,
+        per_page: int,
+        fields: Optional[str] = None,
+        archived: bool = False,
+    ) -> List[dict]:
+        projection = get_fields_projection(fields, ORDER_FIELDS, ORDER_LIST_PROJECTION)
+        collection = db.orders_archive if archived else db.orders
+        orders = collection.find({}, projection).skip(skip).limit(per_page)
         return to_json_serializable(orders)
 
+    # Historial de pedidos del más reciente al más antiguo, paginado por cursor: "before" y "before_id" son la fecha y el
+    # id del último pedido de la página anterior. Varios pedidos pueden tener la misma fecha (por ejemplo, creados por un
+    # administrador), así que se ordena por ("created_at", "_id") y el cursor compara ambos campos.
     @staticmethod
-    def get_orders_by_user_id(user_id: str, skip: int, per_page: int) -> List[dict]:
-        user_orders = db.orders.find({"user_id": user_id}).skip(skip).limit(per_page)
-        return to_json_serializable(user_orders)
+    def get_orders_by_user_id(
+        user_id: str,
+        per_page: int,
+        before: Optional[datetime] = None,
+        detail: bool = False,
+        before_id: Optional[str] = None,
+    ) -> List[dict]:
+        query = {"user_id": user_id}
+        if before and before_id:
+            query["$or"] = [
+                {"created_at": {"$lt": before}},
+                {"created_at": before, "_id": {"$lt": ObjectId(before_id)}},
+            ]
+        elif before:
+            query["created_at"] = {"$lt": before}
+        # La página se completa con los pedidos archivados: se piden "per_page" de cada colección y se mezclan por fecha
+        user_orders = [
+            order
+            for collection in (db.orders, db.orders_archive)
+            for order in collection.find(
+                query, None if detail else ORDER_SUMMARY_PROJECTION
+            )
+            .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+            .limit(per_page)
+        ]
+        user_orders.sort(
+            key=lambda order: (order["created_at"], order["_id"]), reverse=True
+        )
+        return to_json_serializable(user_orders[:per_page])
+
+    # Con "user_id" sólo se devuelven los pedidos de ese usuario; el resto se tratan como no encontrados
+    @staticmethod
+    def get_orders_by_ids(
+        order_ids: List[str],
+        fields: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[dict]:
+        projection = get_fields_projection(fields, ORDER_FIELDS, ORDER_LIST_PROJECTION)
+        query = {"_id": {"$in": [ObjectId(order_id) for order_id in order_ids]}}
+        if user_id:
+            query["user_id"] = user_id
+        orders = list(db.orders.find(query, projection))
+        if len(orders) < len(order_ids):
+            found = {order["_id"] for order in orders}
+            query["_id"] = {
+                "$in": [
+                    ObjectId(order_id)
+                    for order_id in order_ids
+                    if ObjectId(order_id) not in found
+                ]
+            }
+            orders.extend(db.orders_archive.find(query, projection))
+        return to_json_serializable(orders)
 
+    # Con "fields" se incluye siempre "user_id", necesario para comprobar el acceso al pedido. Con "include_archive" se
+    # busca también en "orders_archive" (sólo lectura: los pedidos archivados no se modifican).
     @staticmethod
-    def get_order(order_id: str) -> dict:
-        order = db.orders.find_one({"_id": ObjectId(order_id)}, {"_id": 0})
+    def get_order(
+        order_id: str, fields: Optional[str] = None, include_archive: bool = False
+    ) -> dict:
+        projection = get_fields_projection(fields, ORDER_FIELDS)
+        query = {"_id": ObjectId(order_id)}
+        projection = (
+            {"_id": 0, **projection, "user_id": 1} if projection else {"_id": 0}
+        )
+        order = db.orders.find_one(query, projection)
+        if not order and include_archive:
+            order = db.orders_archive.find_one(query, projection)
         return to_json_serializable(order)
 
-    def update_order(self, order_id: str, session=None) -> dict:
+    # Con "expected_state" sólo se actualiza si el pedido sigue en ese estado, para no aplicar dos veces una transición.
+    # "event" se añade al final de "timeline" cuando cambia el estado.
+    def update_order(
+        self,
+        order_id: str,
+        session=None,
+        expected_state: Optional[str] = None,
+        event: Optional[StateEvent] = None,
+    ) -> dict:
+        query = {"_id": ObjectId(order_id)}
+        if expected_state:
+            query["state"] = expected_state
+        update = {"$set": self.model_dump(exclude={"timeline"})}
+        if event:
+            update["$push"] = {"timeline": event}
         updated_order = db.orders.find_one_and_update(
-            {"_id": ObjectId(order_id)},
-            {"$set": self.model_dump()},
+            query,
+            update,
             return_document=ReturnDocument.AFTER,
             session=session,
         )
         return to_json_serializable(updated_order)
 
+    # Con "expected_state" sólo se borra si el pedido sigue en ese estado, y nunca del archivo
     @staticmethod
-    def delete_order(order_id: str) -> DeleteResult:
-        deleted_order = db.orders.delete_one({"_id": ObjectId(order_id)})
+    def delete_order(
+        order_id: str, session=None, expected_state: Optional[str] = None
+    ) -> DeleteResult:
+        query = {"_id": ObjectId(order_id)}
+        if expected_state:
+            query["state"] = expected_state
+        deleted_order = db.orders.delete_one(query, session=session)
+        if not deleted_order.deleted_count and not expected_state:
+            deleted_order = db.orders_archive.delete_one({"_id": ObjectId(order_id)})
         return deleted_order
+
+    # Siguiente lote de pedidos finalizados antes de "before", del más antiguo al más reciente (índice de estado y fecha)
+    @staticmethod
+    def get_archivable_orders(before: datetime, limit: int) -> List[dict]:
+        orders = (
+            db.orders.find(
+                {"state": {"$in": ARCHIVE_STATES}, "created_at": {"$lt": before}}
+            )
+            .sort("created_at", ASCENDING)
+            .limit(limit)
+        )
+        return list(orders)
+
+    # Copia el lote al archivo y después lo borra de "orders". La copia reemplaza por "_id", así que repetir un lote
+    # interrumpido entre los dos pasos no duplica pedidos.
+    @staticmethod
+    def archive_orders(orders: List[dict]) -> int:
+        if not orders:
+            return 0
+        db.orders_archive.bulk_write(
+            [
+                ReplaceOne({"_id": order["_id"]}, to_archived_order(order), upsert=True)
+                for order in orders
+            ],
+            ordered=False,
+        )
+        deleted_orders = db.orders.delete_many(
+            {
+                "_id": {"$in": [order["_id"] for order in orders]},
+                "state": {"$in": ARCHIVE_STATES},
+            }
+        )
+        return deleted_orders.deleted_count
+
+
+# Campos que se pueden pedir con "fields"
+ORDER_FIELDS = set(OrderModel.model_fields)
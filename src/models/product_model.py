@@ -1,12 +1,13 @@
-from typing import List, Optional
+from typing import ClassVar, List, Optional
 from bson import ObjectId
 from pydantic import BaseModel, Field, field_validator, ValidationInfo
-from pymongo import ReturnDocument
+from pymongo import IndexModel, ReturnDocument, UpdateOne
 from pymongo.results import InsertOneResult, DeleteResult
 from datetime import datetime
 
 from src.services.db_service import db
-from src.utils.models_helpers import to_json_serializable
+from src.utils.exception_handlers import ValueCustomError
+from src.utils.models_helpers import get_fields_projection, to_json_serializable
 
 
 # Funciones para obtener y actualizar los valores permitidos para categorías y alérgenos de productos
@@ -15,12 +16,35 @@ def get_allowed_values(name: str) -> list[str]:
     return settings_request.get("value") if settings_request else []
 
 
-# Campos únicos: "name". Está configurado en MongoDB Atlas.
-# Índices: "categories". Está configurado en MongoDB Atlas.
+# Cantidad total de cada ingrediente que consume un pedido
+def get_order_ingredients(items_order: list) -> dict[str, float]:
+    ingredients = {}
+    for dish in items_order:
+        for ingredient in dish.get("ingredients"):
+            name = ingredient.get("name")
+            ingredients[name] = ingredients.get(name, 0) + ingredient.get(
+                "waste"
+            ) * dish.get("qty")
+    return ingredients
+
+
+# Resta "qty" de "reserved" sin bajar de 0, por si el pedido se aceptó antes de que existieran las reservas
+def get_reserved_decrement(qty: float) -> dict:
+    return {"$max": [{"$subtract": [{"$ifNull": ["$reserved", 0]}, qty]}, 0]}
+
+
 class ProductModel(BaseModel, extra="forbid"):
+    INDEXES: ClassVar[List[IndexModel]] = [
+        IndexModel("name", unique=True),
+        IndexModel("categories"),
+    ]
+
     name: str = Field(..., min_length=1, max_length=50)
     categories: List[str] = Field(..., min_length=1)
-    stock: int = Field(..., ge=0)
+    # Decimal, como "reserved" y los movimientos del registro: los pedidos descuentan la merma de cada ingrediente
+    stock: float = Field(..., ge=0)
+    # Cantidad apartada por pedidos aceptados que aún no están listos. Disponible: "stock" - "reserved".
+    reserved: float = Field(0, ge=0)
     brand: Optional[str] = Field(None, min_length=1, max_length=50)
     allergens: Optional[List[str]] = Field(None, min_length=1)
     notes: Optional[str] = Field(None, min_length=1, max_length=500)
@@ -48,45 +72,207 @@ class ProductModel(BaseModel, extra="forbid"):
         return value
 
     # Solicitudes a la colección "products"
-    def insert_product(self) -> InsertOneResult:
-        new_product = db.products.insert_one(self.model_dump())
+    def insert_product(self, session=None) -> InsertOneResult:
+        new_product = db.products.insert_one(self.model_dump(), session=session)
         return new_product
 
     @staticmethod
-    def get_products(skip: int, per_page: int) -> List[dict]:
-        products = db.products.find().skip(skip).limit(per_page)
+    def get_products(
+        skip: int, per_page: int, fields: Optional[str] = None
+    ) -> List[dict]:
+        projection = get_fields_projection(fields, PRODUCT_FIELDS)
+        products = db.products.find({}, projection).skip(skip).limit(per_page)
+        return to_json_serializable(products)
+
+    # Nombres de todos los productos para el índice de búsqueda de "search_service"
+    @staticmethod
+    def get_catalog() -> List[dict]:
+        products = db.products.find({}, {"name": 1, "categories": 1})
+        return to_json_serializable(products)
+
+    # Nombre y stock de cada producto, por "_id", para comparar con el registro de inventario
+    @staticmethod
+    def get_stocks() -> dict[str, dict]:
+        products = db.products.find({}, {"name": 1, "stock": 1})
+        return {
+            str(product["_id"]): {"name": product["name"], "stock": product["stock"]}
+            for product in products
+        }
+
+    # "_id" de los productos con esos nombres. Los platos y pedidos guardan los ingredientes por nombre; el registro de
+    # inventario, por "_id".
+    @staticmethod
+    def get_product_ids(names: List[str], session=None) -> dict[str, str]:
+        products = db.products.find(
+            {"name": {"$in": names}}, {"name": 1}, session=session
+        )
+        return {product["name"]: str(product["_id"]) for product in products}
+
+    @staticmethod
+    def get_products_by_ids(
+        product_ids: List[str], fields: Optional[str] = None
+    ) -> List[dict]:
+        projection = get_fields_projection(fields, PRODUCT_FIELDS)
+        products = db.products.find(
+            {"_id": {"$in": [ObjectId(product_id) for product_id in product_ids]}},
+            projection,
+        )
         return to_json_serializable(products)
 
     @staticmethod
-    def get_product(product_id: str) -> dict:
-        product = db.products.find_one({"_id": ObjectId(product_id)}, {"_id": 0})
+    def get_product(product_id: str, fields: Optional[str] = None) -> dict:
+        projection = get_fields_projection(fields, PRODUCT_FIELDS, {})
+        product = db.products.find_one(
+            {"_id": ObjectId(product_id)}, {"_id": 0, **projection}
+        )
         return to_json_serializable(product)
 
-    def update_product(self, product_id: str, session=None) -> dict:
-        updated_product = db.products.find_one_and_update(
+    # Devuelve el producto anterior y el actualizado. El anterior sale de la propia escritura, así que refleja los
+    # cambios de stock concurrentes hechos tras leer el producto.
+    def update_product(
+        self, product_id: str, session=None
+    ) -> tuple[Optional[dict], Optional[dict]]:
+        product_data = self.model_dump(exclude={"reserved"})
+        previous_product = db.products.find_one_and_update(
             {"_id": ObjectId(product_id)},
-            {"$set": self.model_dump()},
-            return_document=ReturnDocument.AFTER,
+            {"$set": product_data},
+            return_document=ReturnDocument.BEFORE,
             session=session,
         )
-        return to_json_serializable(updated_product)
+        if not previous_product:
+            return None, None
+        return to_json_serializable(previous_product), to_json_serializable(
+            {**previous_product, **product_data}
+        )
 
+    # Reserva los ingredientes de un pedido con una única escritura por lotes. Cada actualización sólo se aplica si hay
+    # cantidad disponible; si alguna falla, se lanza el error y la transacción deshace las demás.
     @staticmethod
-    def update_product_stock_by_name(items_order: list, session=None) -> list[dict]:
-        updated_products = []
-        for dish in items_order:
-            for ingredient in dish.get("ingredients"):
-                waste = ingredient.get("waste") * dish.get("qty")
-                updated_product = db.products.find_one_and_update(
-                    {"name": ingredient.get("name")},
-                    {"$inc": {"stock": -waste}},
-                    return_document=ReturnDocument.AFTER,
-                    session=session,
+    def reserve_stock(items_order: list, session=None) -> None:
+        ingredients = get_order_ingredients(items_order)
+        reserved_products = db.products.bulk_write(
+            [
+                UpdateOne(
+                    {
+                        "name": name,
+                        "$expr": {
+                            "$gte": [
+                                {
+                                    "$subtract": [
+                                        "$stock",
+                                        {"$ifNull": ["$reserved", 0]},
+                                    ]
+                                },
+                                qty,
+                            ]
+                        },
+                    },
+                    {"$inc": {"reserved": qty}},
                 )
-                updated_products.append(updated_product)
-        return to_json_serializable(updated_products)
+                for name, qty in ingredients.items()
+            ],
+            ordered=False,
+            session=session,
+        )
+        if reserved_products.matched_count < len(ingredients):
+            raise ValueCustomError(
+                "out_of_stock", ", ".join(ProductModel.get_unavailable(ingredients))
+            )
+
+    # Consulta fuera de la transacción, sólo para indicar en el error qué ingredientes faltan
+    @staticmethod
+    def get_unavailable(ingredients: dict[str, float]) -> List[str]:
+        products = db.products.find(
+            {"name": {"$in": list(ingredients)}}, {"name": 1, "stock": 1, "reserved": 1}
+        )
+        available = {
+            product["name"]: product["stock"] - product.get("reserved", 0)
+            for product in products
+        }
+        return [
+            name for name, qty in ingredients.items() if available.get(name, 0) < qty
+        ]
+
+    @staticmethod
+    def release_stock(items_order: list, session=None) -> None:
+        db.products.bulk_write(
+            [
+                UpdateOne(
+                    {"name": name},
+                    [{"$set": {"reserved": get_reserved_decrement(qty)}}],
+                )
+                for name, qty in get_order_ingredients(items_order).items()
+            ],
+            ordered=False,
+            session=session,
+        )
+
+    # Descuenta del stock lo reservado cuando el pedido está listo. Devuelve lo descontado de cada ingrediente.
+    @staticmethod
+    def commit_stock(items_order: list, session=None) -> dict[str, float]:
+        ingredients = get_order_ingredients(items_order)
+        db.products.bulk_write(
+            [
+                UpdateOne(
+                    {"name": name},
+                    [
+                        {
+                            "$set": {
+                                "stock": {"$subtract": ["$stock", qty]},
+                                "reserved": get_reserved_decrement(qty),
+                            }
+                        }
+                    ],
+                )
+                for name, qty in ingredients.items()
+            ],
+            ordered=False,
+            session=session,
+        )
+        return ingredients
+
+    # Entregas y correcciones de stock, por "_id". Las que restan sólo se aplican si no dejan el stock en negativo.
+    # Devuelve el nombre y el stock resultante de los productos actualizados, leídos en la propia escritura para que la
+    # disponibilidad de los platos se calcule con el stock real.
+    @staticmethod
+    def apply_stock_movements(
+        quantities: dict[str, float], session=None
+    ) -> dict[str, dict]:
+        updated_products = {}
+        for product_id, qty in quantities.items():
+            query = {"_id": ObjectId(product_id)}
+            if qty < 0:
+                query["stock"] = {"$gte": -qty}
+            product = db.products.find_one_and_update(
+                query,
+                {"$inc": {"stock": qty}},
+                {"name": 1, "stock": 1},
+                return_document=ReturnDocument.AFTER,
+                session=session,
+            )
+            if product:
+                updated_products[product_id] = {
+                    "name": product["name"],
+                    "stock": product["stock"],
+                }
+        return updated_products
+
+    @staticmethod
+    def set_stocks(stocks: dict[str, float]) -> int:
+        updated_products = db.products.bulk_write(
+            [
+                UpdateOne({"_id": ObjectId(product_id)}, {"$set": {"stock": stock}})
+                for product_id, stock in stocks.items()
+            ],
+            ordered=False,
+        )
+        return updated_products.modified_count
 
     @staticmethod
     def delete_product(product_id: str) -> DeleteResult:
         deleted_product = db.products.delete_one({"_id": ObjectId(product_id)})
         return deleted_product
+
+
+# Campos que se pueden pedir con "fields"
+PRODUCT_FIELDS = set(ProductModel.model_fields)
@@ -0,0 +1,162 @@
+from bisect import bisect_left
+from datetime import datetime
+from typing import Iterable, List
+
+from pymongo import IndexModel
+
+from src.services.bar_service import (
+    OPEN_LUNCH,
+    CLOSE_LUNCH,
+    OPEN_DINNER,
+    CLOSE_DINNER,
+)
+from src.services.db_service import db
+from src.services.opening_hours_service import opening_hours
+
+
+# Función para obtener el servicio (comida o cena) en el que se realizó un pedido, a partir de su hora local
+def get_service(order_date: datetime) -> str:
+    order_time = order_date.time()
+    if OPEN_LUNCH <= order_time <= CLOSE_LUNCH:
+        return "lunch"
+    if OPEN_DINNER <= order_time <= CLOSE_DINNER:
+        return "dinner"
+    return "other"
+
+
+# Día y servicio del resumen de un pedido, en la zona horaria del horario de apertura. "created_at" se guarda sin zona
+# con la hora del servidor (UTC en producción), así que las fechas sin zona se interpretan como hora del servidor.
+def get_report_key(order_date: datetime) -> tuple[str, str]:
+    local_date = order_date.astimezone(opening_hours.get_timezone())
+    return local_date.date().isoformat(), get_service(local_date)
+
+
+# Límites superiores en segundos de los tramos del histograma de tiempos de cocina. El último tramo no tiene límite.
+TIMING_BUCKETS = (60, 120, 180, 240, 300, 420, 600, 900, 1200, 1800, 2700, 3600, 5400)
+# Estados cuya duración se mide: desde que el pedido entra en ellos hasta el siguiente cambio
+TIMED_STATES = ("accepted", "cooking", "ready")
+
+
+def get_timing_bucket(seconds: float) -> int:
+    return bisect_left(TIMING_BUCKETS, seconds)
+
+
+# Percentiles aproximados a partir de los tramos acumulados, interpolando dentro del tramo en el que caen
+def get_percentiles(
+    buckets: dict, percentiles: Iterable[int] = (50, 90, 95)
+) -> dict[str, float]:
+    counts = [buckets.get(str(index), 0) for index in range(len(TIMING_BUCKETS) + 1)]
+    total = sum(counts)
+    result = {}
+    for percentile in percentiles:
+        if not total:
+            result[f"p{percentile}"] = None
+            continue
+        target = total * percentile / 100
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if count and cumulative + count >= target:
+                lower = TIMING_BUCKETS[index - 1] if index else 0
+                upper = (
+                    TIMING_BUCKETS[index]
+                    if index < len(TIMING_BUCKETS)
+                    else TIMING_BUCKETS[-1]
+                )
+                result[f"p{percentile}"] = round(
+                    lower + (upper - lower) * (target - cumulative) / count, 1
+                )
+                break
+            cumulative += count
+    return result
+
+
+# Los nombres de platos e ingredientes se usan como claves: se escapan "." y "$" para que sean rutas válidas
+def to_field_key(name: str) -> str:
+    return name.replace("$", "＄").replace(".", "．")
+
+
+# Resúmenes incrementales de la colección "reports": un documento por día y servicio, con "_id" "<fecha>:<servicio>".
+# Se actualizan cuando un pedido pasa a "ready" (consumo de ingredientes), a "delivered" (ventas) y en cada cambio de
+# estado (tiempos de cocina).
+class ReportModel:
+    INDEXES = [IndexModel("date")]
+
+    @staticmethod
+    def add_order_sale(order: dict, session=None) -> None:
+        date, service = get_report_key(order["created_at"])
+        increments = {"orders": 1, "revenue": order["total_price"]}
+        names = {}
+        for item in order["items"]:
+            key = to_field_key(item["name"])
+            increments[f"dishes.{key}.qty"] = item["qty"]
+            increments[f"dishes.{key}.revenue"] = item["price"] * item["qty"]
+            names[f"dishes.{key}.name"] = item["name"]
+        db.reports.update_one(
+            {"_id": f"{date}:{service}"},
+            {
+                "$inc": increments,
+                "$set": {"date": date, "service": service, **names},
+            },
+            upsert=True,
+            session=session,
+        )
+
+    @staticmethod
+    def add_order_consumption(order: dict, session=None) -> None:
+        date, service = get_report_key(order["created_at"])
+        increments = {}
+        names = {}
+        for item in order["items"]:
+            for ingredient in item["ingredients"]:
+                key = to_field_key(ingredient["name"])
+                field = f"ingredients.{key}.consumed"
+                increments[field] = (
+                    increments.get(field, 0) + ingredient["waste"] * item["qty"]
+                )
+                names[f"ingredients.{key}.name"] = ingredient["name"]
+        db.reports.update_one(
+            {"_id": f"{date}:{service}"},
+            {
+                "$inc": increments,
+                "$set": {"date": date, "service": service, **names},
+            },
+            upsert=True,
+            session=session,
+        )
+
+    # Suma la duración de un estado del pedido al histograma del día y servicio. El tiempo en "cooking" se suma también
+    # a cada plato del pedido.
+    @staticmethod
+    def add_state_duration(
+        order: dict, state: str, seconds: float, session=None
+    ) -> None:
+        date, service = get_report_key(order["created_at"])
+        bucket = get_timing_bucket(seconds)
+        increments = {
+            f"timings.{state}.count": 1,
+            f"timings.{state}.total": seconds,
+            f"timings.{state}.buckets.{bucket}": 1,
+        }
+        names = {}
+        if state == "cooking":
+            for item in order["items"]:
+                key = to_field_key(item["name"])
+                increments[f"timings.dishes.{key}.buckets.{bucket}"] = 1
+                names[f"timings.dishes.{key}.name"] = item["name"]
+        db.reports.update_one(
+            {"_id": f"{date}:{service}"},
+            {
+                "$inc": increments,
+                "$set": {"date": date, "service": service, **names},
+            },
+            upsert=True,
+            session=session,
+        )
+
+    @staticmethod
+    def get_reports(start: str, end: str, projection: dict) -> List[dict]:
+        reports = db.reports.find(
+            {"date": {"$gte": start, "$lte": end}},
+            {"_id": 0, "date": 1, "service": 1, **projection},
+        ).sort("date", 1)
+        return list(reports)
@@ -0,0 +1,118 @@
+from datetime import datetime, timezone
+from typing import ClassVar, List, Optional
+
+from bson import ObjectId
+from pydantic import BaseModel, Field
+from pymongo import IndexModel, ReturnDocument
+from pymongo.results import DeleteResult, InsertOneResult, UpdateResult
+
+from src.services.db_service import db
+from src.utils.models_helpers import to_json_serializable
+
+JTI_PATTERN = r"^[a-f0-9]{8}-[a-f0-9]{4}-4[a-f0-9]{3}-[89ab][a-f0-9]{3}-[a-f0-9]{12}$"
+
+
+# Un documento por sesión: guarda el "jti" del token de acceso y del token de refresco que la componen.
+# Las sesiones revocadas se marcan con "revoked" y "revoked_at" en lugar de eliminarse, para sincronizar el filtro de
+# revocación de cada proceso. Campo TTL: "expires_at" (caducidad del token de refresco).
+class SessionModel(BaseModel, extra="forbid"):
+    INDEXES: ClassVar[List[IndexModel]] = [
+        IndexModel("user_id"),
+        IndexModel("revoked_at"),
+        IndexModel("expires_at", expireAfterSeconds=0),
+    ]
+
+    session_id: str = Field(
+        default_factory=lambda: str(ObjectId()), pattern=r"^[a-f0-9]{24}$"
+    )
+    user_id: str = Field(..., pattern=r"^[a-f0-9]{24}$")
+    access_jti: str = Field(..., pattern=JTI_PATTERN)
+    access_expires_at: datetime = Field(...)
+    refresh_jti: str = Field(..., pattern=JTI_PATTERN)
+    expires_at: datetime = Field(...)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+    # Solicitudes a la colección "sessions"
+    def insert_session(self) -> InsertOneResult:
+        session_data = self.model_dump(exclude={"session_id"})
+        new_session = db.sessions.insert_one(
+            {"_id": ObjectId(self.session_id), **session_data}
+        )
+        return new_session
+
+    @staticmethod
+    def get_sessions(skip: int, per_page: int) -> list[dict]:
+        sessions = db.sessions.find().skip(skip).limit(per_page)
+        return to_json_serializable(sessions)
+
+    @staticmethod
+    def get_session(session_id: str) -> Optional[dict]:
+        session = db.sessions.find_one({"_id": ObjectId(session_id)})
+        return to_json_serializable(session)
+
+    # Rota el token de acceso y deja el "jti" anterior en "revoked_jtis" en una sola escritura atómica
+    @staticmethod
+    def update_session_access_token(
+        session_id: str, access_jti: str, access_expires_at: datetime
+    ) -> Optional[dict]:
+        previous_session = db.sessions.find_one_and_update(
+            {"_id": ObjectId(session_id), "revoked": {"$ne": True}},
+            [
+                {
+                    "$set": {
+                        "revoked_jtis": {
+                            "$concatArrays": [
+                                {"$ifNull": ["$revoked_jtis", []]},
+                                ["$access_jti"],
+                            ]
+                        },
+                        "access_jti": access_jti,
+                        "access_expires_at": access_expires_at,
+                        "revoked_at": datetime.now(timezone.utc),
+                    }
+                }
+            ],
+            projection={"access_jti": 1},
+            return_document=ReturnDocument.BEFORE,
+        )
+        return to_json_serializable(previous_session)
+
+    @staticmethod
+    def revoke_session(session_id: str) -> Optional[dict]:
+        revoked_session = db.sessions.find_one_and_update(
+            {"_id": ObjectId(session_id), "revoked": {"$ne": True}},
+            {"$set": {"revoked": True, "revoked_at": datetime.now(timezone.utc)}},
+            projection={"access_jti": 1, "refresh_jti": 1, "revoked_jtis": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        return to_json_serializable(revoked_session)
+
+    @staticmethod
+    def revoke_sessions_by_user_id(user_id: str) -> UpdateResult:
+        revoked_sessions = db.sessions.update_many(
+            {"user_id": user_id, "revoked": {"$ne": True}},
+            {"$set": {"revoked": True, "revoked_at": datetime.now(timezone.utc)}},
+        )
+        return revoked_sessions
+
+    @staticmethod
+    def delete_expired_sessions(now: datetime) -> DeleteResult:
+        expired_sessions = db.sessions.delete_many({"expires_at": {"$lt": now}})
+        return expired_sessions
+
+    @staticmethod
+    def get_revoked_sessions(since: Optional[datetime] = None) -> list[dict]:
+        query = (
+            {"revoked_at": {"$gt": since}} if since else {"revoked_at": {"$ne": None}}
+        )
+        revoked_sessions = db.sessions.find(
+            query,
+            {
+                "access_jti": 1,
+                "refresh_jti": 1,
+                "revoked_jtis": 1,
+                "revoked": 1,
+                "revoked_at": 1,
+            },
+        )
+        return list(revoked_sessions)
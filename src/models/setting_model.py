@@ -1,19 +1,26 @@
-from typing import List, Union, Annotated
-from datetime import datetime
+from typing import Annotated, ClassVar, List, Optional, Union
+from datetime import date, datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from bson import ObjectId
-from pydantic import BaseModel, Field, field_validator
-from pymongo.results import InsertOneResult, DeleteResult
+from pydantic import BaseModel, Field, field_validator, model_validator
+from pymongo import IndexModel
+from pymongo.results import InsertOneResult, DeleteResult, UpdateResult
 
 from src.services.db_service import db
-from src.utils.models_helpers import to_json_serializable
+from src.utils.models_helpers import (
+    OpeningHours,
+    get_fields_projection,
+    to_json_serializable,
+)
 
 NonEmptyListStr = Annotated[List[str], Field(min_length=1)]
 
 
-# Campos únicos: "name". Está configurado en MongoDB Atlas.
 class SettingModel(BaseModel, extra="forbid"):
+    INDEXES: ClassVar[List[IndexModel]] = [IndexModel("name", unique=True)]
+
     name: str = Field(..., min_length=1, max_length=50)
-    value: Union[NonEmptyListStr, bool] = Field(...)
+    value: Union[NonEmptyListStr, bool, OpeningHours] = Field(...)
     updated_at: datetime = Field(default_factory=datetime.now)
 
     @field_validator("value", mode="after")
@@ -25,19 +32,46 @@ class SettingModel(BaseModel, extra="forbid"):
             )
         return v
 
+    @model_validator(mode="after")
+    def validate_model(self) -> "SettingModel":
+        is_opening_hours = isinstance(self.value, dict)
+        if (self.name == "opening_hours") != is_opening_hours:
+            raise ValueError(
+                "Sólo el ajuste 'opening_hours' puede tener como valor un horario de apertura"
+            )
+        if is_opening_hours:
+            try:
+                ZoneInfo(self.value["timezone"])
+                for day in [
+                    *self.value.get("holidays", []),
+                    *(day["date"] for day in self.value.get("special_days", [])),
+                ]:
+                    date.fromisoformat(day)
+            except (ZoneInfoNotFoundError, ValueError):
+                raise ValueError(
+                    "El horario de apertura debe tener una zona horaria y unas fechas válidas"
+                )
+        return self
+
     # Solicitudes a la colección "settings"
     def insert_setting(self) -> InsertOneResult:
         new_setting = db.settings.insert_one(self.model_dump())
         return new_setting
 
     @staticmethod
-    def get_settings(skip: int, per_page: int) -> List[dict]:
-        settings = db.settings.find().skip(skip).limit(per_page)
+    def get_settings(
+        skip: int, per_page: int, fields: Optional[str] = None
+    ) -> List[dict]:
+        projection = get_fields_projection(fields, SETTING_FIELDS)
+        settings = db.settings.find({}, projection).skip(skip).limit(per_page)
         return to_json_serializable(settings)
 
     @staticmethod
-    def get_setting(setting_id: str) -> dict:
-        setting = db.settings.find_one({"_id": ObjectId(setting_id)}, {"_id": 0})
+    def get_setting(setting_id: str, fields: Optional[str] = None) -> dict:
+        projection = get_fields_projection(fields, SETTING_FIELDS, {})
+        setting = db.settings.find_one(
+            {"_id": ObjectId(setting_id)}, {"_id": 0, **projection}
+        )
         return to_json_serializable(setting)
 
     @staticmethod
@@ -53,7 +87,27 @@ class SettingModel(BaseModel, extra="forbid"):
         )
         return to_json_serializable(updated_setting)
 
+    @staticmethod
+    def get_settings_by_names(names: List[str]) -> dict:
+        settings = db.settings.find({"name": {"$in": names}}, {"_id": 0})
+        return {setting["name"]: setting for setting in to_json_serializable(settings)}
+
+    # "expected" restringe la actualización al estado leído, para no pisar un cambio hecho entre medias
+    @staticmethod
+    def update_setting_value_by_name(
+        name: str, value, expected: Optional[dict] = None
+    ) -> UpdateResult:
+        updated_setting = db.settings.update_one(
+            {"name": name, **(expected or {})},
+            {"$set": {"value": value, "updated_at": datetime.now()}},
+        )
+        return updated_setting
+
     @staticmethod
     def delete_setting(setting_id: str) -> DeleteResult:
         deleted_setting = db.settings.delete_one({"_id": ObjectId(setting_id)})
         return deleted_setting
+
+
+# Campos que se pueden pedir con "fields"
+SETTING_FIELDS = set(SettingModel.model_fields)
@@ -1,17 +1,24 @@
 from datetime import datetime, timezone
 import re
+from typing import ClassVar, List
+
 from bson import ObjectId
 from pydantic import BaseModel, Field, field_validator
-from pymongo import ReturnDocument
+from pymongo import IndexModel, ReturnDocument
 from pymongo.results import InsertOneResult, DeleteResult
 
 from src.services.db_service import db
 from src.utils.models_helpers import to_json_serializable
 
 
-# Campos únicos: "jti" y "user_id", en las colecciones "active-tokens" y "refresh-tokens"; "jti" en la colección "email-tokens", configurado en MongoDB Atlas.
-# Campo TTL: "expires_at", configurado en MongoDB Atlas. El documento se eliminará automáticamente cuando expire la fecha.
+# Campo TTL: "expires_at". El documento se eliminará automáticamente cuando expire la fecha.
 class TokenModel(BaseModel, extra="forbid"):
+    INDEXES: ClassVar[List[IndexModel]] = [
+        IndexModel("jti", unique=True),
+        IndexModel("user_id"),
+        IndexModel("expires_at", expireAfterSeconds=0),
+    ]
+
     user_id: str = Field(..., pattern=r"^[a-f0-9]{24}$")
     jti: str = Field(
         ...,
@@ -43,60 +50,6 @@ class TokenModel(BaseModel, extra="forbid"):
             )
         return v
 
-    # Solicitudes a la colección "refresh_tokens"
-    def insert_refresh_token(self) -> InsertOneResult:
-        new_refresh_token = db.refresh_tokens.insert_one(self.model_dump())
-        return new_refresh_token
-
-    @staticmethod
-    def get_refresh_tokens(skip: int, per_page: int) -> list[dict]:
-        refresh_tokens = db.refresh_tokens.find().skip(skip).limit(per_page)
-        return to_json_serializable(refresh_tokens)
-
-    @staticmethod
-    def get_refresh_token_by_token_id(token_id: str) -> dict:
-        refresh_token = db.refresh_tokens.find_one(
-            {"_id": ObjectId(token_id)}, {"_id": 0}
-        )
-        return to_json_serializable(refresh_token)
-
-    @staticmethod
-    def get_refresh_token_by_user_id(user_id: str) -> dict:
-        refresh_token = db.refresh_tokens.find_one({"user_id": user_id}, {"_id": 0})
-        return to_json_serializable(refresh_token)
-
-    def update_refresh_token(self, token_id: str) -> dict:
-        refresh_token_updated = db.refresh_tokens.find_one_and_update(
-            {"_id": ObjectId(token_id)},
-            {"$set": self.model_dump()},
-            return_document=ReturnDocument.AFTER,
-        )
-        return to_json_serializable(refresh_token_updated)
-
-    def update_or_insert_refresh_token_by_user_id(
-        self, user_id: str, session=None
-    ) -> dict:
-        refresh_token_updated = db.refresh_tokens.find_one_and_update(
-            {"user_id": user_id},
-            {"$set": self.model_dump()},
-            upsert=True,
-            return_document=ReturnDocument.AFTER,
-            session=session,
-        )
-        return to_json_serializable(refresh_token_updated)
-
-    @staticmethod
-    def delete_refresh_token_by_token_id(token_id: str) -> DeleteResult:
-        refresh_token_deleted = db.refresh_tokens.delete_one(
-            {"_id": ObjectId(token_id)}
-        )
-        return refresh_token_deleted
-
-    @staticmethod
-    def delete_refresh_token_by_user_id(user_id: str) -> DeleteResult:
-        refresh_token_deleted = db.refresh_tokens.delete_one({"user_id": user_id})
-        return refresh_token_deleted
-
     # Solicitudes a la colección "email_tokens"
     def insert_email_token(self) -> InsertOneResult:
         new_email_token = db.email_tokens.insert_one(self.model_dump())
@@ -130,61 +83,15 @@ class TokenModel(BaseModel, extra="forbid"):
         email_token_deleted = db.email_tokens.delete_one({"_id": ObjectId(token_id)})
         return email_token_deleted
 
+    # Barrido de respaldo del índice TTL, que MongoDB sólo aplica cada ~60 segundos
+    @staticmethod
+    def delete_expired_email_tokens(now: datetime) -> DeleteResult:
+        expired_tokens = db.email_tokens.delete_many({"expires_at": {"$lt": now}})
+        return expired_tokens
+
     @staticmethod
     def delete_email_tokens_by_user_id(user_id: str, session=None) -> DeleteResult:
         email_tokens_deleted = db.email_tokens.delete_many(
             {"user_id": user_id}, session=session
         )
         return email_tokens_deleted
-
-    # Solicitudes a la colección "active_tokens"
-    def insert_active_token(self) -> InsertOneResult:
-        new_active_token = db.active_tokens.insert_one(self.model_dump())
-        return new_active_token
-
-    @staticmethod
-    def get_active_tokens(skip: int, per_page: int) -> list[dict]:
-        active_tokens = db.active_tokens.find().skip(skip).limit(per_page)
-        return to_json_serializable(active_tokens)
-
-    @staticmethod
-    def get_active_token_by_token_id(token_id: str) -> dict:
-        active_token = db.active_tokens.find_one(
-            {"_id": ObjectId(token_id)}, {"_id": 0}
-        )
-        return to_json_serializable(active_token)
-
-    @staticmethod
-    def get_active_token_by_user_id(user_id: str) -> dict:
-        active_token = db.active_tokens.find_one({"user_id": user_id})
-        return to_json_serializable(active_token)
-
-    def update_active_token(self, token_id: str) -> dict:
-        active_token_updated = db.active_tokens.find_one_and_update(
-            {"_id": ObjectId(token_id)},
-            {"$set": self.model_dump()},
-            return_document=ReturnDocument.AFTER,
-        )
-        return to_json_serializable(active_token_updated)
-
-    def update_or_insert_active_token_by_user_id(
-        self, user_id: str, session=None
-    ) -> dict:
-        active_token_updated = db.active_tokens.find_one_and_update(
-            {"user_id": user_id},
-            {"$set": self.model_dump()},
-            upsert=True,
-            return_document=ReturnDocument.AFTER,
-            session=session,
-        )
-        return to_json_serializable(active_token_updated)
-
-    @staticmethod
-    def delete_active_token_by_token_id(token_id: str) -> DeleteResult:
-        active_token_deleted = db.active_tokens.delete_one({"_id": ObjectId(token_id)})
-        return active_token_deleted
-
-    @staticmethod
-    def delete_active_token_by_user_id(user_id: str) -> DeleteResult:
-        active_token_deleted = db.active_tokens.delete_one({"user_id": user_id})
-        return active_token_deleted
@@ -1,6 +1,6 @@
 import re
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Literal
+from typing import ClassVar, List, Optional, Literal
 
 from bson import ObjectId
 from email_validator import validate_email, EmailNotValidError
@@ -11,19 +11,54 @@ from pydantic import (
     field_validator,
     ValidationInfo,
     model_validator,
+    TypeAdapter,
 )
-from pymongo import ReturnDocument
+from pymongo import IndexModel, ReturnDocument
 from pymongo.results import InsertOneResult, DeleteResult
 
 from src.services.db_service import db
+from src.services.email_deliverability_service import deliverability_cache
 from src.services.security_service import bcrypt
-from src.utils.models_helpers import Address, ItemBasket, to_json_serializable
+from src.utils.models_helpers import (
+    Address,
+    ItemBasket,
+    get_fields_projection,
+    to_json_serializable,
+)
+
 
+BASKET_ITEM_ADAPTER = TypeAdapter(ItemBasket)
+BASKET_PROJECTION = {"_id": 0, "basket": 1}
+ADDRESS_ADAPTER = TypeAdapter(Address)
+ADDRESSES_PROJECTION = {"_id": 0, "addresses": 1}
+# Proyecciones por defecto del listado y del perfil. La contraseña nunca se devuelve.
+USER_LIST_PROJECTION = {
+    "name": 1,
+    "email": 1,
+    "role": 1,
+    "auth_provider": 1,
+    "confirmed": 1,
+    "created_at": 1,
+}
+USER_PROFILE_PROJECTION = {"_id": 0, "password": 0}
+GOOGLE_USER_DEFAULTS = {
+    "password": None,
+    "role": 3,
+    "phone": None,
+    "addresses": None,
+    "basket": None,
+}
+GOOGLE_USER_PROJECTION = {"role": 1}
 
-# Campos únicos: "email". Está configurado en MongoDB Atlas.
-# Campos TTL: "expires_at". Está configurado en MongoDB Atlas. El documento se eliminará automáticamente cuando
-# expire la fecha. Si el usuario no ha confirmado su email, se eliminará automáticamente a los 7 días.
+
+# Campo TTL: "expires_at". El documento se eliminará automáticamente cuando expire la fecha. Si el usuario no ha
+# confirmado su email, se eliminará automáticamente a los 7 días.
 class UserModel(BaseModel, extra="forbid"):
+    INDEXES: ClassVar[List[IndexModel]] = [
+        IndexModel("email", unique=True),
+        IndexModel("expires_at", expireAfterSeconds=0),
+    ]
+
     name: str = Field(..., min_length=1, max_length=50)
     email: EmailStr = Field(..., min_length=5, max_length=100)
     password: Optional[str] = Field(default=None, min_length=8, max_length=60)
@@ -48,11 +83,15 @@ class UserModel(BaseModel, extra="forbid"):
             self.expires_at = None
         return self
 
+    # La sintaxis se valida siempre; la entrega (DNS) sólo para emails nuevos. Al reconstruir el modelo a partir de un
+    # usuario guardado, "stored_email" en el contexto de validación evita volver a comprobar el dominio.
     @field_validator("email", mode="after")
     @classmethod
-    def validate_email(cls, v) -> EmailStr:
+    def validate_email(cls, v, info: ValidationInfo) -> EmailStr:
         try:
-            validate_email(v)
+            email_info = validate_email(v, check_deliverability=False)
+            if not info.context or info.context.get("stored_email") != v:
+                deliverability_cache.check(email_info.ascii_domain, email_info.domain)
             return v
         except EmailNotValidError as e:
             raise ValueError(f"El campo 'email' no es válido: {str(e)}")
@@ -105,20 +144,47 @@ class UserModel(BaseModel, extra="forbid"):
         user = db.users.insert_one(self.model_dump(), session=session)
         return user
 
-    def insert_or_update_user_by_email(self) -> dict:
+    # Inicio de sesión con Google en una sola escritura. Google ya ha verificado el email, por lo que no se construye el
+    # modelo completo (ni se comprueba el dominio). Sólo se actualizan el nombre y el proveedor; el resto de campos de
+    # un usuario existente (rol, cesta, direcciones, fecha de alta) se conservan y los valores por defecto sólo se
+    # escriben al crearlo. Devuelve lo necesario para generar los tokens.
+    @staticmethod
+    def upsert_google_user(name: str, email: str) -> dict:
         user = db.users.find_one_and_update(
-            {"email": self.email},
-            {"$set": self.model_dump()},
+            {"email": email},
+            {
+                "$set": {
+                    "name": name,
+                    "auth_provider": "google",
+                    "confirmed": True,
+                    "expires_at": None,
+                },
+                "$setOnInsert": {
+                    **GOOGLE_USER_DEFAULTS,
+                    "created_at": datetime.now(),
+                },
+            },
+            projection=GOOGLE_USER_PROJECTION,
             upsert=True,
             return_document=ReturnDocument.AFTER,
         )
         return to_json_serializable(user)
 
     @staticmethod
-    def get_users(skip: int, per_page: int) -> list[dict]:
-        users = db.users.find().skip(skip).limit(per_page)
+    def get_users(skip: int, per_page: int, fields: Optional[str] = None) -> list[dict]:
+        projection = get_fields_projection(fields, USER_FIELDS, USER_LIST_PROJECTION)
+        users = db.users.find({}, projection).skip(skip).limit(per_page)
         return to_json_serializable(users)
 
+    @staticmethod
+    def get_user_profile(user_id: str, fields: Optional[str] = None) -> dict:
+        projection = get_fields_projection(fields, USER_FIELDS)
+        user = db.users.find_one(
+            {"_id": ObjectId(user_id)},
+            {"_id": 0, **projection} if projection else USER_PROFILE_PROJECTION,
+        )
+        return to_json_serializable(user)
+
     @staticmethod
     def get_user_by_user_id_without_id(user_id: str) -> dict:
         user = db.users.find_one({"_id": ObjectId(user_id)}, {"_id": 0})
@@ -129,6 +195,14 @@ class UserModel(BaseModel, extra="forbid"):
         user = db.users.find_one({"_id": ObjectId(user_id)})
         return to_json_serializable(user)
 
+    # Proyección mínima para el login: sólo los campos necesarios para verificar al usuario y generar los tokens
+    @staticmethod
+    def get_user_login_data_by_email(email: str) -> dict:
+        user = db.users.find_one(
+            {"email": email}, {"password": 1, "confirmed": 1, "role": 1}
+        )
+        return to_json_serializable(user)
+
     @staticmethod
     def get_user_by_email(email: str) -> dict:
         user = db.users.find_one({"email": email})
@@ -143,7 +217,141 @@ class UserModel(BaseModel, extra="forbid"):
         )
         return to_json_serializable(updated_user)
 
+    # Operaciones atómicas sobre la cesta. Devuelven la cesta actualizada o None si el usuario o el artículo no existen.
+    # Un artículo con el mismo nombre y personalización que otro de la cesta incrementa su cantidad.
+    @staticmethod
+    def add_basket_item(user_id: str, item: dict) -> Optional[list]:
+        same_item = {"$elemMatch": {"name": item["name"], "custom": item.get("custom")}}
+        for _ in range(2):
+            user = db.users.find_one_and_update(
+                {"_id": ObjectId(user_id), "basket": same_item},
+                {"$inc": {"basket.$.qty": item["qty"]}},
+                projection=BASKET_PROJECTION,
+                return_document=ReturnDocument.AFTER,
+            )
+            if user:
+                return to_json_serializable(user["basket"])
+            # Se usa una actualización con pipeline porque "basket" puede ser null en usuarios sin cesta
+            user = db.users.find_one_and_update(
+                {"_id": ObjectId(user_id), "basket": {"$not": same_item}},
+                [
+                    {
+                        "$set": {
+                            "basket": {
+                                "$concatArrays": [
+                                    {"$ifNull": ["$basket", []]},
+                                    [
+                                        {
+                                            "$literal": {
+                                                "item_id": str(ObjectId()),
+                                                **item,
+                                            }
+                                        }
+                                    ],
+                                ]
+                            }
+                        }
+                    }
+                ],
+                projection=BASKET_PROJECTION,
+                return_document=ReturnDocument.AFTER,
+            )
+            if user:
+                return to_json_serializable(user["basket"])
+        return None
+
+    @staticmethod
+    def update_basket_item_qty(user_id: str, item_id: str, qty: int) -> Optional[list]:
+        user = db.users.find_one_and_update(
+            {"_id": ObjectId(user_id), "basket.item_id": item_id},
+            {"$set": {"basket.$.qty": qty}},
+            projection=BASKET_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        return to_json_serializable(user["basket"]) if user else None
+
+    @staticmethod
+    def remove_basket_item(user_id: str, item_id: str) -> Optional[list]:
+        user = db.users.find_one_and_update(
+            {"_id": ObjectId(user_id), "basket.item_id": item_id},
+            {"$pull": {"basket": {"item_id": item_id}}},
+            projection=BASKET_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        return to_json_serializable(user["basket"]) if user else None
+
+    @staticmethod
+    def clear_basket(user_id: str) -> Optional[list]:
+        user = db.users.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            {"$set": {"basket": []}},
+            projection=BASKET_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        return to_json_serializable(user["basket"]) if user else None
+
+    # Operaciones atómicas sobre la libreta de direcciones. Devuelven las direcciones actualizadas o None si el usuario
+    # o la dirección no existen.
+    @staticmethod
+    def get_addresses(user_id: str) -> Optional[list]:
+        user = db.users.find_one({"_id": ObjectId(user_id)}, ADDRESSES_PROJECTION)
+        return to_json_serializable(user.get("addresses") or []) if user else None
+
+    @staticmethod
+    def add_address(user_id: str, address: dict) -> Optional[list]:
+        user = db.users.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            [
+                {
+                    "$set": {
+                        "addresses": {
+                            "$concatArrays": [
+                                {"$ifNull": ["$addresses", []]},
+                                [{"$literal": address}],
+                            ]
+                        }
+                    }
+                }
+            ],
+            projection=ADDRESSES_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        return to_json_serializable(user["addresses"]) if user else None
+
+    @staticmethod
+    def update_address(user_id: str, address_id: str, address: dict) -> Optional[list]:
+        user = db.users.find_one_and_update(
+            {"_id": ObjectId(user_id), "addresses.address_id": address_id},
+            {"$set": {"addresses.$[address]": address}},
+            array_filters=[{"address.address_id": address_id}],
+            projection=ADDRESSES_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        return to_json_serializable(user["addresses"]) if user else None
+
+    @staticmethod
+    def delete_address(user_id: str, address_id: str) -> Optional[list]:
+        user = db.users.find_one_and_update(
+            {"_id": ObjectId(user_id), "addresses.address_id": address_id},
+            {"$pull": {"addresses": {"address_id": address_id}}},
+            projection=ADDRESSES_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        return to_json_serializable(user["addresses"]) if user else None
+
+    # Usuarios que no confirmaron su email a tiempo
+    @staticmethod
+    def delete_expired_users(now: datetime) -> DeleteResult:
+        expired_users = db.users.delete_many(
+            {"confirmed": False, "expires_at": {"$lt": now}}
+        )
+        return expired_users
+
     @staticmethod
     def delete_user(user_id: str) -> DeleteResult:
         deleted_user = db.users.delete_one({"_id": ObjectId(user_id)})
         return deleted_user
+
+
+# Campos que se pueden pedir con "fields"
+USER_FIELDS = set(UserModel.model_fields) - {"password"}
@@ -2,27 +2,36 @@ from flask import Blueprint, request, url_for, jsonify, Response
 from flask_jwt_extended import jwt_required, get_jwt, decode_token
 from pymongo.errors import PyMongoError
 
+from config import (
+    RATE_LIMIT_GOOGLE_IP,
+    RATE_LIMIT_LOGIN_FAILURES,
+    RATE_LIMIT_LOGIN_IP,
+    RATE_LIMIT_REGISTER_IP,
+    RATE_LIMIT_RESEND_EMAIL_ACCOUNT,
+    RATE_LIMIT_RESEND_EMAIL_IP,
+)
 from src.models.token_model import TokenModel
 from src.models.user_model import UserModel
 from src.services.email_service import send_email
+from src.services.rate_limit_service import rate_limit, RateLimit
 from src.services.security_service import (
     generate_access_token,
-    generate_refresh_token,
-    delete_active_token,
-    delete_refresh_token,
+    generate_session_tokens,
+    get_session,
+    revoke_session,
     google,
     verify_password,
 )
 from src.utils.exception_handlers import ValueCustomError
 from src.utils.json_responses import success_json_response
-from src.services.db_service import client
+from src.services.db_service import run_in_transaction
 
 auth_route = Blueprint("auth", __name__)
 
 
 @auth_route.route("/register", methods=["POST"])
+@rate_limit("register", RateLimit("ip", *RATE_LIMIT_REGISTER_IP))
 def register() -> tuple[Response, int]:
-    session = client.start_session()
     not_authorized_to_set = (
         "created_at",
         "expires_at",
@@ -35,17 +44,13 @@ def register() -> tuple[Response, int]:
         if field in user_data.keys():
             raise ValueCustomError("not_auth_set", field)
     user_object = UserModel(**user_data)
-    try:
-        session.start_transaction()
-        new_user = user_object.insert_user(session=session)
-        send_email({**user_object.model_dump(), "_id": new_user.inserted_id})
-        session.commit_transaction()
-        return success_json_response("usuario", "añadido", 201)
-    except Exception as e:
-        session.abort_transaction()
-        raise e
-    finally:
-        session.end_session()
+
+    # El email se envía una vez confirmada la transacción: los reintentos no lo repiten y no sale si falla el commit
+    new_user = run_in_transaction(
+        lambda session: user_object.insert_user(session=session)
+    )
+    send_email({**user_object.model_dump(), "_id": new_user.inserted_id})
+    return success_json_response("usuario", "añadido", 201)
 
 
 # Se precisa de un login previo gestionado por el frontend
@@ -70,43 +75,38 @@ def change_email() -> tuple[Response, int]:
     return success_json_response("email del usuario", "actualizado")
 
 
+# Los intentos fallidos se cuentan por IP y cuenta: nadie puede bloquear el acceso de otro usuario desde otra IP
 @auth_route.route("/login", methods=["POST"])
+@rate_limit(
+    "login",
+    RateLimit("ip", *RATE_LIMIT_LOGIN_IP),
+    RateLimit("ip_account", *RATE_LIMIT_LOGIN_FAILURES, failures_only=True),
+)
 def login() -> tuple[Response, int]:
-    session = client.start_session()
     user_data = request.get_json()
-    user_requested = UserModel.get_user_by_email(user_data.get("email"))
+    user_requested = UserModel.get_user_login_data_by_email(user_data.get("email"))
     if not user_requested:
         raise ValueCustomError("not_found", "usuario")
     if not verify_password(user_requested.get("password"), user_data.get("password")):
         raise ValueCustomError("password_not_match")
     if not user_requested.get("confirmed"):
         raise ValueCustomError("email_not_confirmed")
-    try:
-        session.start_transaction()
-        access_token = generate_access_token(user_requested, session)
-        refresh_token = generate_refresh_token(user_requested, session)
-        session.commit_transaction()
-        return (
-            jsonify(
-                msg=f"Usuario ha iniciado sesión manualmente de forma satisfactoria",
-                access_token=access_token,
-                refresh_token=refresh_token,
-            ),
-            200,
-        )
-    except Exception as e:
-        session.abort_transaction()
-        raise e
-    finally:
-        session.end_session()
+    access_token, refresh_token = generate_session_tokens(user_requested)
+    return (
+        jsonify(
+            msg=f"Usuario ha iniciado sesión manualmente de forma satisfactoria",
+            access_token=access_token,
+            refresh_token=refresh_token,
+        ),
+        200,
+    )
 
 
 @auth_route.route("/logout", methods=["POST"])
 @jwt_required()
 def logout() -> tuple[Response, int]:
-    user_id = get_jwt().get("sub")
-    delete_active_token(user_id)
-    delete_refresh_token(user_id)
+    session_id = get_jwt().get("sid")
+    revoke_session(session_id)
     return success_json_response("logout del usuario", "realizado")
 
 
@@ -117,50 +117,43 @@ def login_google() -> tuple[Response, int]:
 
 
 @auth_route.route("/callback/google")
+@rate_limit("google", RateLimit("ip", *RATE_LIMIT_GOOGLE_IP))
 def authorize_google() -> tuple[Response, int]:
-    session = client.start_session()
     google_token = google.authorize_access_token()
-    nonce = request.args.get("nonce")
-    google_user_info = google.parse_id_token(google_token, nonce=nonce)
-
-    user_data = {
-        "name": google_user_info.get("name"),
-        "email": google_user_info.get("email"),
-        "auth_provider": "google",
-    }
-    user_object = UserModel(**user_data)
-    user = user_object.insert_or_update_user_by_email()
-    try:
-        session.start_transaction()
-        access_token = generate_access_token(user, session)
-        refresh_token = generate_refresh_token(user, session)
-        session.commit_transaction()
-        return (
-            jsonify(
-                {
-                    "msg": "El usuario ha iniciado sesión con Google de forma satisfactoria",
-                    "access_token": access_token,
-                    "refresh_token": refresh_token,
-                }
-            ),
-            200,
-        )
-    except Exception as e:
-        session.abort_transaction()
-        raise e
-    finally:
-        session.end_session()
+    # Authlib ya valida el "id_token" con el "nonce" de la sesión; sólo se vuelve a validar si no lo ha hecho
+    google_user_info = google_token.get("userinfo") or google.parse_id_token(
+        google_token, nonce=request.args.get("nonce")
+    )
+
+    email = google_user_info.get("email")
+    if not email:
+        raise ValueCustomError("resource_required", "email")
+    if google_user_info.get("email_verified") is False:
+        raise ValueCustomError("email_not_confirmed")
+    name = (google_user_info.get("name") or email.split("@")[0])[:50]
+    user = UserModel.upsert_google_user(name, email)
+    access_token, refresh_token = generate_session_tokens(user)
+    return (
+        jsonify(
+            {
+                "msg": "El usuario ha iniciado sesión con Google de forma satisfactoria",
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+            }
+        ),
+        200,
+    )
 
 
 @auth_route.route("/refresh-token")
 @jwt_required(refresh=True)
 def refresh_user_token():
-    user_id = get_jwt().get("sub")
-    check_refresh_token = TokenModel.get_refresh_token_by_user_id(user_id)
-    if not check_refresh_token:
+    token = get_jwt()
+    check_session = get_session(token.get("sid"))
+    if not check_session:
         raise ValueCustomError("not_found", "refresh token")
-    user_data = UserModel.get_user_by_user_id(user_id)
-    access_token = generate_access_token(user_data)
+    user_data = UserModel.get_user_by_user_id(token.get("sub"))
+    access_token = generate_access_token(user_data, check_session["_id"])
     return (
         jsonify(
             access_token=access_token,
@@ -172,7 +165,6 @@ def refresh_user_token():
 
 @auth_route.route("/confirm-email/<token>", methods=["GET"])
 def confirm_email(token: str) -> tuple[Response, int]:
-    session = client.start_session()
     user_identity = decode_token(token)
     user_id = user_identity.get("sub")
     user_requested = UserModel.get_user_by_user_id_without_id(user_id)
@@ -181,21 +173,27 @@ def confirm_email(token: str) -> tuple[Response, int]:
     if user_requested["confirmed"]:
         raise ValueCustomError("email_already_confirmed")
     user_requested["confirmed"] = True
-    user_object = UserModel(**user_requested)
-    try:
-        session.start_transaction()
+    user_object = UserModel.model_validate(
+        user_requested, context={"stored_email": user_requested.get("email")}
+    )
+
+    def confirm_user(session):
         user_object.update_user(user_id, session=session)
         TokenModel.delete_email_tokens_by_user_id(user_id, session=session)
-        session.commit_transaction()
-        return success_json_response("usuario", "confirmado")
-    except Exception as e:
-        session.abort_transaction()
-        raise e
-    finally:
-        session.end_session()
+
+    run_in_transaction(confirm_user)
+    return success_json_response("usuario", "confirmado")
 
 
+# El límite por cuenta va unido a la IP: el email llega en el cuerpo, así que por cuenta sola cualquiera podría agotar
+# los reenvíos de otro usuario
 @auth_route.route("/resend-email", methods=["POST"])
+@rate_limit(
+    "resend_email",
+    RateLimit("ip", *RATE_LIMIT_RESEND_EMAIL_IP),
+    RateLimit("ip_account", *RATE_LIMIT_RESEND_EMAIL_ACCOUNT),
+    error_type="too_many_requests",
+)
 def resend_email() -> tuple[Response, int]:
     email = request.get_json().get("email")
     if not email:
@@ -203,8 +201,5 @@ def resend_email() -> tuple[Response, int]:
     user = UserModel.get_user_by_email(email)
     if not user:
         raise ValueCustomError("not_found", "usuario")
-    user_tokens = TokenModel.get_email_tokens_by_user_id(user["_id"])
-    if not len(user_tokens) < 5:
-        raise ValueCustomError("too_many_requests")
     send_email(user)
     return success_json_response("email de confirmación", "reenviado")
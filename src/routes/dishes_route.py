@@ -1,11 +1,21 @@
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt
 
-from src.models.dish_model import DishModel
+from src.models.dish_model import DishModel, DISH_FIELDS
+from src.services.menu_service import menu_index
+from src.services.menu_snapshot_service import refresh_menu
+from src.services.search_service import dishes_search
 from src.utils.json_responses import success_json_response, db_json_response
 from src.utils.exception_handlers import ValueCustomError
+from src.utils.models_helpers import (
+    apply_fields_projection,
+    get_batch_ids,
+    get_fields_projection,
+    sort_by_ids,
+)
 
 DISHES_RESOURCE = "plato"
+MAX_SEARCH_RESULTS = 50
 
 dishes_route = Blueprint("dishes", __name__)
 
@@ -21,6 +31,7 @@ def add_dish():
         raise ValueCustomError("not_auth_set", "created_at")
     dish_object = DishModel(**dish_data)
     dish_object.insert_dish()
+    refresh_menu()
     return success_json_response(DISHES_RESOURCE, "añadido", 201)
 
 
@@ -29,13 +40,39 @@ def get_dishes():
     page = int(request.args.get("page", 1))
     per_page = int(request.args.get("per-page", 10))
     skip = (page - 1) * per_page
-    dishes = DishModel.get_dishes(skip, per_page)
+    fields = request.args.get("fields")
+    ids = request.args.get("ids")
+    if ids:
+        projection = get_fields_projection(fields, DISH_FIELDS)
+        dish_ids = get_batch_ids(ids)
+        dishes, missing = sort_by_ids(menu_index.get_dishes_by_ids(dish_ids), dish_ids)
+        return db_json_response(
+            {"dishes": apply_fields_projection(dishes, projection), "missing": missing}
+        )
+    exclude_allergens = request.args.get("exclude_allergens")
+    if exclude_allergens:
+        projection = get_fields_projection(fields, DISH_FIELDS)
+        dishes = menu_index.get_dishes(exclude_allergens.split(","))
+        return db_json_response(
+            apply_fields_projection(dishes[skip : skip + per_page], projection)
+        )
+    dishes = DishModel.get_dishes(skip, per_page, fields)
+    return db_json_response(dishes)
+
+
+@dishes_route.route("/search")
+def search_dishes():
+    query = request.args.get("q", "")
+    limit = min(int(request.args.get("limit", 10)), MAX_SEARCH_RESULTS)
+    dishes = dishes_search.search(query, limit)
     return db_json_response(dishes)
 
 
 @dishes_route.route("/category/<category>")
 def get_category_dishes(category):
-    dishes_by_category = DishModel.get_dishes_by_category(category)
+    dishes_by_category = DishModel.get_dishes_by_category(
+        category, request.args.get("fields")
+    )
     if not dishes_by_category:
         raise ValueCustomError("not_found", DISHES_RESOURCE)
     return db_json_response(dishes_by_category)
@@ -43,7 +80,7 @@ def get_category_dishes(category):
 
 @dishes_route.route("/<dish_id>")
 def get_dish(dish_id):
-    dish = DishModel.get_dish(dish_id)
+    dish = DishModel.get_dish(dish_id, request.args.get("fields"))
     if not dish:
         raise ValueCustomError("not_found", DISHES_RESOURCE)
     return db_json_response(dish)
@@ -68,10 +105,12 @@ def handle_dish(dish_id):
         mixed_data = {**dish, **dish_data}
         dish_object = DishModel(**mixed_data)
         updated_dish = dish_object.update_dish(dish_id)
+        refresh_menu()
         return db_json_response(updated_dish)
 
     if request.method == "DELETE":
         deleted_dish = DishModel.delete_dish(dish_id)
         if not deleted_dish.deleted_count > 0:
             raise ValueCustomError("not_found", DISHES_RESOURCE)
+        refresh_menu()
         return success_json_response(DISHES_RESOURCE, "eliminado")
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from flask import Blueprint, request, Response
+from flask_jwt_extended import jwt_required, get_jwt
+
+from src.models.dish_model import DishModel
+from src.models.inventory_model import InventoryMovementModel
+from src.models.product_model import ProductModel
+from src.services.db_service import run_in_transaction
+from src.services.menu_snapshot_service import refresh_menu
+from src.utils.exception_handlers import ValueCustomError
+from src.utils.json_responses import success_json_response, db_json_response
+
+MOVEMENTS_RESOURCE = "movimientos"
+PRODUCTS_RESOURCE = "producto"
+# Los movimientos de pedidos sólo los registran los pedidos
+MANUAL_REASONS = ("adjustment", "delivery")
+NOT_AUTHORIZED_TO_SET = ["product", "created_at", "order_id", "user_id"]
+MAX_MOVEMENTS_PER_PAGE = 200
+
+inventory_route = Blueprint("inventory", __name__)
+
+
+@inventory_route.route("/movements", methods=["POST"])
+@jwt_required()
+def add_movements() -> tuple[Response, int]:
+    token = get_jwt()
+    if not any([token.get("role") == 1, token.get("role") == 2]):
+        raise ValueCustomError("not_auth")
+    movements_data = request.get_json()
+    if not isinstance(movements_data, list) or not movements_data:
+        raise ValueCustomError("resource_required", MOVEMENTS_RESOURCE)
+    for movement_data in movements_data:
+        for field in movement_data.keys():
+            if field in NOT_AUTHORIZED_TO_SET:
+                raise ValueCustomError("not_auth_set", field)
+        if movement_data.get("reason") not in MANUAL_REASONS:
+            raise ValueCustomError("invalid_value", "reason")
+        product_id = movement_data.get("product_id")
+        if not isinstance(product_id, str) or not ObjectId.is_valid(product_id):
+            raise ValueCustomError("invalid_value", "product_id")
+    product_ids = list(
+        dict.fromkeys(movement_data["product_id"] for movement_data in movements_data)
+    )
+    products = {
+        product["_id"]: product
+        for product in ProductModel.get_products_by_ids(product_ids, "name")
+    }
+    if any(product_id not in products for product_id in product_ids):
+        raise ValueCustomError("not_found", PRODUCTS_RESOURCE)
+    # El nombre del producto sólo se guarda para mostrarlo; el registro se agrupa por "product_id"
+    movements = [
+        InventoryMovementModel(
+            **movement_data,
+            product=products[movement_data["product_id"]]["name"],
+            user_id=token.get("sub"),
+        )
+        for movement_data in movements_data
+    ]
+
+    quantities = {}
+    for movement in movements:
+        quantities[movement.product_id] = (
+            quantities.get(movement.product_id, 0) + movement.qty
+        )
+
+    # Los productos que se agotan o vuelven a tener stock cambian la disponibilidad de sus platos. Se calcula con el
+    # stock que deja cada escritura, no con una lectura previa que otro pedido o movimiento puede haber dejado obsoleta.
+    def add_movements_and_update_stock(session):
+        updated_products = ProductModel.apply_stock_movements(quantities, session)
+        if len(updated_products) < len(quantities):
+            raise ValueCustomError(
+                "out_of_stock",
+                ", ".join(
+                    products[product_id]["name"]
+                    for product_id in quantities
+                    if product_id not in updated_products
+                ),
+            )
+        InventoryMovementModel.insert_movements(movements, session)
+        availability_changes = {
+            product["name"]: product["stock"] > 0
+            for product_id, product in updated_products.items()
+            if (product["stock"] > 0) != (product["stock"] - quantities[product_id] > 0)
+        }
+        for product, available in availability_changes.items():
+            DishModel.update_dishes_availability(product, available, session)
+        return availability_changes
+
+    if run_in_transaction(add_movements_and_update_stock):
+        refresh_menu()
+    return success_json_response(MOVEMENTS_RESOURCE, "añadidos", 201)
+
+
+# Historial por rango de fechas (por defecto, los últimos 7 días), opcionalmente de un único producto ("product_id")
+@inventory_route.route("/movements", methods=["GET"])
+@jwt_required()
+def get_movements() -> tuple[Response, int]:
+    token_role = get_jwt().get("role")
+    if not any([token_role == 1, token_role == 2]):
+        raise ValueCustomError("not_auth")
+    try:
+        end = datetime.fromisoformat(
+            request.args.get("end", datetime.now().isoformat())
+        )
+        start = datetime.fromisoformat(
+            request.args.get("start", (end - timedelta(days=7)).isoformat())
+        )
+    except ValueError:
+        raise ValueCustomError("invalid_value", "start, end")
+    if start > end:
+        raise ValueCustomError("invalid_value", "start, end")
+    page = int(request.args.get("page", 1))
+    per_page = min(int(request.args.get("per-page", 50)), MAX_MOVEMENTS_PER_PAGE)
+    skip = (page - 1) * per_page
+    movements = InventoryMovementModel.get_movements(
+        start, end, skip, per_page, request.args.get("product_id")
+    )
+    return db_json_response(movements)
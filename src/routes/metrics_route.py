@@ -0,0 +1,17 @@
+from flask import Blueprint, Response
+from flask_jwt_extended import jwt_required, get_jwt
+
+from src.services.metrics_service import get_metrics
+from src.utils.exception_handlers import ValueCustomError
+from src.utils.json_responses import db_json_response
+
+metrics_route = Blueprint("metrics", __name__)
+
+
+@metrics_route.route("/", methods=["GET"])
+@jwt_required()
+def get_app_metrics() -> tuple[Response, int]:
+    token_role = get_jwt().get("role")
+    if token_role != 0:
+        raise ValueCustomError("not_auth")
+    return db_json_response(get_metrics())
@@ -1,23 +1,35 @@
+from datetime import datetime
+
+from bson import ObjectId
 from flask import request, Blueprint, Response
 from flask_jwt_extended import get_jwt, jwt_required
 from pymongo.errors import PyMongoError
 
+from config import RATE_LIMIT_ADD_ORDER_ACCOUNT
+from src.models.inventory_model import InventoryMovementModel
 from src.models.order_model import OrderModel
 from src.models.product_model import ProductModel
+from src.models.report_model import ReportModel, TIMED_STATES
 from src.utils.json_responses import success_json_response, db_json_response
 from src.utils.exception_handlers import ValueCustomError
-from src.services.db_service import client
+from src.utils.models_helpers import get_batch_ids, sort_by_ids
+from src.services.db_service import run_in_transaction
+from src.services.rate_limit_service import rate_limit, RateLimit
 from src.services.bar_service import check_manual_closure, check_schedule_bar
 
 ORDERS_RESOURCE = "orden"
-NOT_AUTHORIZED_TO_SET = ["created_at", "state"]
-NOT_AUTHORIZED_TO_UPDATE = ["created_at", "user_id"]
+NOT_AUTHORIZED_TO_SET = ["created_at", "state", "timeline"]
+NOT_AUTHORIZED_TO_UPDATE = ["created_at", "user_id", "timeline"]
+# Estados en los que el pedido tiene ingredientes reservados
+RESERVED_STATES = ("accepted", "cooking")
+MAX_ORDERS_PER_PAGE = 50
 
 orders_route = Blueprint("orders", __name__)
 
 
 @orders_route.route("/", methods=["POST"])
 @jwt_required()
+@rate_limit("add_order", RateLimit("account", *RATE_LIMIT_ADD_ORDER_ACCOUNT))
 def add_order() -> tuple[Response, int]:
     if not check_manual_closure():
         raise ValueCustomError("bar_closed_manually")
@@ -28,20 +40,45 @@ def add_order() -> tuple[Response, int]:
         if field in NOT_AUTHORIZED_TO_SET:
             raise ValueCustomError("not_auth_set", field)
     order_object = OrderModel(**order_data)
-    order_object.insert_order()
+    # Los pedidos en el local se crean ya aceptados, así que reservan los ingredientes al crearse
+    if order_object.state in RESERVED_STATES:
+
+        def insert_order_and_reserve(session):
+            ProductModel.reserve_stock(order_object.items, session)
+            return order_object.insert_order(session)
+
+        run_in_transaction(insert_order_and_reserve)
+    else:
+        order_object.insert_order()
     return success_json_response(ORDERS_RESOURCE, "añadida", 201)
 
 
 @orders_route.route("/")
 @jwt_required()
 def get_orders() -> tuple[Response, int]:
-    token_role = get_jwt().get("role")
+    token_data = get_jwt()
+    token_role = token_data.get("role")
+    ids = request.args.get("ids")
+    if ids:
+        order_ids = get_batch_ids(ids)
+        orders = OrderModel.get_orders_by_ids(
+            order_ids,
+            request.args.get("fields"),
+            None if token_role == 1 else token_data.get("sub"),
+        )
+        orders, missing = sort_by_ids(orders, order_ids)
+        return db_json_response({"orders": orders, "missing": missing})
     if token_role != 1:
         raise ValueCustomError("not_auth")
-    page = request.args.get("page", 1)
-    per_page = request.args.get("per-page", 10)
+    page = int(request.args.get("page", 1))
+    per_page = int(request.args.get("per-page", 10))
     skip = (page - 1) * per_page
-    orders = OrderModel.get_orders(skip, per_page)
+    orders = OrderModel.get_orders(
+        skip,
+        per_page,
+        request.args.get("fields"),
+        request.args.get("archived") == "true",
+    )
     return db_json_response(orders)
 
 
@@ -53,17 +90,37 @@ def get_user_orders(user_id):
     token_role = token_data.get("role")
     if not any([token_id == user_id, token_role == 1]):
         raise ValueCustomError("not_auth")
-    page = request.args.get("page", 1)
-    per_page = request.args.get("per_page", 10)
-    skip = (page - 1) * per_page
-    user_orders = OrderModel.get_orders_by_user_id(user_id, skip, per_page)
-    return db_json_response(user_orders)
+    try:
+        per_page = int(request.args.get("per-page", 10))
+    except ValueError:
+        raise ValueCustomError("invalid_value", "per-page")
+    per_page = max(1, min(per_page, MAX_ORDERS_PER_PAGE))
+    # Cursor "<created_at>_<_id>" del último pedido de la página anterior. También se acepta sólo la fecha.
+    before, _, before_id = (request.args.get("before") or "").partition("_")
+    try:
+        before = datetime.fromisoformat(before) if before else None
+    except ValueError:
+        raise ValueCustomError("invalid_value", "before")
+    if before_id and not ObjectId.is_valid(before_id):
+        raise ValueCustomError("invalid_value", "before")
+    user_orders = OrderModel.get_orders_by_user_id(
+        user_id,
+        per_page,
+        before,
+        request.args.get("detail") == "full",
+        before_id or None,
+    )
+    next_cursor = (
+        f"{user_orders[-1]['created_at']}_{user_orders[-1]['_id']}"
+        if len(user_orders) == per_page
+        else None
+    )
+    return db_json_response({"orders": user_orders, "next": next_cursor})
 
 
 @orders_route.route("/<order_id>", methods=["PUT"])
 @jwt_required()
 def update_order(order_id):
-    session = client.start_session()
     token = get_jwt()
     token_role = token.get("role")
     token_id = token.get("sub")
@@ -78,22 +135,69 @@ def update_order(order_id):
             field in NOT_AUTHORIZED_TO_UPDATE
         ):
             raise ValueCustomError("not_auth_set", field)
+    # Los artículos de un pedido con reserva no cambian: la liberación y el descuento usan lo que se reservó
+    if "items" in order_new_data and order["state"] in RESERVED_STATES:
+        raise ValueCustomError("not_auth_set", "items")
     if order_new_data.get("state") and order["state"] != order_new_data["state"]:
         OrderModel.check_level_state(order_new_data.get("state"), order["state"])
     order_mixed_data = {**order, **order_new_data}
     order_object = OrderModel(**order_mixed_data)
-    try:
-        session.start_transaction()
-        updated_order = order_object.update_order(order_id, session)
-        if order_object.state == "ready" and order["state"] != "ready":
-            ProductModel.update_product_stock_by_name(order_object.items, session)
-        session.commit_transaction()
-        return db_json_response(updated_order)
-    except Exception as e:
-        session.abort_transaction()
-        raise e
-    finally:
-        session.end_session()
+    state_changed = order_object.state != order["state"]
+    now = datetime.now()
+    event = {"state": order_object.state, "at": now} if state_changed else None
+    # Tiempo que ha pasado el pedido en el estado que abandona. Los pedidos sin historial no se miden.
+    timeline = order.get("timeline")
+    state_duration = None
+    if (
+        state_changed
+        and order["state"] in TIMED_STATES
+        and timeline
+        and timeline[-1]["state"] == order["state"]
+    ):
+        state_duration = (
+            now - datetime.fromisoformat(timeline[-1]["at"])
+        ).total_seconds()
+
+    # Reserva al aceptar, libera al cancelar un pedido con reserva y descuenta del stock al estar listo
+    def update_order_and_related(session):
+        updated_order = order_object.update_order(
+            order_id, session, order["state"], event
+        )
+        if not updated_order:
+            raise ValueCustomError("conflict", ORDERS_RESOURCE)
+        if state_duration is not None:
+            ReportModel.add_state_duration(
+                order_object.model_dump(), order["state"], state_duration, session
+            )
+        if state_changed:
+            if order_object.state == "accepted":
+                ProductModel.reserve_stock(order_object.items, session)
+            elif order_object.state == "canceled" and order["state"] in RESERVED_STATES:
+                ProductModel.release_stock(order_object.items, session)
+            elif order_object.state == "ready":
+                consumed = ProductModel.commit_stock(order_object.items, session)
+                product_ids = ProductModel.get_product_ids(list(consumed), session)
+                InventoryMovementModel.insert_movements(
+                    [
+                        InventoryMovementModel(
+                            product_id=product_ids[product],
+                            product=product,
+                            qty=-qty,
+                            reason="order",
+                            order_id=order_id,
+                        )
+                        for product, qty in consumed.items()
+                        if qty and product in product_ids
+                    ],
+                    session,
+                )
+                ReportModel.add_order_consumption(order_object.model_dump(), session)
+            elif order_object.state == "delivered":
+                ReportModel.add_order_sale(order_object.model_dump(), session)
+        return updated_order
+
+    updated_order = run_in_transaction(update_order_and_related)
+    return db_json_response(updated_order)
 
 
 @orders_route.route("/<order_id>", methods=["GET", "DELETE"])
@@ -104,7 +208,9 @@ def handle_order(order_id):
     token_role = token_data.get("role")
 
     if request.method == "GET":
-        order = OrderModel.get_order(order_id)
+        order = OrderModel.get_order(
+            order_id, request.args.get("fields"), include_archive=True
+        )
         if not order:
             raise ValueCustomError("not_found", ORDERS_RESOURCE)
         user_order = order.get("user_id")
@@ -115,6 +221,20 @@ def handle_order(order_id):
     if request.method == "DELETE":
         if token_role != 1:
             raise ValueCustomError("not_auth")
+        order = OrderModel.get_order(order_id)
+        # Un pedido con reserva libera sus ingredientes en la misma transacción en la que se borra
+        if order and order["state"] in RESERVED_STATES:
+
+            def delete_order_and_release(session):
+                deleted_order = OrderModel.delete_order(
+                    order_id, session, order["state"]
+                )
+                if not deleted_order.deleted_count:
+                    raise ValueCustomError("conflict", ORDERS_RESOURCE)
+                ProductModel.release_stock(order["items"], session)
+
+            run_in_transaction(delete_order_and_release)
+            return success_json_response(ORDERS_RESOURCE, "eliminada")
         deleted_order = OrderModel.delete_order(order_id)
         if not deleted_order.deleted_count > 0:
             raise ValueCustomError("not_found", ORDERS_RESOURCE)
@@ -4,11 +4,16 @@ from pymongo.errors import PyMongoError
 
 from src.models.product_model import ProductModel
 from src.models.dish_model import DishModel
+from src.models.inventory_model import InventoryMovementModel
 from src.utils.exception_handlers import ValueCustomError
 from src.utils.json_responses import success_json_response, db_json_response
-from src.services.db_service import client
+from src.utils.models_helpers import get_batch_ids, sort_by_ids
+from src.services.db_service import run_in_transaction
+from src.services.menu_snapshot_service import refresh_menu
+from src.services.search_service import product_catalog, products_search
 
 PRODUCTS_RESOURCE = "producto"
+MAX_SEARCH_RESULTS = 50
 
 products_route = Blueprint("products", __name__)
 
@@ -16,14 +21,35 @@ products_route = Blueprint("products", __name__)
 @products_route.route("/", methods=["POST"])
 @jwt_required()
 def add_product() -> tuple[Response, int]:
-    token_role = get_jwt().get("role")
+    token = get_jwt()
+    token_role = token.get("role")
     if token_role != 1:
         raise ValueCustomError("not_auth")
     product_data = request.get_json()
     if product_data.get("created_at"):
         raise ValueCustomError("not_auth_set", "created_at")
+    if "reserved" in product_data:
+        raise ValueCustomError("not_auth_set", "reserved")
     product_object = ProductModel(**product_data)
-    product_object.insert_product()
+
+    # El stock inicial queda en el registro como apertura del producto, aunque sea 0
+    def insert_product_and_movement(session):
+        new_product = product_object.insert_product(session)
+        InventoryMovementModel.insert_movements(
+            [
+                InventoryMovementModel(
+                    product_id=str(new_product.inserted_id),
+                    product=product_object.name,
+                    qty=product_object.stock,
+                    reason="opening",
+                    user_id=token.get("sub"),
+                )
+            ],
+            session,
+        )
+
+    run_in_transaction(insert_product_and_movement)
+    product_catalog.invalidate()
     return success_json_response(PRODUCTS_RESOURCE, "añadido", 201)
 
 
@@ -33,18 +59,38 @@ def get_products() -> tuple[Response, int]:
     token_role = get_jwt().get("role")
     if not any([token_role == 1, token_role == 2]):
         raise ValueCustomError("not_auth")
+    ids = request.args.get("ids")
+    if ids:
+        product_ids = get_batch_ids(ids)
+        products = ProductModel.get_products_by_ids(
+            product_ids, request.args.get("fields")
+        )
+        products, missing = sort_by_ids(products, product_ids)
+        return db_json_response({"products": products, "missing": missing})
     page = int(request.args.get("page", 1))
     per_page = int(request.args.get("per-page", 10))
     skip = (page - 1) * per_page
-    products = ProductModel.get_products(skip, per_page)
+    products = ProductModel.get_products(skip, per_page, request.args.get("fields"))
+    return db_json_response(products)
+
+
+@products_route.route("/search", methods=["GET"])
+@jwt_required()
+def search_products() -> tuple[Response, int]:
+    token_role = get_jwt().get("role")
+    if not any([token_role == 1, token_role == 2]):
+        raise ValueCustomError("not_auth")
+    query = request.args.get("q", "")
+    limit = min(int(request.args.get("limit", 10)), MAX_SEARCH_RESULTS)
+    products = products_search.search(query, limit)
     return db_json_response(products)
 
 
 @products_route.route("/<product_id>", methods=["PUT"])
 @jwt_required()
 def update_product(product_id) -> tuple[Response, int]:
-    session = client.start_session()
-    token_role = get_jwt().get("role")
+    token = get_jwt()
+    token_role = token.get("role")
     if not any([token_role == 1, token_role == 2]):
         raise ValueCustomError("not_auth")
     product = ProductModel.get_product(product_id)
@@ -55,13 +101,36 @@ def update_product(product_id) -> tuple[Response, int]:
         "created_at"
     ] != product.get("created_at"):
         raise ValueCustomError("not_auth_set", "created_at")
+    # Las reservas sólo las modifican los pedidos
+    if "reserved" in new_product_data and new_product_data["reserved"] != product.get(
+        "reserved", 0
+    ):
+        raise ValueCustomError("not_auth_set", "reserved")
     combined_data = {**product, **new_product_data}
     product_object = ProductModel(**combined_data)
-    try:
-        session.start_transaction()
-        updated_product = product_object.update_product(product_id, session)
+
+    # La variación del registro se calcula con el stock que había justo antes de la escritura
+    def update_product_and_dishes(session):
+        previous_product, updated_product = product_object.update_product(
+            product_id, session
+        )
+        if not previous_product:
+            raise ValueCustomError("not_found", PRODUCTS_RESOURCE)
         updated_product_stock = updated_product.get("stock")
-        product_stock = product.get("stock")
+        product_stock = previous_product.get("stock")
+        if product_stock != updated_product_stock:
+            InventoryMovementModel.insert_movements(
+                [
+                    InventoryMovementModel(
+                        product_id=product_id,
+                        product=updated_product.get("name"),
+                        qty=updated_product_stock - product_stock,
+                        reason="adjustment",
+                        user_id=token.get("sub"),
+                    )
+                ],
+                session,
+            )
         if product_stock != updated_product_stock and 0 in (
             updated_product_stock,
             product_stock,
@@ -69,13 +138,16 @@ def update_product(product_id) -> tuple[Response, int]:
             DishModel.update_dishes_availability(
                 updated_product.get("name"), updated_product_stock != 0, session
             )
-        session.commit_transaction()
-        return db_json_response(updated_product)
-    except Exception as e:
-        session.abort_transaction()
-        raise e
-    finally:
-        session.end_session()
+        if updated_product.get("allergens") != previous_product.get("allergens"):
+            DishModel.update_dishes_allergens(
+                updated_product.get("name"), updated_product.get("allergens"), session
+            )
+        return updated_product
+
+    updated_product = run_in_transaction(update_product_and_dishes)
+    refresh_menu()
+    product_catalog.invalidate()
+    return db_json_response(updated_product)
 
 
 @products_route.route("/<product_id>", methods=["GET", "DELETE"])
@@ -86,7 +158,7 @@ def handle_product(product_id: str) -> tuple[Response, int]:
     if request.method == "GET":
         if not any([token_role == 1, token_role == 2]):
             raise ValueCustomError("not_auth")
-        product = ProductModel.get_product(product_id)
+        product = ProductModel.get_product(product_id, request.args.get("fields"))
         if product:
             return db_json_response(product)
         else:
@@ -97,6 +169,7 @@ def handle_product(product_id: str) -> tuple[Response, int]:
             raise ValueCustomError("not_auth")
         deleted_product = ProductModel.delete_product(product_id)
         if deleted_product.deleted_count > 0:
+            product_catalog.invalidate()
             return success_json_response(PRODUCTS_RESOURCE, "eliminado")
         else:
             raise ValueCustomError("not_found", PRODUCTS_RESOURCE)
@@ -0,0 +1,184 @@
+from datetime import date, timedelta
+
+from flask import Blueprint, request, Response
+from flask_jwt_extended import jwt_required, get_jwt
+
+from src.models.report_model import ReportModel, TIMED_STATES, get_percentiles
+from src.utils.exception_handlers import ValueCustomError
+from src.utils.json_responses import db_json_response
+
+reports_route = Blueprint("reports", __name__)
+
+
+# Función para obtener el rango de fechas de la consulta. Por defecto, los últimos 7 días.
+def get_date_range() -> tuple[str, str]:
+    try:
+        end = date.fromisoformat(request.args.get("end", date.today().isoformat()))
+        start = date.fromisoformat(
+            request.args.get("start", (end - timedelta(days=6)).isoformat())
+        )
+    except ValueError:
+        raise ValueCustomError("invalid_value", "start, end")
+    if start > end:
+        raise ValueCustomError("invalid_value", "start, end")
+    return start.isoformat(), end.isoformat()
+
+
+@reports_route.route("/sales", methods=["GET"])
+@jwt_required()
+def get_sales_report() -> tuple[Response, int]:
+    token_role = get_jwt().get("role")
+    if token_role > 1:
+        raise ValueCustomError("not_auth")
+    group_by = request.args.get("group_by", "day")
+    if group_by not in ("day", "service"):
+        raise ValueCustomError("invalid_value", "group_by")
+    top = request.args.get("top", 10, type=int)
+    start, end = get_date_range()
+    reports = ReportModel.get_reports(
+        start, end, {"orders": 1, "revenue": 1, "dishes": 1}
+    )
+
+    periods = {}
+    dishes = {}
+    for report in reports:
+        period_key = (
+            report["date"] if group_by == "day" else (report["date"], report["service"])
+        )
+        period = periods.setdefault(
+            period_key,
+            {
+                "date": report["date"],
+                **({"service": report["service"]} if group_by == "service" else {}),
+                "orders": 0,
+                "revenue": 0,
+            },
+        )
+        period["orders"] += report.get("orders", 0)
+        period["revenue"] += report.get("revenue", 0)
+        for dish in report.get("dishes", {}).values():
+            total_dish = dishes.setdefault(
+                dish["name"], {"name": dish["name"], "qty": 0, "revenue": 0}
+            )
+            total_dish["qty"] += dish.get("qty", 0)
+            total_dish["revenue"] += dish.get("revenue", 0)
+
+    periods = list(periods.values())
+    return db_json_response(
+        {
+            "start": start,
+            "end": end,
+            "orders": sum(period["orders"] for period in periods),
+            "revenue": round(sum(period["revenue"] for period in periods), 2),
+            "periods": periods,
+            "top_dishes": sorted(
+                dishes.values(), key=lambda dish: dish["qty"], reverse=True
+            )[:top],
+        }
+    )
+
+
+@reports_route.route("/ingredients", methods=["GET"])
+@jwt_required()
+def get_ingredients_report() -> tuple[Response, int]:
+    token_role = get_jwt().get("role")
+    if token_role > 1:
+        raise ValueCustomError("not_auth")
+    start, end = get_date_range()
+    reports = ReportModel.get_reports(start, end, {"ingredients": 1})
+
+    ingredients = {}
+    for report in reports:
+        for ingredient in report.get("ingredients", {}).values():
+            total_ingredient = ingredients.setdefault(
+                ingredient["name"], {"name": ingredient["name"], "consumed": 0}
+            )
+            total_ingredient["consumed"] += ingredient.get("consumed", 0)
+
+    return db_json_response(
+        {
+            "start": start,
+            "end": end,
+            "ingredients": sorted(
+                ingredients.values(),
+                key=lambda ingredient: ingredient["consumed"],
+                reverse=True,
+            ),
+        }
+    )
+
+
+# Suma los histogramas de "source" en "target"
+def merge_buckets(target: dict, source: dict) -> None:
+    for bucket, count in source.items():
+        target[bucket] = target.get(bucket, 0) + count
+
+
+def get_timing_stats(timing: dict) -> dict:
+    return {
+        "count": timing["count"],
+        "avg": round(timing["total"] / timing["count"], 1) if timing["count"] else None,
+        **get_percentiles(timing["buckets"]),
+    }
+
+
+# Tiempos de cocina: percentiles del tiempo en cada estado, por servicio y por plato (tiempo en "cooking")
+@reports_route.route("/kitchen", methods=["GET"])
+@jwt_required()
+def get_kitchen_report() -> tuple[Response, int]:
+    token_role = get_jwt().get("role")
+    if token_role > 2:
+        raise ValueCustomError("not_auth")
+    start, end = get_date_range()
+    reports = ReportModel.get_reports(start, end, {"timings": 1})
+
+    states = {}
+    services = {}
+    dishes = {}
+    for report in reports:
+        timings = report.get("timings", {})
+        for state in TIMED_STATES:
+            if state not in timings:
+                continue
+            for totals in (
+                states.setdefault(state, {"count": 0, "total": 0, "buckets": {}}),
+                services.setdefault(report["service"], {}).setdefault(
+                    state, {"count": 0, "total": 0, "buckets": {}}
+                ),
+            ):
+                totals["count"] += timings[state].get("count", 0)
+                totals["total"] += timings[state].get("total", 0)
+                merge_buckets(totals["buckets"], timings[state].get("buckets", {}))
+        for dish in timings.get("dishes", {}).values():
+            total_dish = dishes.setdefault(
+                dish["name"], {"name": dish["name"], "buckets": {}}
+            )
+            merge_buckets(total_dish["buckets"], dish.get("buckets", {}))
+
+    return db_json_response(
+        {
+            "start": start,
+            "end": end,
+            "states": {
+                state: get_timing_stats(timing) for state, timing in states.items()
+            },
+            "services": {
+                service: {
+                    state: get_timing_stats(timing) for state, timing in timings.items()
+                }
+                for service, timings in services.items()
+            },
+            "dishes": sorted(
+                (
+                    {
+                        "name": dish["name"],
+                        "count": sum(dish["buckets"].values()),
+                        **get_percentiles(dish["buckets"]),
+                    }
+                    for dish in dishes.values()
+                ),
+                key=lambda dish: dish["p90"] or 0,
+                reverse=True,
+            ),
+        }
+    )
@@ -0,0 +1,44 @@
+from flask import Blueprint, request, Response
+from flask_jwt_extended import jwt_required, get_jwt
+
+from src.models.session_model import SessionModel
+from src.services.security_service import revoke_session
+from src.utils.exception_handlers import ValueCustomError
+from src.utils.json_responses import success_json_response, db_json_response
+
+SESSIONS_RESOURCE = "sesión"
+
+sessions_route = Blueprint("sessions", __name__)
+
+
+@sessions_route.route("/", methods=["GET"])
+@jwt_required()
+def get_sessions() -> tuple[Response, int]:
+    token_role = get_jwt().get("role")
+    if token_role != 0:
+        raise ValueCustomError("not_auth")
+    page = int(request.args.get("page", 1))
+    per_page = int(request.args.get("per-page", 10))
+    skip = (page - 1) * per_page
+    sessions = SessionModel.get_sessions(skip, per_page)
+    return db_json_response(sessions)
+
+
+@sessions_route.route("/<session_id>", methods=["GET", "DELETE"])
+@jwt_required()
+def handle_session(session_id: str) -> tuple[Response, int]:
+    token_role = get_jwt().get("role")
+    if token_role != 0:
+        raise ValueCustomError("not_auth")
+
+    if request.method == "GET":
+        session = SessionModel.get_session(session_id)
+        if not session:
+            raise ValueCustomError("not_found", SESSIONS_RESOURCE)
+        return db_json_response(session)
+
+    if request.method == "DELETE":
+        revoked_session = revoke_session(session_id)
+        if not revoked_session:
+            raise ValueCustomError("not_found", SESSIONS_RESOURCE)
+        return success_json_response(SESSIONS_RESOURCE, "revocada")
@@ -2,6 +2,7 @@ from flask import Blueprint, request, Response
 from flask_jwt_extended import jwt_required, get_jwt
 
 from src.models.setting_model import SettingModel
+from src.services.opening_hours_service import opening_hours
 from src.utils.exception_handlers import ValueCustomError
 from src.utils.json_responses import success_json_response, db_json_response
 
@@ -21,6 +22,7 @@ def add_setting() -> tuple[Response, int]:
         raise ValueCustomError("not_auth_set", "updated_at")
     setting_object = SettingModel(**setting_data)
     setting_object.insert_setting()
+    opening_hours.invalidate()
     return success_json_response(SETTINGS_RESOURCE, "añadida", 201)
 
 
@@ -33,7 +35,7 @@ def get_settings() -> tuple[Response, int]:
     page = int(request.args.get("page", 1))
     per_page = int(request.args.get("per-page", 10))
     skip = (page - 1) * per_page
-    settings = SettingModel.get_settings(skip, per_page)
+    settings = SettingModel.get_settings(skip, per_page, request.args.get("fields"))
     return db_json_response(settings)
 
 
@@ -46,7 +48,7 @@ def handle_setting(setting_id: str) -> tuple[Response, int]:
         raise ValueCustomError("not_auth")
 
     if request.method == "GET":
-        setting = SettingModel.get_setting(setting_id)
+        setting = SettingModel.get_setting(setting_id, request.args.get("fields"))
         if not setting:
             raise ValueCustomError("not_found", SETTINGS_RESOURCE)
         return db_json_response(setting)
@@ -60,10 +62,12 @@ def handle_setting(setting_id: str) -> tuple[Response, int]:
         mixed_data.pop("updated_at", None)
         setting_object = SettingModel(**mixed_data)
         updated_setting = setting_object.update_setting(setting_id)
+        opening_hours.invalidate()
         return db_json_response(updated_setting)
 
     if request.method == "DELETE":
         deleted_setting = SettingModel.delete_setting(setting_id)
         if not deleted_setting.deleted_count > 0:
             raise ValueCustomError("not_found", SETTINGS_RESOURCE)
+        opening_hours.invalidate()
         return success_json_response(SETTINGS_RESOURCE, "eliminada")
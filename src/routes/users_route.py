@@ -1,12 +1,16 @@
+from bson import ObjectId
 from flask import Blueprint, request, Response
 from flask_jwt_extended import jwt_required, get_jwt
 
-from src.models.user_model import UserModel
-from src.services.security_service import delete_active_token, delete_refresh_token
+from src.models.user_model import UserModel, BASKET_ITEM_ADAPTER, ADDRESS_ADAPTER
+from src.services.security_service import revoke_user_sessions
 from src.utils.exception_handlers import ValueCustomError
 from src.utils.json_responses import success_json_response, db_json_response
+from src.utils.models_helpers import get_delivery_zone
 
 USERS_RESOURCE = "usuario"
+BASKET_ITEM_RESOURCE = "artículo de la cesta"
+ADDRESS_RESOURCE = "dirección"
 
 users_route = Blueprint("users", __name__)
 
@@ -38,10 +42,10 @@ def get_users() -> tuple[Response, int]:
     token_role = get_jwt().get("role")
     if token_role != 1:
         raise ValueCustomError("not_auth")
-    page = request.args.get("page", 1)
-    per_page = request.args.get("per-page", 10)
+    page = int(request.args.get("page", 1))
+    per_page = int(request.args.get("per-page", 10))
     skip = (page - 1) * per_page
-    users = UserModel.get_users(skip, per_page)
+    users = UserModel.get_users(skip, per_page, request.args.get("fields"))
     return db_json_response(users)
 
 
@@ -55,7 +59,7 @@ def handle_user(user_id: str) -> tuple[Response, int]:
         raise ValueCustomError("not_auth")
 
     if request.method == "GET":
-        user = UserModel.get_user_by_user_id_without_id(user_id)
+        user = UserModel.get_user_profile(user_id, request.args.get("fields"))
         if not user:
             raise ValueCustomError("not_found", USERS_RESOURCE)
         return db_json_response(user)
@@ -81,7 +85,9 @@ def handle_user(user_id: str) -> tuple[Response, int]:
                     continue
                 raise ValueCustomError("not_auth_set", field)
         combined_data = {**user, **user_new_data}
-        user_object = UserModel(**combined_data)
+        user_object = UserModel.model_validate(
+            combined_data, context={"stored_email": user.get("email")}
+        )
         updated_user = user_object.update_user(user_id)
         return db_json_response(updated_user)
 
@@ -89,6 +95,103 @@ def handle_user(user_id: str) -> tuple[Response, int]:
         deleted_user = UserModel.delete_user(user_id)
         if not deleted_user.deleted_count > 0:
             raise ValueCustomError("not_found", USERS_RESOURCE)
-        delete_active_token(token)
-        delete_refresh_token(user_id)
+        revoke_user_sessions(user_id)
         return success_json_response(USERS_RESOURCE, "eliminado")
+
+
+def check_user_access(user_id: str) -> None:
+    token = get_jwt()
+    if not any([token["sub"] == user_id, token["role"] == 1]):
+        raise ValueCustomError("not_auth")
+
+
+# Operaciones sobre la cesta: cada una es una única actualización atómica del array "basket"
+@users_route.route("/<user_id>/basket", methods=["POST", "DELETE"])
+@jwt_required()
+def handle_basket(user_id: str) -> tuple[Response, int]:
+    check_user_access(user_id)
+
+    if request.method == "POST":
+        item = BASKET_ITEM_ADAPTER.validate_python(request.get_json())
+        if item.get("item_id"):
+            raise ValueCustomError("not_auth_set", "item_id")
+        if item["qty"] < 1:
+            raise ValueCustomError("invalid_value", "qty")
+        if item.get("custom"):
+            item["custom"] = {
+                key: value for key, value in item["custom"].items() if value is False
+            } or None
+        basket = UserModel.add_basket_item(user_id, item)
+        if basket is None:
+            raise ValueCustomError("not_found", USERS_RESOURCE)
+        return db_json_response(basket)
+
+    if request.method == "DELETE":
+        basket = UserModel.clear_basket(user_id)
+        if basket is None:
+            raise ValueCustomError("not_found", USERS_RESOURCE)
+        return db_json_response(basket)
+
+
+@users_route.route("/<user_id>/basket/<item_id>", methods=["PATCH", "DELETE"])
+@jwt_required()
+def handle_basket_item(user_id: str, item_id: str) -> tuple[Response, int]:
+    check_user_access(user_id)
+
+    if request.method == "PATCH":
+        qty = request.get_json().get("qty")
+        if not isinstance(qty, int) or isinstance(qty, bool) or qty < 0:
+            raise ValueCustomError("invalid_value", "qty")
+        basket = (
+            UserModel.update_basket_item_qty(user_id, item_id, qty)
+            if qty
+            else UserModel.remove_basket_item(user_id, item_id)
+        )
+    else:
+        basket = UserModel.remove_basket_item(user_id, item_id)
+    if basket is None:
+        raise ValueCustomError("not_found", BASKET_ITEM_RESOURCE)
+    return db_json_response(basket)
+
+
+# Función para validar una dirección y asignarle su zona de reparto sin consultar la base de datos
+def validate_address(address_data: dict, address_id: str) -> dict:
+    address = ADDRESS_ADAPTER.validate_python(address_data)
+    for field in ("address_id", "zone"):
+        if field in address:
+            raise ValueCustomError("not_auth_set", field)
+    return {
+        **address,
+        "address_id": address_id,
+        "zone": get_delivery_zone(address["postal_code"]),
+    }
+
+
+@users_route.route("/<user_id>/addresses", methods=["GET", "POST"])
+@jwt_required()
+def handle_addresses(user_id: str) -> tuple[Response, int]:
+    check_user_access(user_id)
+
+    if request.method == "GET":
+        addresses = UserModel.get_addresses(user_id)
+    else:
+        address = validate_address(request.get_json(), str(ObjectId()))
+        addresses = UserModel.add_address(user_id, address)
+    if addresses is None:
+        raise ValueCustomError("not_found", USERS_RESOURCE)
+    return db_json_response(addresses)
+
+
+@users_route.route("/<user_id>/addresses/<address_id>", methods=["PUT", "DELETE"])
+@jwt_required()
+def handle_address(user_id: str, address_id: str) -> tuple[Response, int]:
+    check_user_access(user_id)
+
+    if request.method == "PUT":
+        address = validate_address(request.get_json(), address_id)
+        addresses = UserModel.update_address(user_id, address_id, address)
+    else:
+        addresses = UserModel.delete_address(user_id, address_id)
+    if addresses is None:
+        raise ValueCustomError("not_found", ADDRESS_RESOURCE)
+    return db_json_response(addresses)
@@ -0,0 +1,53 @@
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+import click
+
+from config import (
+    ORDER_ARCHIVE_BATCH_PAUSE,
+    ORDER_ARCHIVE_BATCH_SIZE,
+    ORDER_ARCHIVE_DAYS,
+    ORDER_ARCHIVE_MAX_BATCHES,
+)
+from src.models.order_model import OrderModel
+from src.services.metrics_service import increment, observe
+
+
+# Mueve a "orders_archive" los pedidos entregados o cancelados con más de "ORDER_ARCHIVE_DAYS" días, por lotes y con
+# una pausa entre lotes para no saturar la base de datos. No guarda progreso: cada lote es idempotente y los pedidos
+# ya movidos dejan de salir en la consulta, así que una ejecución interrumpida se retoma donde se quedó.
+def archive_orders(
+    max_batches: Optional[int] = ORDER_ARCHIVE_MAX_BATCHES,
+    batch_size: int = ORDER_ARCHIVE_BATCH_SIZE,
+    pause: float = ORDER_ARCHIVE_BATCH_PAUSE,
+) -> int:
+    before = datetime.now() - timedelta(days=ORDER_ARCHIVE_DAYS)
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        if batches:
+            time.sleep(pause)
+        started = time.perf_counter()
+        orders = OrderModel.get_archivable_orders(before, batch_size)
+        if not orders:
+            break
+        archived += OrderModel.archive_orders(orders)
+        batches += 1
+        observe("orders.archive.batch_seconds", time.perf_counter() - started)
+        if len(orders) < batch_size:
+            break
+    increment("orders.archived", archived)
+    return archived
+
+
+@click.command("archive-orders")
+@click.option(
+    "--max-batches",
+    type=int,
+    default=None,
+    help="Número máximo de lotes. Por defecto, hasta archivar todos los pedidos.",
+)
+def archive_orders_command(max_batches: Optional[int]) -> None:
+    archived = archive_orders(max_batches)
+    click.echo(f"Pedidos archivados: {archived}")
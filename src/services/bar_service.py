@@ -1,46 +1,59 @@
 from datetime import datetime, time
+from typing import Optional
+from zoneinfo import ZoneInfo
 
 from src.models.setting_model import SettingModel
+from src.services.opening_hours_service import opening_hours
 
+# Franjas de los turnos de comida y cena con las que se agrupan los pedidos en los informes. El horario de apertura se
+# configura en el ajuste "opening_hours".
 OPEN_LUNCH = time(13, 0, 0)
 CLOSE_LUNCH = time(15, 59, 59)
 OPEN_DINNER = time(20, 0, 0)
 CLOSE_DINNER = time(23, 59, 59)
 
 
-def check_schedule_bar():
-    now = datetime.now()
-    now_time = now.time()
-    day_of_week = now.strftime("%A").lower()
+def check_schedule_bar() -> bool:
+    return opening_hours.get_state().schedule_open
 
-    if (
-        OPEN_LUNCH <= now_time <= CLOSE_LUNCH or OPEN_DINNER <= now_time <= CLOSE_DINNER
-    ) and day_of_week != "monday":
-        return True
 
-    return False
+def check_manual_closure() -> bool:
+    return not opening_hours.get_state().manually_closed
 
 
-def check_manual_closure():
+# Tarea del planificador: deja de nuevo a "false" el ajuste cuando el cierre manual ha vencido
+def reopen_manual_closure() -> bool:
     manual_closure = SettingModel.get_setting_by_name("manual_closure")
-
-    if manual_closure["value"]:
-        closing_time = datetime.fromisoformat(manual_closure["updated_at"]).time()
-        now_time = datetime.now().time()
-
-        close_in_lunch_time = OPEN_LUNCH <= closing_time <= CLOSE_LUNCH
-        close_in_dinner_time = OPEN_DINNER <= closing_time <= CLOSE_DINNER
-
-        in_lunch_time = OPEN_LUNCH <= now_time <= CLOSE_LUNCH
-        in_dinner_time = OPEN_DINNER <= now_time <= CLOSE_DINNER
-
-        if (close_in_lunch_time and in_dinner_time) or (
-            close_in_dinner_time and in_lunch_time
-        ):
-            SettingModel(value=False, name="manual_closure").update_setting(
-                manual_closure["_id"]
-            )
-            return True
+    if not manual_closure or manual_closure["value"] is not True:
         return False
-
-    return True
+    opening_hours.invalidate()
+    if opening_hours.get_state().manually_closed:
+        return False
+    updated_setting = SettingModel.update_setting_value_by_name(
+        "manual_closure",
+        False,
+        {
+            "value": True,
+            "updated_at": datetime.fromisoformat(manual_closure["updated_at"]),
+        },
+    )
+    opening_hours.invalidate()
+    return updated_setting.modified_count > 0
+
+
+def get_next_change(state) -> Optional[str]:
+    if state.next_change is None:
+        return None
+    return datetime.fromtimestamp(
+        state.next_change, ZoneInfo(state.timezone)
+    ).isoformat()
+
+
+def get_bar_status() -> dict:
+    state = opening_hours.get_state()
+    return {
+        "open": state.is_open,
+        "manual_closure": state.manually_closed,
+        "next_change": get_next_change(state),
+        "timezone": state.timezone,
+    }
@@ -0,0 +1,99 @@
+import gzip
+import hashlib
+import time
+from threading import Lock
+from typing import Optional
+
+from cachetools import LRUCache
+from flask import Response, request
+
+from config import COMPRESSION_CACHE_SIZE, COMPRESSION_MIN_SIZE
+from src.services.metrics_service import increment, observe, register_collector
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Respuestas iguales para todos los usuarios. Su versión comprimida se guarda para no comprimirla en cada petición.
+CACHEABLE_PATHS = ("/dishes", "/settings")
+
+_lock = Lock()
+_compressed_bodies = LRUCache(maxsize=COMPRESSION_CACHE_SIZE)
+_sizes = {"original": 0, "compressed": 0}
+
+
+def get_encoding() -> Optional[str]:
+    if brotli and request.accept_encodings["br"]:
+        return "br"
+    if request.accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    started = time.perf_counter()
+    if encoding == "br":
+        compressed_body = brotli.compress(body, quality=5)
+    else:
+        compressed_body = gzip.compress(body, compresslevel=6)
+    observe(f"compression.{encoding}.seconds", time.perf_counter() - started)
+    return compressed_body
+
+
+# Las respuestas cacheables se identifican por el contenido, de modo que cada versión de la carta o de los ajustes se
+# comprime una sola vez y deja de usarse en cuanto cambia.
+def get_compressed_body(body: bytes, encoding: str, cacheable: bool) -> bytes:
+    if not cacheable:
+        return compress(body, encoding)
+    key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+    with _lock:
+        compressed_body = _compressed_bodies.get(key)
+    if compressed_body is not None:
+        increment("compression.cache_hits")
+        return compressed_body
+    increment("compression.cache_misses")
+    compressed_body = compress(body, encoding)
+    with _lock:
+        _compressed_bodies[key] = compressed_body
+    return compressed_body
+
+
+# Se registra con "after_request". Solo comprime respuestas JSON completas en memoria; los ficheros servidos desde
+# disco ("direct_passthrough") y las respuestas ya codificadas se dejan como están.
+def compress_response(response: Response) -> Response:
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.mimetype != "application/json"
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    encoding = get_encoding()
+    if len(body) < COMPRESSION_MIN_SIZE or not encoding:
+        return response
+    cacheable = request.method == "GET" and request.path.startswith(CACHEABLE_PATHS)
+    compressed_body = get_compressed_body(body, encoding, cacheable)
+    response.set_data(compressed_body)
+    response.headers["Content-Encoding"] = encoding
+    with _lock:
+        _sizes["original"] += len(body)
+        _sizes["compressed"] += len(compressed_body)
+    return response
+
+
+def get_compression_metrics() -> dict:
+    with _lock:
+        original, compressed = _sizes["original"], _sizes["compressed"]
+        cached_bodies = len(_compressed_bodies)
+    return {
+        "original_bytes": original,
+        "compressed_bytes": compressed,
+        "ratio": compressed / original if original else 0,
+        "cached_bodies": cached_bodies,
+    }
+
+
+register_collector("compression", get_compression_metrics)
@@ -1,15 +1,28 @@
-from typing import Union
+import random
+import time
+from typing import Callable, TypeVar, Union
 
 from flask import Response
+from pymongo.client_session import ClientSession
 from pymongo.database import Database
 from pymongo.mongo_client import MongoClient
 from pymongo.errors import PyMongoError
 
-from config import DATABASE_URI
+from config import DATABASE_URI, QUERY_PLAN_CHECK
+from src.services.metrics_service import increment
+from src.services.query_plan_service import query_recorder
 from src.utils.exception_handlers import handle_mongodb_exception
 
+T = TypeVar("T")
 
-client = MongoClient(DATABASE_URI)
+TRANSACTION_MAX_ATTEMPTS = 5
+TRANSACTION_BACKOFF_BASE = 0.05
+TRANSACTION_BACKOFF_MAX = 1.0
+
+
+client = MongoClient(
+    DATABASE_URI, event_listeners=[query_recorder] if QUERY_PLAN_CHECK else []
+)
 
 
 def db_connection() -> Union[Database, tuple[Response, int]]:
@@ -22,3 +35,67 @@ def db_connection() -> Union[Database, tuple[Response, int]]:
 
 # Instancias necesarias para la conexión a la base de datos, el cifrado de contraseñas y autenticación JWT
 db = db_connection()
+
+
+# Espera aleatoria con crecimiento exponencial ("full jitter") entre reintentos
+def transaction_backoff(attempt: int) -> float:
+    return random.uniform(
+        0, min(TRANSACTION_BACKOFF_MAX, TRANSACTION_BACKOFF_BASE * 2 ** (attempt - 1))
+    )
+
+
+def has_error_label(error: Exception, label: str) -> bool:
+    return isinstance(error, PyMongoError) and error.has_error_label(label)
+
+
+# Ejecuta "operations" dentro de una transacción. La sesión se inicia sólo al llamar a esta función, después de las
+# comprobaciones de la ruta, y se cierra siempre. Se reintenta la transacción completa ante "TransientTransactionError"
+# y el commit ante "UnknownTransactionCommitResult".
+def run_in_transaction(
+    operations: Callable[[ClientSession], T],
+    max_attempts: int = TRANSACTION_MAX_ATTEMPTS,
+) -> T:
+    with client.start_session() as session:
+        attempt = 1
+        while True:
+            session.start_transaction()
+            try:
+                result = operations(session)
+            except Exception as e:
+                session.abort_transaction()
+                increment("transactions.aborted")
+                if (
+                    has_error_label(e, "TransientTransactionError")
+                    and attempt < max_attempts
+                ):
+                    increment("transactions.retries")
+                    time.sleep(transaction_backoff(attempt))
+                    attempt += 1
+                    continue
+                raise e
+
+            commit_attempt = 1
+            while True:
+                try:
+                    session.commit_transaction()
+                    increment("transactions.committed")
+                    return result
+                except PyMongoError as e:
+                    if (
+                        has_error_label(e, "UnknownTransactionCommitResult")
+                        and commit_attempt < max_attempts
+                    ):
+                        increment("transactions.commit_retries")
+                        time.sleep(transaction_backoff(commit_attempt))
+                        commit_attempt += 1
+                        continue
+                    increment("transactions.aborted")
+                    if (
+                        has_error_label(e, "TransientTransactionError")
+                        and attempt < max_attempts
+                    ):
+                        increment("transactions.retries")
+                        time.sleep(transaction_backoff(attempt))
+                        attempt += 1
+                        break
+                    raise e
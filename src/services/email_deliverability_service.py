@@ -0,0 +1,65 @@
+import time
+from threading import Lock
+
+from cachetools import TTLCache
+from email_validator import EmailUndeliverableError
+from email_validator.deliverability import validate_email_deliverability
+
+from config import (
+    EMAIL_DELIVERABILITY_MODE,
+    EMAIL_DELIVERABILITY_NEGATIVE_TTL,
+    EMAIL_DELIVERABILITY_TTL,
+    EMAIL_DNS_TIMEOUT,
+)
+from src.services.metrics_service import increment, observe
+
+
+# Caché por dominio del resultado de la consulta DNS (MX, o A/AAAA en su defecto) que indica si el dominio acepta
+# correo. Los dominios que no lo aceptan también se guardan, durante menos tiempo. Si la consulta no llega a
+# completarse (tiempo agotado, sin servidores DNS) el email se acepta y no se guarda nada.
+class DeliverabilityCache:
+    def __init__(
+        self,
+        mode: str = EMAIL_DELIVERABILITY_MODE,
+        ttl: int = EMAIL_DELIVERABILITY_TTL,
+        negative_ttl: int = EMAIL_DELIVERABILITY_NEGATIVE_TTL,
+        timeout: float = EMAIL_DNS_TIMEOUT,
+    ):
+        self.mode = mode
+        self.timeout = timeout
+        self._lock = Lock()
+        self._deliverable = TTLCache(maxsize=10000, ttl=ttl)
+        self._undeliverable = TTLCache(maxsize=10000, ttl=negative_ttl)
+
+    def check(self, domain: str, domain_i18n: str) -> None:
+        if self.mode == "offline":
+            return
+        with self._lock:
+            deliverable = domain in self._deliverable
+            error_message = self._undeliverable.get(domain)
+        if deliverable:
+            increment("email_deliverability.hits")
+            return
+        if error_message:
+            increment("email_deliverability.hits")
+            raise EmailUndeliverableError(error_message)
+        increment("email_deliverability.misses")
+        started = time.perf_counter()
+        try:
+            deliverability_info = validate_email_deliverability(
+                domain, domain_i18n, timeout=self.timeout
+            )
+        except EmailUndeliverableError as e:
+            with self._lock:
+                self._undeliverable[domain] = str(e)
+            raise
+        finally:
+            observe("email_deliverability.dns_seconds", time.perf_counter() - started)
+        if "unknown-deliverability" in deliverability_info:
+            increment("email_deliverability.unknown")
+            return
+        with self._lock:
+            self._deliverable[domain] = True
+
+
+deliverability_cache = DeliverabilityCache()
@@ -0,0 +1,49 @@
+import click
+from pymongo.database import Database
+from pymongo.errors import OperationFailure
+
+from src.models.dish_model import DishModel
+from src.models.inventory_model import InventoryMovementModel, InventorySnapshotModel
+from src.models.order_model import OrderModel
+from src.models.product_model import ProductModel
+from src.models.report_model import ReportModel
+from src.models.session_model import SessionModel
+from src.models.setting_model import SettingModel
+from src.models.token_model import TokenModel
+from src.models.user_model import UserModel
+from src.services.db_service import db
+from src.services.rate_limit_service import MongoRateLimitBackend
+
+# Registro de índices por colección. Cada modelo declara los suyos en "INDEXES".
+INDEX_REGISTRY = {
+    "users": UserModel.INDEXES,
+    "dishes": DishModel.INDEXES,
+    "products": ProductModel.INDEXES,
+    "settings": SettingModel.INDEXES,
+    "orders": OrderModel.INDEXES,
+    "orders_archive": OrderModel.ARCHIVE_INDEXES,
+    "sessions": SessionModel.INDEXES,
+    "email_tokens": TokenModel.INDEXES,
+    "reports": ReportModel.INDEXES,
+    "inventory_movements": InventoryMovementModel.INDEXES,
+    "inventory_snapshots": InventorySnapshotModel.INDEXES,
+    "rate_limits": MongoRateLimitBackend.INDEXES,
+}
+
+
+# "create_indexes" no hace nada si el índice ya existe con la misma definición, por lo que se puede aplicar en cada
+# arranque. Un índice con el mismo nombre y distinta definición se informa como error y no se modifica.
+def ensure_indexes(database: Database = db) -> dict:
+    result = {}
+    for collection, indexes in INDEX_REGISTRY.items():
+        try:
+            result[collection] = database[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            result[collection] = {"error": str(e)}
+    return result
+
+
+@click.command("ensure-indexes")
+def ensure_indexes_command() -> None:
+    for collection, indexes in ensure_indexes().items():
+        click.echo(f"{collection}: {indexes}")
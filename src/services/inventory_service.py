@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+import click
+
+from src.models.inventory_model import InventoryMovementModel, InventorySnapshotModel
+from src.models.product_model import ProductModel
+from src.services.metrics_service import increment
+
+# Las instantáneas sólo incluyen movimientos con esta antigüedad mínima, para no dejar fuera los de transacciones que
+# aún no se habían confirmado al tomarlas (su "created_at" se asigna antes de confirmar)
+SNAPSHOT_LAG = timedelta(minutes=5)
+# Diferencia mínima para considerar que el stock de un producto no cuadra con el registro
+STOCK_TOLERANCE = 1e-6
+
+
+# Stock de cada producto según el registro, por "_id": última instantánea más los movimientos posteriores hasta "until"
+def rebuild_stocks(until: Optional[datetime] = None) -> dict[str, float]:
+    snapshot = InventorySnapshotModel.get_latest_snapshot()
+    stocks = dict(snapshot["stocks"]) if snapshot else {}
+    since = snapshot["until"] if snapshot else None
+    for product_id, qty in InventoryMovementModel.get_totals(since, until).items():
+        stocks[product_id] = stocks.get(product_id, 0) + qty
+    return stocks
+
+
+# Tarea del planificador: guarda el stock acumulado hasta hace "SNAPSHOT_LAG"
+def take_inventory_snapshot() -> None:
+    until = datetime.now() - SNAPSHOT_LAG
+    InventorySnapshotModel.insert_snapshot(until, rebuild_stocks(until))
+    increment("inventory.snapshots")
+
+
+# Productos cuyo stock guardado no coincide con el reconstruido: {"_id": (nombre, guardado, reconstruido)}
+def get_stock_differences() -> dict[str, tuple]:
+    stored = ProductModel.get_stocks()
+    rebuilt = rebuild_stocks()
+    return {
+        product_id: (product["name"], product["stock"], rebuilt.get(product_id, 0))
+        for product_id, product in stored.items()
+        if abs(product["stock"] - rebuilt.get(product_id, 0)) > STOCK_TOLERANCE
+    }
+
+
+# Movimientos de apertura para los productos que aún no tienen: la diferencia entre el stock guardado y el reconstruido,
+# así la reconstrucción parte del stock real. Conviene lanzarlo sin pedidos en curso.
+def seed_inventory() -> list[str]:
+    opened_products = InventoryMovementModel.get_opened_products()
+    rebuilt = rebuild_stocks()
+    movements = [
+        InventoryMovementModel(
+            product_id=product_id,
+            product=product["name"],
+            qty=product["stock"] - rebuilt.get(product_id, 0),
+            reason="opening",
+            notes="Apertura del registro",
+        )
+        for product_id, product in ProductModel.get_stocks().items()
+        if product_id not in opened_products
+    ]
+    InventoryMovementModel.insert_movements(movements)
+    return [movement.product for movement in movements]
+
+
+@click.command("seed-inventory")
+def seed_inventory_command() -> None:
+    seeded_products = seed_inventory()
+    click.echo(f"Productos con apertura añadida: {len(seeded_products)}")
+
+
+@click.command("replay-inventory")
+@click.option(
+    "--apply", is_flag=True, help="Sustituye el stock guardado por el reconstruido."
+)
+def replay_inventory_command(apply: bool) -> None:
+    differences = get_stock_differences()
+    for name, stored, rebuilt in sorted(differences.values()):
+        click.echo(f"{name}: guardado {stored}, registro {rebuilt}")
+    if not differences:
+        click.echo("El stock coincide con el registro")
+    elif apply:
+        # Sin apertura, el stock reconstruido ignora el que tenía el producto antes del registro
+        opened_products = InventoryMovementModel.get_opened_products()
+        not_opened = sorted(
+            name
+            for product_id, (name, _, _) in differences.items()
+            if product_id not in opened_products
+        )
+        if not_opened:
+            click.echo(
+                f"Sin apertura en el registro, no se actualizan: {', '.join(not_opened)}"
+            )
+        updated = ProductModel.set_stocks(
+            {
+                product_id: rebuilt
+                for product_id, (_, _, rebuilt) in differences.items()
+                if product_id in opened_products
+            }
+        )
+        click.echo(f"Productos actualizados: {updated}")
@@ -0,0 +1,115 @@
+import time
+from threading import Lock
+from typing import Iterable, List, NamedTuple, Optional
+
+from config import MENU_CACHE_SECONDS
+from src.models.dish_model import DishModel
+from src.models.product_model import get_allowed_values
+from src.utils.exception_handlers import ValueCustomError
+
+
+# Los platos guardados antes de calcular "allergens" sólo tienen los alérgenos de cada ingrediente
+def get_dish_allergens(dish: dict) -> List[str]:
+    if "allergens" in dish:
+        return dish["allergens"] or []
+    return sorted(
+        {
+            allergen
+            for ingredient in dish.get("ingredients") or []
+            for allergen in ingredient.get("allergens") or []
+        }
+    )
+
+
+# Estado cargado del índice. Se sustituye entero en cada recarga, así una petición usa siempre platos, máscaras y
+# alérgenos de la misma carga aunque otra lo invalide o lo recargue a la vez.
+class MenuState(NamedTuple):
+    dishes: List[dict]
+    masks: List[int]
+    allergen_bits: dict
+    dishes_by_id: dict
+    loaded_at: float
+
+
+# Índice en memoria de la carta. Cada plato lleva una máscara de bits con sus alérgenos, de modo que filtrar por
+# alérgenos es una operación AND sobre enteros. Las posiciones de los bits siguen el orden del ajuste "allergens".
+# Se recarga al modificar platos o productos en este proceso y, como máximo, cada MENU_CACHE_SECONDS para recoger
+# cambios hechos desde otros procesos.
+class MenuIndex:
+    def __init__(self, ttl: int = MENU_CACHE_SECONDS):
+        self.ttl = ttl
+        self._lock = Lock()
+        self._state: Optional[MenuState] = None
+
+    def _load(self) -> MenuState:
+        dishes = DishModel.get_menu()
+        allergen_bits = {
+            allergen: 1 << position
+            for position, allergen in enumerate(get_allowed_values("allergens"))
+        }
+        dishes_allergens = [get_dish_allergens(dish) for dish in dishes]
+        for allergens in dishes_allergens:
+            for allergen in allergens:
+                allergen_bits.setdefault(allergen, 1 << len(allergen_bits))
+        return MenuState(
+            dishes=dishes,
+            masks=[
+                self._get_mask(allergen_bits, allergens)
+                for allergens in dishes_allergens
+            ],
+            allergen_bits=allergen_bits,
+            dishes_by_id={dish["_id"]: dish for dish in dishes},
+            loaded_at=time.monotonic(),
+        )
+
+    @staticmethod
+    def _get_mask(allergen_bits: dict, allergens: Iterable[str]) -> int:
+        mask = 0
+        for allergen in allergens:
+            mask |= allergen_bits.get(allergen, 0)
+        return mask
+
+    def _is_stale(self, state: Optional[MenuState]) -> bool:
+        return state is None or time.monotonic() - state.loaded_at > self.ttl
+
+    # Devuelve el estado en lugar de leer los atributos después: "invalidate" puede vaciarlos entre medias
+    def _ensure_loaded(self) -> MenuState:
+        state = self._state
+        if self._is_stale(state):
+            with self._lock:
+                state = self._state
+                if self._is_stale(state):
+                    state = self._load()
+                    self._state = state
+        return state
+
+    # Lista de platos cargada. Es el mismo objeto hasta la siguiente recarga.
+    def get_snapshot(self) -> List[dict]:
+        return self._ensure_loaded().dishes
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._state = None
+
+    # Platos con los ids indicados, en el mismo orden. Los ids que no están en la carta se omiten.
+    def get_dishes_by_ids(self, dish_ids: List[str]) -> List[dict]:
+        dishes_by_id = self._ensure_loaded().dishes_by_id
+        return [
+            dishes_by_id[dish_id] for dish_id in dish_ids if dish_id in dishes_by_id
+        ]
+
+    # Un alérgeno desconocido no excluiría ningún plato, así que se rechaza en lugar de ignorarlo
+    def get_dishes(self, exclude_allergens: Optional[List[str]] = None) -> List[dict]:
+        dishes, masks, allergen_bits, _, _ = self._ensure_loaded()
+        unknown_allergens = [
+            allergen
+            for allergen in exclude_allergens or []
+            if allergen not in allergen_bits
+        ]
+        if unknown_allergens:
+            raise ValueCustomError("invalid_value", "exclude_allergens")
+        excluded_mask = self._get_mask(allergen_bits, exclude_allergens or [])
+        return [dish for dish, mask in zip(dishes, masks) if not mask & excluded_mask]
+
+
+menu_index = MenuIndex()
@@ -0,0 +1,70 @@
+import gzip
+import json
+import os
+import tempfile
+
+from flask import Response, request, send_from_directory
+
+from config import MENU_SNAPSHOT_DIR
+from src.services.menu_service import menu_index
+from src.services.metrics_service import increment
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MENU_SNAPSHOT_FILE = "menu.json"
+# Variantes por orden de preferencia: (codificación, extensión)
+MENU_SNAPSHOT_ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+# Escribe el fichero en un temporal de la misma carpeta y lo sustituye de una vez, para que nunca se sirva a medias
+def write_atomically(path: str, content: bytes) -> None:
+    directory = os.path.dirname(path)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as temporary_file:
+            temporary_file.write(content)
+        os.replace(temporary_path, path)
+    except OSError:
+        os.unlink(temporary_path)
+        raise
+
+
+# Genera "menu.json" y sus variantes comprimidas a partir de la carta en memoria
+def write_menu_snapshot(directory: str = MENU_SNAPSHOT_DIR) -> None:
+    os.makedirs(directory, exist_ok=True)
+    content = json.dumps(menu_index.get_snapshot(), ensure_ascii=False).encode()
+    path = os.path.join(directory, MENU_SNAPSHOT_FILE)
+    write_atomically(path + ".gz", gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli:
+        write_atomically(path + ".br", brotli.compress(content))
+    write_atomically(path, content)
+    increment("menu_snapshot.writes")
+
+
+# Se llama después de cada cambio en platos, o en productos que afecte a la carta
+def refresh_menu() -> None:
+    menu_index.invalidate()
+    write_menu_snapshot()
+
+
+# Sirve la variante que acepte el cliente directamente desde disco. Flask añade un ETag fuerte por fichero y responde
+# 304 a las peticiones condicionales.
+def send_menu_snapshot(directory: str = MENU_SNAPSHOT_DIR) -> Response:
+    path = os.path.join(directory, MENU_SNAPSHOT_FILE)
+    if not os.path.exists(path):
+        write_menu_snapshot(directory)
+    filename, content_encoding = MENU_SNAPSHOT_FILE, None
+    for encoding, extension in MENU_SNAPSHOT_ENCODINGS:
+        if request.accept_encodings[encoding] and os.path.exists(path + extension):
+            filename, content_encoding = MENU_SNAPSHOT_FILE + extension, encoding
+            break
+    response = send_from_directory(
+        directory, filename, mimetype="application/json", conditional=True
+    )
+    if content_encoding:
+        response.headers["Content-Encoding"] = content_encoding
+    response.vary.add("Accept-Encoding")
+    return response
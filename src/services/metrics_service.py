@@ -0,0 +1,47 @@
+from collections import defaultdict
+from threading import Lock
+from typing import Callable
+
+# Métricas en memoria por proceso. Se exponen a través del endpoint "/metrics".
+_lock = Lock()
+_counters = defaultdict(int)
+_timings = {}
+_collectors = {}
+
+
+def increment(name: str, value: int = 1) -> None:
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, value: float) -> None:
+    with _lock:
+        timing = _timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+        timing["count"] += 1
+        timing["total"] += value
+        timing["max"] = max(timing["max"], value)
+
+
+# Registra una función que devuelve métricas calculadas en el momento de la consulta
+def register_collector(name: str, collector: Callable[[], dict]) -> None:
+    _collectors[name] = collector
+
+
+def get_metrics() -> dict:
+    with _lock:
+        counters = dict(_counters)
+        timings = {
+            name: {
+                **timing,
+                "avg": timing["total"] / timing["count"] if timing["count"] else 0,
+            }
+            for name, timing in _timings.items()
+        }
+    collected = {name: collector() for name, collector in _collectors.items()}
+    return {"counters": counters, "timings": timings, **collected}
+
+
+def reset_metrics() -> None:
+    with _lock:
+        _counters.clear()
+        _timings.clear()
@@ -0,0 +1,98 @@
+import re
+import time
+from threading import Event, Lock, Thread
+from typing import Optional
+
+import requests
+
+from config import GOOGLE_CLIENT_ID, GOOGLE_METADATA_URL, GOOGLE_OIDC_DEFAULT_TTL
+from src.services.metrics_service import increment, observe, register_collector
+from src.services.security_service import google
+
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+# Margen para renovar antes de que caduquen y espera entre reintentos si falla la descarga
+REFRESH_MARGIN_SECONDS = 60
+RETRY_SECONDS = 30
+
+
+def get_max_age(cache_control: Optional[str], default: int) -> int:
+    match = MAX_AGE_PATTERN.search(cache_control or "")
+    return int(match.group(1)) if match else default
+
+
+# Documento de descubrimiento y claves de firma de Google, descargados una vez por proceso y renovados en segundo plano
+# según su "Cache-Control". Se guardan en "server_metadata" del cliente de Authlib, que los usa en "parse_id_token" sin
+# volver a descargarlos. Si Google rota las claves antes de tiempo, Authlib vuelve a descargarlas al no encontrar el
+# "kid" del token.
+class GoogleOIDCCache:
+    def __init__(
+        self,
+        client,
+        metadata_url: str = GOOGLE_METADATA_URL,
+        default_ttl: int = GOOGLE_OIDC_DEFAULT_TTL,
+    ):
+        self.client = client
+        self.metadata_url = metadata_url
+        self.default_ttl = default_ttl
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+        self.expires_at = 0.0
+
+    def _fetch(self, url: str, name: str) -> tuple[dict, int]:
+        started = time.perf_counter()
+        response = requests.get(url, timeout=5)
+        response.raise_for_status()
+        observe(f"google_oidc.{name}_fetch_seconds", time.perf_counter() - started)
+        max_age = get_max_age(response.headers.get("Cache-Control"), self.default_ttl)
+        return response.json(), max_age
+
+    def refresh(self) -> None:
+        with self._lock:
+            metadata, metadata_max_age = self._fetch(self.metadata_url, "metadata")
+            jwks, jwks_max_age = self._fetch(metadata["jwks_uri"], "jwks")
+            self.client.server_metadata.update(
+                {**metadata, "jwks": jwks, "_loaded_at": time.time()}
+            )
+            self.expires_at = time.monotonic() + min(metadata_max_age, jwks_max_age)
+            increment("google_oidc.refreshes")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+                wait = max(
+                    self.expires_at - time.monotonic() - REFRESH_MARGIN_SECONDS,
+                    RETRY_SECONDS,
+                )
+            except (requests.RequestException, KeyError, ValueError):
+                increment("google_oidc.refresh_errors")
+                wait = RETRY_SECONDS
+            self._stop.wait(wait)
+
+    # Arranca la descarga inicial y la renovación periódica. Sólo se lanza un hilo por proceso.
+    def start(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = Thread(target=self._run, name="google-oidc", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def get_metrics(self) -> dict:
+        return {
+            "loaded": "jwks" in self.client.server_metadata,
+            "expires_in": max(self.expires_at - time.monotonic(), 0),
+        }
+
+
+google_oidc_cache = GoogleOIDCCache(google)
+register_collector("google_oidc", google_oidc_cache.get_metrics)
+
+
+def prewarm_google_oidc() -> None:
+    if GOOGLE_CLIENT_ID:
+        google_oidc_cache.start()
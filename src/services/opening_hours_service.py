@@ -0,0 +1,174 @@
+import time
+from datetime import date, datetime, timedelta
+from threading import Lock
+from typing import Callable, List, NamedTuple, Optional
+from zoneinfo import ZoneInfo
+
+from config import OPENING_HOURS_CACHE_SECONDS
+from src.models.setting_model import SettingModel
+from src.services.metrics_service import increment, register_collector
+from src.utils.models_helpers import OpeningHours, TimeInterval
+
+WEEKDAYS = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+# Días que se calculan a partir de hoy para encontrar la próxima apertura o cierre. Se empieza el día anterior para
+# incluir los intervalos que cruzan la medianoche.
+HORIZON_DAYS = 14
+
+DEFAULT_INTERVALS: List[TimeInterval] = [
+    {"open": "13:00", "close": "16:00"},
+    {"open": "20:00", "close": "00:00"},
+]
+# Horario que se usa mientras no exista el ajuste "opening_hours": cerrado los lunes
+DEFAULT_OPENING_HOURS: OpeningHours = {
+    "timezone": "Europe/Madrid",
+    "week": {day: DEFAULT_INTERVALS for day in WEEKDAYS if day != "monday"},
+}
+
+
+class BarState(NamedTuple):
+    schedule_open: bool
+    manually_closed: bool
+    # Próxima apertura o cierre, en segundos desde epoch. None si no hay ninguno en el horizonte calculado.
+    next_change: Optional[float]
+    # Hasta cuándo es válido este estado: el próximo cambio o el final del TTL, lo que llegue antes
+    expires_at: float
+    timezone: str
+
+    @property
+    def is_open(self) -> bool:
+        return self.schedule_open and not self.manually_closed
+
+
+# Intervalos de apertura en segundos desde epoch, ordenados y fusionados si se solapan o son contiguos
+def get_open_intervals(
+    opening_hours: OpeningHours, start: date, days: int = HORIZON_DAYS
+) -> List[tuple[float, float]]:
+    timezone = ZoneInfo(opening_hours["timezone"])
+    holidays = set(opening_hours.get("holidays", []))
+    special_days = {
+        special_day["date"]: special_day["intervals"]
+        for special_day in opening_hours.get("special_days", [])
+    }
+    intervals = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        if day.isoformat() in holidays:
+            continue
+        day_intervals = special_days.get(
+            day.isoformat(), opening_hours["week"].get(WEEKDAYS[day.weekday()], [])
+        )
+        for interval in day_intervals:
+            opens = datetime.combine(
+                day, datetime.strptime(interval["open"], "%H:%M").time(), timezone
+            )
+            closes = datetime.combine(
+                day, datetime.strptime(interval["close"], "%H:%M").time(), timezone
+            )
+            if closes <= opens:
+                closes = datetime.combine(
+                    day + timedelta(days=1), closes.time(), timezone
+                )
+            intervals.append((opens.timestamp(), closes.timestamp()))
+
+    merged = []
+    for opens, closes in sorted(intervals):
+        if merged and opens <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], closes))
+        else:
+            merged.append((opens, closes))
+    return merged
+
+
+def get_timestamp(value: str) -> float:
+    # Las fechas sin zona horaria se guardan en la hora local del servidor
+    return datetime.fromisoformat(value).timestamp()
+
+
+# Calcula si el bar está abierto y cuándo cambia el estado. Las consultas comparan la hora actual con el límite guardado
+# y sólo se recalcula al llegar a él, al vencer el TTL (para ver cambios hechos desde otras máquinas) o con "invalidate".
+class OpeningHoursEngine:
+    def __init__(
+        self,
+        loader: Callable[[], dict],
+        ttl: int = OPENING_HOURS_CACHE_SECONDS,
+    ):
+        self.loader = loader
+        self.ttl = ttl
+        self._lock = Lock()
+        self._state = None
+
+    def compute(self, settings: dict, now: float) -> BarState:
+        opening_hours = (
+            settings.get("opening_hours", {}).get("value") or DEFAULT_OPENING_HOURS
+        )
+        timezone = ZoneInfo(opening_hours["timezone"])
+        today = datetime.fromtimestamp(now, timezone).date()
+        intervals = get_open_intervals(opening_hours, today - timedelta(days=1))
+
+        current = next(
+            ((opens, closes) for opens, closes in intervals if opens <= now < closes),
+            None,
+        )
+        next_opening = next((opens for opens, _ in intervals if opens > now), None)
+        next_change = current[1] if current else next_opening
+
+        # El cierre manual dura hasta la siguiente apertura posterior al momento del cierre
+        manually_closed = False
+        manual_closure = settings.get("manual_closure")
+        if manual_closure and manual_closure["value"] is True:
+            closed_at = get_timestamp(manual_closure["updated_at"])
+            reopens_at = next(
+                (opens for opens, _ in intervals if opens > closed_at), None
+            )
+            manually_closed = reopens_at is None or now < reopens_at
+            if manually_closed and current:
+                next_change = reopens_at
+
+        expires_at = now + self.ttl
+        if next_change is not None:
+            expires_at = min(expires_at, next_change)
+        return BarState(
+            bool(current), manually_closed, next_change, expires_at, timezone.key
+        )
+
+    def get_state(self, now: Optional[float] = None) -> BarState:
+        now = time.time() if now is None else now
+        state = self._state
+        if state is not None and now < state.expires_at:
+            return state
+        with self._lock:
+            state = self._state
+            if state is None or now >= state.expires_at:
+                state = self.compute(self.loader(), now)
+                self._state = state
+                increment("opening_hours.recomputes")
+        return state
+
+    # Zona horaria del horario vigente
+    def get_timezone(self) -> ZoneInfo:
+        return ZoneInfo(self.get_state().timezone)
+
+    # Se llama al modificar "opening_hours" o "manual_closure" en este proceso
+    def invalidate(self) -> None:
+        self._state = None
+
+    def get_metrics(self) -> dict:
+        state = self._state
+        return {
+            "cached": state is not None,
+            "expires_in": max(state.expires_at - time.time(), 0) if state else 0,
+        }
+
+
+opening_hours = OpeningHoursEngine(
+    lambda: SettingModel.get_settings_by_names(["opening_hours", "manual_closure"])
+)
+register_collector("opening_hours", opening_hours.get_metrics)
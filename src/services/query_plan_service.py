@@ -0,0 +1,110 @@
+from threading import Lock
+from typing import List
+
+from pymongo import monitoring
+from pymongo.database import Database
+
+# Comandos que admiten "explain" y la clave donde está su filtro
+EXPLAINABLE_COMMANDS = {
+    "find": "filter",
+    "aggregate": "pipeline",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "update": "updates",
+    "delete": "deletes",
+}
+SESSION_FIELDS = ("lsid", "txnNumber", "autocommit", "startTransaction")
+
+
+# Registra los comandos que lanzan los modelos para analizar después su plan de ejecución. Sólo se conecta al cliente
+# de MongoDB en el modo de comprobación de planes ("QUERY_PLAN_CHECK").
+class QueryRecorder(monitoring.CommandListener):
+    def __init__(self):
+        self.enabled = False
+        self.commands = []
+        self._lock = Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if not self.enabled or event.command_name not in EXPLAINABLE_COMMANDS:
+            return
+        command = {
+            key: value
+            for key, value in event.command.items()
+            if not key.startswith("$") and key not in SESSION_FIELDS
+        }
+        with self._lock:
+            self.commands.append((event.database_name, command))
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self.commands = []
+
+
+query_recorder = QueryRecorder()
+
+
+def get_stages(plan: dict) -> List[str]:
+    stages = [plan["stage"]] if "stage" in plan else []
+    for key in ("inputStage", "queryPlan", "innerStage", "outerStage"):
+        if key in plan:
+            stages.extend(get_stages(plan[key]))
+    for input_stage in plan.get("inputStages", []):
+        stages.extend(get_stages(input_stage))
+    return stages
+
+
+def get_winning_plans(explain: dict) -> List[dict]:
+    plans = []
+    for key, value in explain.items():
+        if key == "winningPlan" and isinstance(value, dict):
+            plans.append(value)
+        elif isinstance(value, dict):
+            plans.extend(get_winning_plans(value))
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    plans.extend(get_winning_plans(item))
+    return plans
+
+
+# Un filtro vacío ("$match": {} o "q": {}) recorre toda la colección igual que no tener filtro
+def has_filter(command: dict) -> bool:
+    name = next(iter(command))
+    criteria = command.get(EXPLAINABLE_COMMANDS[name])
+    if name == "aggregate":
+        return any(bool(stage.get("$match")) for stage in criteria or [])
+    if name in ("update", "delete"):
+        return any(bool(statement.get("q")) for statement in criteria or [])
+    return bool(criteria)
+
+
+# Un recorrido completo sólo se admite en listados sin filtro. Cualquier ordenación en memoria es un problema.
+def get_plan_problems(command: dict, explain: dict) -> List[str]:
+    problems = []
+    stages = [
+        stage for plan in get_winning_plans(explain) for stage in get_stages(plan)
+    ]
+    if "COLLSCAN" in stages and has_filter(command):
+        problems.append("COLLSCAN")
+    if "SORT" in stages or any("$sort" in stage for stage in explain.get("stages", [])):
+        problems.append("SORT")
+    return problems
+
+
+def check_query_plans(database: Database, commands: list) -> List[dict]:
+    problems = []
+    for database_name, command in commands:
+        explain = database.client[database_name].command(
+            {"explain": command, "verbosity": "queryPlanner"}
+        )
+        command_problems = get_plan_problems(command, explain)
+        if command_problems:
+            problems.append({"command": command, "problems": command_problems})
+    return problems
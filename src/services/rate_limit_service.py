@@ -0,0 +1,209 @@
+import time
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from threading import Lock
+from typing import Callable, Literal, NamedTuple, Union
+
+from cachetools import TTLCache
+from flask import request
+from flask_jwt_extended import get_jwt
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from config import RATE_LIMIT_BACKEND, TRUST_FLY_CLIENT_IP
+from src.services.db_service import db
+from src.services.metrics_service import increment
+from src.utils.exception_handlers import ValueCustomError
+
+
+# Cubeta de tokens: admite ráfagas de hasta "capacity" solicitudes y se rellena a razón de capacity / per_seconds.
+# Con "failures_only" sólo cuentan las solicitudes rechazadas con "ValueCustomError" (por ejemplo, logins fallidos).
+class RateLimit(NamedTuple):
+    key: Literal["ip", "account", "ip_account"]
+    capacity: int
+    per_seconds: int
+    failures_only: bool = False
+
+
+# Backend en memoria por proceso
+class MemoryRateLimitBackend:
+    def __init__(self, max_keys: int = 50000, ttl: int = 86400):
+        self._buckets = TTLCache(maxsize=max_keys, ttl=ttl)
+        self._lock = Lock()
+
+    def consume(self, key: str, limit: RateLimit) -> bool:
+        now = time.monotonic()
+        refill_rate = limit.capacity / limit.per_seconds
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + (now - updated_at) * refill_rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+    # Devuelve el token consumido por una solicitud que al final no cuenta
+    def refund(self, key: str, limit: RateLimit) -> None:
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated_at = self._buckets[key]
+                self._buckets[key] = (min(limit.capacity, tokens + 1), updated_at)
+
+
+# Backend compartido entre procesos y máquinas: una actualización atómica por solicitud en la colección "rate_limits".
+# Campo TTL: "expires_at".
+class MongoRateLimitBackend:
+    INDEXES = [IndexModel("expires_at", expireAfterSeconds=0)]
+
+    def consume(self, key: str, limit: RateLimit) -> bool:
+        now = time.time()
+        refill_rate = limit.capacity / limit.per_seconds
+        update = [
+            {
+                "$set": {
+                    "tokens": {
+                        "$min": [
+                            limit.capacity,
+                            {
+                                "$add": [
+                                    {"$ifNull": ["$tokens", limit.capacity]},
+                                    {
+                                        "$multiply": [
+                                            {
+                                                "$subtract": [
+                                                    now,
+                                                    {
+                                                        "$ifNull": [
+                                                            "$updated_at",
+                                                            now,
+                                                        ]
+                                                    },
+                                                ]
+                                            },
+                                            refill_rate,
+                                        ]
+                                    },
+                                ]
+                            },
+                        ]
+                    },
+                    "updated_at": now,
+                }
+            },
+            {
+                "$set": {
+                    "allowed": {"$gte": ["$tokens", 1]},
+                    "tokens": {
+                        "$cond": [
+                            {"$gte": ["$tokens", 1]},
+                            {"$subtract": ["$tokens", 1]},
+                            "$tokens",
+                        ]
+                    },
+                    "expires_at": datetime.now(timezone.utc)
+                    + timedelta(seconds=limit.per_seconds),
+                }
+            },
+        ]
+        # Dos primeras solicitudes simultáneas pueden intentar crear el documento a la vez: la que falla por la clave
+        # duplicada se repite y actualiza el documento ya creado
+        try:
+            bucket = self._update_bucket(key, update)
+        except DuplicateKeyError:
+            bucket = self._update_bucket(key, update)
+        return bucket["allowed"]
+
+    @staticmethod
+    def _update_bucket(key: str, update: list) -> dict:
+        return db.rate_limits.find_one_and_update(
+            {"_id": key},
+            update,
+            projection={"allowed": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def refund(self, key: str, limit: RateLimit) -> None:
+        db.rate_limits.update_one(
+            {"_id": key},
+            [
+                {
+                    "$set": {
+                        "tokens": {"$min": [limit.capacity, {"$add": ["$tokens", 1]}]}
+                    }
+                }
+            ],
+        )
+
+
+def get_backend(name: str) -> Union[MemoryRateLimitBackend, MongoRateLimitBackend]:
+    if name == "mongo":
+        return MongoRateLimitBackend()
+    return MemoryRateLimitBackend()
+
+
+rate_limit_backend = get_backend(RATE_LIMIT_BACKEND)
+
+
+# Fly.io indica la IP real del cliente en "Fly-Client-IP". Sólo se usa con "TRUST_FLY_CLIENT_IP": sin el proxy de Fly
+# delante, cualquier cliente podría enviarla y cambiar de cubeta en cada solicitud.
+def get_client_ip() -> str:
+    if TRUST_FLY_CLIENT_IP:
+        return request.headers.get("Fly-Client-IP", request.remote_addr)
+    return request.remote_addr
+
+
+def get_account() -> Union[str, None]:
+    request_data = request.get_json(silent=True)
+    if isinstance(request_data, dict) and isinstance(request_data.get("email"), str):
+        return request_data["email"].strip().lower()
+    try:
+        return get_jwt().get("sub")
+    except RuntimeError:
+        return None
+
+
+def get_identifier(key: str) -> Union[str, None]:
+    if key == "ip":
+        return get_client_ip()
+    account = get_account()
+    if key == "account" or not account:
+        return account
+    return f"{get_client_ip()}:{account}"
+
+
+# Se aplica debajo de "route" (y de "jwt_required" si lo hay) para rechazar con 429 antes de cualquier trabajo costoso.
+# Los límites "failures_only" también consumen al empezar, para que una ráfaga de solicitudes simultáneas no supere la
+# capacidad, y devuelven el token si la solicitud no falla con "ValueCustomError".
+def rate_limit(
+    scope: str, *limits: RateLimit, error_type: str = "rate_limited"
+) -> Callable:
+    def decorator(function: Callable) -> Callable:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            failure_buckets = []
+            for limit in limits:
+                identifier = get_identifier(limit.key)
+                if not identifier:
+                    continue
+                key = f"{scope}:{limit.key}:{identifier}"
+                if not rate_limit_backend.consume(key, limit):
+                    for failure_key, failure_limit in failure_buckets:
+                        rate_limit_backend.refund(failure_key, failure_limit)
+                    increment(f"rate_limit.rejected.{scope}")
+                    raise ValueCustomError(error_type)
+                if limit.failures_only:
+                    failure_buckets.append((key, limit))
+            failed = False
+            try:
+                return function(*args, **kwargs)
+            except ValueCustomError:
+                failed = True
+                raise
+            finally:
+                if not failed:
+                    for key, limit in failure_buckets:
+                        rate_limit_backend.refund(key, limit)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,201 @@
+import hashlib
+import math
+import time
+from datetime import timedelta
+from threading import Lock
+from typing import Iterable, Optional
+
+from config import Config, REVOCATION_SYNC_SECONDS, REVOCATION_REBUILD_SECONDS
+from src.models.session_model import SessionModel
+from src.services.metrics_service import increment, observe, register_collector
+
+# Margen para no perder revocaciones escritas con una marca de tiempo anterior a la última sincronización
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+# Filtro de Bloom con funciones hash firmadas (BLAKE2b con clave derivada del secreto JWT), de modo que las
+# posiciones de cada "jti" no se pueden predecir sin conocer el secreto.
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float, key: bytes):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+        self.count = 0
+        self._key = key
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), key=self._key, digest_size=16).digest()
+        first_hash = int.from_bytes(digest[:8], "big")
+        second_hash = int.from_bytes(digest[8:], "big") | 1
+        return (
+            (first_hash + i * second_hash) % self.size for i in range(self.hash_count)
+        )
+
+    def add(self, item: str) -> None:
+        already_present = True
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                already_present = False
+                self.bits[position >> 3] |= mask
+        if not already_present:
+            self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def estimated_false_positive_rate(self) -> float:
+        return (
+            1 - math.exp(-self.hash_count * self.count / self.size)
+        ) ** self.hash_count
+
+
+# Filtro de "jti" revocados de cada proceso, sincronizado de forma incremental con las sesiones revocadas en MongoDB
+class RevocationFilter:
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        sync_seconds: int = REVOCATION_SYNC_SECONDS,
+        rebuild_seconds: int = REVOCATION_REBUILD_SECONDS,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_seconds = sync_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.checks = 0
+        self.filter_hits = 0
+        self.false_positives = 0
+        self._key = hashlib.sha256((Config.JWT_SECRET_KEY or "").encode()).digest()
+        # "_lock" deja una sola sincronización en curso; "_filter_lock" protege las escrituras en el filtro y su
+        # sustitución, así las revocaciones de este proceso no esperan a la consulta de la base de datos
+        self._lock = Lock()
+        self._filter_lock = Lock()
+        self._filter = self._new_filter()
+        # "jti" añadidos mientras se reconstruye el filtro, para pasarlos al nuevo antes de sustituirlo
+        self._pending_jtis = None
+        self._last_revoked_at = None
+        self._last_sync = None
+        self._last_rebuild = None
+
+    def _new_filter(self) -> BloomFilter:
+        return BloomFilter(self.capacity, self.error_rate, self._key)
+
+    @staticmethod
+    def _get_session_jtis(session: dict) -> list[str]:
+        jtis = list(session.get("revoked_jtis") or [])
+        if session.get("revoked"):
+            jtis += [session.get("access_jti"), session.get("refresh_jti")]
+        return [jti for jti in jtis if jti]
+
+    def _add_jtis(self, jtis: Iterable[str]) -> None:
+        with self._filter_lock:
+            for jti in jtis:
+                self._filter.add(jti)
+            if self._pending_jtis is not None:
+                self._pending_jtis.update(jtis)
+
+    def add_session(self, session: dict) -> None:
+        self._add_jtis(self._get_session_jtis(session))
+
+    def add_jti(self, jti: str) -> None:
+        self._add_jtis([jti])
+
+    # Sin acceso a la base de datos salvo cuando toca sincronizar: si devuelve False el token no está revocado
+    def might_be_revoked(self, jti: str) -> bool:
+        self.sync_if_due()
+        self.checks += 1
+        if jti in self._filter:
+            self.filter_hits += 1
+            return True
+        return False
+
+    def record_false_positive(self) -> None:
+        self.false_positives += 1
+
+    # Devuelve "rebuild", "sync" o None según lo que toque hacer
+    def _get_due_sync(self, now: float) -> Optional[str]:
+        if (
+            self._last_rebuild is None
+            or now - self._last_rebuild >= self.rebuild_seconds
+        ):
+            return "rebuild"
+        if now - self._last_sync >= self.sync_seconds:
+            return "sync"
+        return None
+
+    # Las solicitudes que esperan el bloqueo mientras otra sincroniza vuelven a comprobarlo al obtenerlo, así que sólo
+    # una de ellas consulta la base de datos
+    def sync_if_due(self) -> None:
+        if not self._get_due_sync(time.monotonic()):
+            return
+        with self._lock:
+            due_sync = self._get_due_sync(time.monotonic())
+            if due_sync:
+                self._sync(rebuild=due_sync == "rebuild")
+
+    # Con "rebuild" se reconstruye el filtro desde cero, descartando los "jti" de sesiones ya expiradas (TTL)
+    def sync(self, rebuild: bool = False) -> None:
+        with self._lock:
+            self._sync(rebuild)
+
+    def _sync(self, rebuild: bool) -> None:
+        started = time.perf_counter()
+        since = None
+        if not rebuild and self._last_revoked_at:
+            since = self._last_revoked_at - SYNC_OVERLAP
+        if rebuild:
+            with self._filter_lock:
+                self._pending_jtis = set()
+        try:
+            revoked_sessions = SessionModel.get_revoked_sessions(since)
+            jtis = []
+            last_revoked_at = None if rebuild else self._last_revoked_at
+            for session in revoked_sessions:
+                jtis += self._get_session_jtis(session)
+                revoked_at = session.get("revoked_at")
+                if revoked_at and (not last_revoked_at or revoked_at > last_revoked_at):
+                    last_revoked_at = revoked_at
+            if rebuild:
+                bloom_filter = self._new_filter()
+                for jti in jtis:
+                    bloom_filter.add(jti)
+                with self._filter_lock:
+                    for jti in self._pending_jtis:
+                        bloom_filter.add(jti)
+                    self._filter = bloom_filter
+            else:
+                self._add_jtis(jtis)
+        finally:
+            if rebuild:
+                with self._filter_lock:
+                    self._pending_jtis = None
+        self._last_revoked_at = last_revoked_at
+        self._last_sync = time.monotonic()
+        if rebuild:
+            self._last_rebuild = self._last_sync
+        increment("revocation.rebuilds" if rebuild else "revocation.syncs")
+        observe("revocation.sync_seconds", time.perf_counter() - started)
+
+    def get_metrics(self) -> dict:
+        return {
+            "checks": self.checks,
+            "filter_hits": self.filter_hits,
+            "false_positives": self.false_positives,
+            "observed_false_positive_rate": (
+                self.false_positives / self.checks if self.checks else 0
+            ),
+            "estimated_false_positive_rate": self._filter.estimated_false_positive_rate(),
+            "items": self._filter.count,
+            "size_bits": self._filter.size,
+            "hash_count": self._filter.hash_count,
+        }
+
+
+revocation_filter = RevocationFilter()
+register_collector("revocation_filter", revocation_filter.get_metrics)
@@ -0,0 +1,188 @@
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from threading import Event, Lock, Thread
+from typing import Callable, NamedTuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from config import SCHEDULER_TICK_SECONDS
+from src.models.session_model import SessionModel
+from src.models.token_model import TokenModel
+from src.models.user_model import UserModel
+from src.services.archive_service import archive_orders
+from src.services.bar_service import reopen_manual_closure
+from src.services.db_service import db
+from src.services.inventory_service import take_inventory_snapshot
+from src.services.menu_snapshot_service import write_menu_snapshot
+from src.services.metrics_service import increment, observe, register_collector
+from src.services.search_service import dishes_search, products_search
+
+# Identifica a este proceso en los documentos de "leases": máquina de Fly (o host) y pid del worker
+OWNER = f"{os.getenv('FLY_MACHINE_ID', socket.gethostname())}:{os.getpid()}"
+# Tiempo máximo que una tarea mantiene el bloqueo. Si el proceso muere, otro la retoma al vencer.
+LEASE_SECONDS = 300
+
+
+class Job(NamedTuple):
+    name: str
+    interval_seconds: int
+    function: Callable[[], None]
+    # Las tareas que escriben en la base de datos se ejecutan en un único proceso de todas las máquinas. Los
+    # precalentamientos de cachés son locales, así que se ejecutan en cada proceso.
+    leader_only: bool = True
+
+
+# Crea el documento de bloqueo de cada tarea compartida que aún no lo tiene, listo para ejecutarse. Se lanza una vez al
+# arrancar el planificador; si otro proceso lo crea a la vez, el índice único de "_id" hace fallar esta inserción.
+def seed_leases(jobs: list[Job], now: datetime) -> None:
+    for job in jobs:
+        if not job.leader_only:
+            continue
+        try:
+            db.leases.update_one(
+                {"_id": job.name},
+                {"$setOnInsert": {"next_run_at": now, "locked_until": now}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            pass
+
+
+# Toma el bloqueo de la tarea si le toca ejecutarse y nadie lo tiene. Sin "upsert": el documento ya existe
+# ("seed_leases"), así que una tarea que no toca sólo es una actualización que no encuentra nada.
+def acquire_lease(job: Job, now: datetime) -> bool:
+    lease = db.leases.find_one_and_update(
+        {
+            "_id": job.name,
+            "next_run_at": {"$lte": now},
+            "locked_until": {"$lte": now},
+        },
+        {
+            "$set": {
+                "owner": OWNER,
+                "locked_until": now + timedelta(seconds=LEASE_SECONDS),
+            }
+        },
+        return_document=ReturnDocument.AFTER,
+    )
+    return lease is not None
+
+
+def release_lease(job: Job, now: datetime) -> None:
+    db.leases.update_one(
+        {"_id": job.name, "owner": OWNER},
+        {
+            "$set": {
+                "next_run_at": now + timedelta(seconds=job.interval_seconds),
+                "locked_until": now,
+            }
+        },
+    )
+
+
+def sweep_expired_documents() -> None:
+    now = datetime.now(timezone.utc)
+    TokenModel.delete_expired_email_tokens(now)
+    SessionModel.delete_expired_sessions(now)
+    UserModel.delete_expired_users(now)
+
+
+def warm_caches() -> None:
+    write_menu_snapshot()
+    dishes_search.warm()
+    products_search.warm()
+
+
+JOBS = [
+    Job("reopen_manual_closure", 60, reopen_manual_closure),
+    Job("sweep_expired_documents", 600, sweep_expired_documents),
+    Job("inventory_snapshot", 86400, take_inventory_snapshot),
+    Job("archive_orders", 3600, archive_orders),
+    Job("warm_caches", 300, warm_caches, leader_only=False),
+]
+
+
+# Planificador en proceso. Cada "tick" recorre las tareas y ejecuta las que han cumplido su intervalo. Las tareas
+# compartidas se coordinan con un documento por tarea en la colección "leases".
+class Scheduler:
+    def __init__(self, jobs: list[Job], tick_seconds: int = SCHEDULER_TICK_SECONDS):
+        self.jobs = jobs
+        self.tick_seconds = tick_seconds
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+        self._local_next_run = {}
+        self._leases_seeded = False
+        self.last_runs = {}
+
+    def _is_due(self, job: Job, now: datetime) -> bool:
+        if job.leader_only:
+            return acquire_lease(job, now)
+        return self._local_next_run.get(job.name, now) <= now
+
+    def run_job(self, job: Job) -> None:
+        started = time.perf_counter()
+        try:
+            job.function()
+            increment(f"scheduler.{job.name}.runs")
+        except Exception:
+            increment(f"scheduler.{job.name}.errors")
+        finally:
+            observe(f"scheduler.{job.name}.seconds", time.perf_counter() - started)
+
+    def tick(self) -> None:
+        # Los documentos de bloqueo se crean en el primer "tick"; si la base de datos no responde, en el siguiente
+        if not self._leases_seeded:
+            try:
+                seed_leases(self.jobs, datetime.now(timezone.utc))
+                self._leases_seeded = True
+            except PyMongoError:
+                increment("scheduler.lease_errors")
+                return
+        for job in self.jobs:
+            now = datetime.now(timezone.utc)
+            try:
+                if not self._is_due(job, now):
+                    continue
+                self.run_job(job)
+                finished = datetime.now(timezone.utc)
+                self.last_runs[job.name] = finished.isoformat()
+                if job.leader_only:
+                    release_lease(job, finished)
+                else:
+                    self._local_next_run[job.name] = finished + timedelta(
+                        seconds=job.interval_seconds
+                    )
+            except PyMongoError:
+                increment("scheduler.lease_errors")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.tick()
+            self._stop.wait(self.tick_seconds)
+
+    # Sólo se lanza un hilo por proceso aunque se llame varias veces
+    def start(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = Thread(target=self._run, name="scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def get_metrics(self) -> dict:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "owner": OWNER,
+            "last_runs": dict(self.last_runs),
+        }
+
+
+scheduler = Scheduler(JOBS)
+register_collector("scheduler", scheduler.get_metrics)
@@ -0,0 +1,115 @@
+import heapq
+import time
+import unicodedata
+from threading import Lock
+from typing import Callable, List
+
+from config import MENU_CACHE_SECONDS
+from src.models.product_model import ProductModel
+from src.services.menu_service import menu_index
+from src.services.metrics_service import observe
+
+
+# Minúsculas y sin tildes ni diéresis: "Jamón" y "jamon" se indexan igual. La "ñ" se conserva.
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFD", text.lower().replace("ñ", "\0"))
+    text = "".join(char for char in text if unicodedata.category(char) != "Mn")
+    return text.replace("\0", "ñ")
+
+
+# Árbol de prefijos en el que cada nodo guarda las posiciones de todas las entradas que contienen una palabra con ese
+# prefijo. Buscar un prefijo recorre tantos nodos como caracteres tiene, sin depender del tamaño del catálogo.
+class PrefixTrie:
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, word: str, position: int) -> None:
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {"": set()})
+            node[""].add(position)
+
+    def search(self, prefix: str) -> set:
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return set()
+        return node[""]
+
+
+# Copia en memoria de una colección que se recarga al invalidarse o, como máximo, cada "ttl" segundos
+class CatalogSnapshot:
+    def __init__(self, loader: Callable[[], List[dict]], ttl: int = MENU_CACHE_SECONDS):
+        self.loader = loader
+        self.ttl = ttl
+        self._lock = Lock()
+        self._items = None
+        self._loaded_at = 0.0
+
+    def get_snapshot(self) -> List[dict]:
+        with self._lock:
+            if self._items is None or time.monotonic() - self._loaded_at > self.ttl:
+                self._items = self.loader()
+                self._loaded_at = time.monotonic()
+            return self._items
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._items = None
+
+
+# Índice de búsqueda sobre una copia del catálogo. Se reconstruye cuando la copia cambia y se sustituye de una vez,
+# para que las búsquedas en curso sigan usando el índice anterior completo.
+class SearchIndex:
+    def __init__(self, name: str, get_snapshot: Callable[[], List[dict]]):
+        self.name = name
+        self.get_snapshot = get_snapshot
+        self._lock = Lock()
+        self._state = (None, [], PrefixTrie())
+
+    def _get_state(self) -> tuple:
+        source = self.get_snapshot()
+        if source is not self._state[0]:
+            with self._lock:
+                if source is not self._state[0]:
+                    trie = PrefixTrie()
+                    names = [normalize(entry["name"]) for entry in source]
+                    for position, name in enumerate(names):
+                        for word in name.split():
+                            trie.insert(word, position)
+                    self._state = (source, names, trie)
+        return self._state
+
+    # Construye el índice por adelantado para que la primera búsqueda no pague la reconstrucción
+    def warm(self) -> None:
+        self._get_state()
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        source, names, trie = self._get_state()
+        started = time.perf_counter()
+        words = normalize(query).split()
+        if not words:
+            return []
+        positions = set.intersection(*(trie.search(word) for word in words))
+        normalized_query = " ".join(words)
+        # Primero los nombres que empiezan por la búsqueda, después el resto, en orden alfabético
+        ranked = heapq.nsmallest(
+            limit,
+            positions,
+            key=lambda position: (
+                not names[position].startswith(normalized_query),
+                names[position],
+            ),
+        )
+        results = [
+            {"_id": source[position]["_id"], "name": source[position]["name"]}
+            for position in ranked
+        ]
+        observe(f"search.{self.name}.seconds", time.perf_counter() - started)
+        return results
+
+
+product_catalog = CatalogSnapshot(ProductModel.get_catalog)
+dishes_search = SearchIndex("dishes", menu_index.get_snapshot)
+products_search = SearchIndex("products", product_catalog.get_snapshot)
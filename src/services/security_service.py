@@ -1,19 +1,23 @@
-from datetime import timedelta, datetime
+from datetime import timedelta, datetime, timezone
 from typing import Union
+from uuid import uuid4
 
 from authlib.integrations.flask_client import OAuth
+from bson import ObjectId
+from cachetools import TTLCache
 from flask import jsonify, Response
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import (
     create_access_token,
     create_refresh_token,
     JWTManager,
-    decode_token,
 )
-from pymongo.results import InsertOneResult, DeleteResult
+from pymongo.results import UpdateResult
 
-from config import GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, config
-from src.models.token_model import TokenModel
+from config import GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, GOOGLE_METADATA_URL, config
+from src.models.session_model import SessionModel
+from src.services.revocation_service import revocation_filter
+from src.utils.exception_handlers import ValueCustomError
 
 bcrypt = Bcrypt()
 
@@ -24,10 +28,13 @@ google = oauth.register(
     name="google",
     client_id=GOOGLE_CLIENT_ID,
     client_secret=GOOGLE_CLIENT_SECRET,
-    server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
+    server_metadata_url=GOOGLE_METADATA_URL,
     client_kwargs={"scope": "openid email profile"},
 )
 
+# Caché en memoria por proceso de las sesiones consultadas, incluidas las inexistentes (sesiones revocadas)
+sessions_cache = TTLCache(maxsize=10000, ttl=60)
+
 
 def verify_password(db_password: str, password: str) -> bool:
     return bcrypt.check_password_hash(db_password, password)
@@ -40,63 +47,96 @@ def verify_google_identity(
     return token_info["email"] == user_email
 
 
-def generate_access_token(user_data: dict, session=None) -> str:
-    user_role = user_data.get("role")
-    user_identity = user_data.get("_id")
-    token_info = {
-        "identity": str(user_identity),
-        "additional_claims": {"role": user_role},
-        "expires_delta": get_expiration_time_access_token(user_role),
-    }
-    access_token = create_access_token(**token_info)
-
-    access_token_decoded = decode_token(access_token)
-    data_access_token = {
-        "user_id": access_token_decoded.get("sub"),
-        "jti": access_token_decoded.get("jti"),
-        "expires_at": access_token_decoded.get("exp"),
-        "created_at": datetime.now(),
+# Construye localmente los claims "jti" y "exp" del token para no tener que decodificarlo después de crearlo
+def build_token_data(user_id: str, expires_delta: timedelta) -> dict:
+    return {
+        "user_id": user_id,
+        "jti": str(uuid4()),
+        "expires_at": int((datetime.now(timezone.utc) + expires_delta).timestamp()),
     }
-    TokenModel(**data_access_token).update_or_insert_active_token_by_user_id(
-        data_access_token["user_id"], session
+
+
+def create_access_token_and_data(user_data: dict, session_id: str) -> tuple[str, dict]:
+    user_role = user_data.get("role")
+    user_identity = str(user_data.get("_id"))
+    token_data = build_token_data(
+        user_identity, get_expiration_time_access_token(user_role)
     )
-    return access_token
+    access_token = create_access_token(
+        identity=user_identity,
+        additional_claims={
+            "role": user_role,
+            "sid": session_id,
+            "jti": token_data["jti"],
+            "exp": token_data["expires_at"],
+        },
+    )
+    return access_token, token_data
 
 
-def generate_refresh_token(
-    user_data: dict, session
-) -> Union[str, tuple[Response, int]]:
+def create_refresh_token_and_data(user_data: dict, session_id: str) -> tuple[str, dict]:
     user_role = user_data.get("role")
-    user_identity = user_data.get("_id")
-    token_info = {
-        "identity": str(user_identity),
-        "expires_delta": get_expiration_time_refresh_token(user_role),
-    }
-    refresh_token = create_refresh_token(**token_info)
-
-    refresh_token_decoded = decode_token(refresh_token)
-    data_refresh_token = {
-        "user_id": refresh_token_decoded.get("sub"),
-        "jti": refresh_token_decoded.get("jti"),
-        "expires_at": refresh_token_decoded.get("exp"),
-        "created_at": datetime.now(),
-    }
-    TokenModel(**data_refresh_token).update_or_insert_refresh_token_by_user_id(
-        data_refresh_token["user_id"], session
+    user_identity = str(user_data.get("_id"))
+    token_data = build_token_data(
+        user_identity, get_expiration_time_refresh_token(user_role)
+    )
+    refresh_token = create_refresh_token(
+        identity=user_identity,
+        additional_claims={
+            "sid": session_id,
+            "jti": token_data["jti"],
+            "exp": token_data["expires_at"],
+        },
+    )
+    return refresh_token, token_data
+
+
+# Genera ambos tokens y los guarda en un único documento de sesión con una sola escritura
+def generate_session_tokens(user_data: dict) -> tuple[str, str]:
+    session_id = str(ObjectId())
+    access_token, access_token_data = create_access_token_and_data(
+        user_data, session_id
+    )
+    refresh_token, refresh_token_data = create_refresh_token_and_data(
+        user_data, session_id
     )
-    return refresh_token
+    SessionModel(
+        session_id=session_id,
+        user_id=access_token_data["user_id"],
+        access_jti=access_token_data["jti"],
+        access_expires_at=access_token_data["expires_at"],
+        refresh_jti=refresh_token_data["jti"],
+        expires_at=refresh_token_data["expires_at"],
+    ).insert_session()
+    return access_token, refresh_token
+
+
+def generate_access_token(user_data: dict, session_id: str) -> str:
+    access_token, access_token_data = create_access_token_and_data(
+        user_data, session_id
+    )
+    previous_session = SessionModel.update_session_access_token(
+        session_id,
+        access_token_data["jti"],
+        datetime.fromtimestamp(access_token_data["expires_at"], timezone.utc),
+    )
+    if not previous_session:
+        raise ValueCustomError("not_found", "refresh token")
+    revocation_filter.add_jti(previous_session["access_jti"])
+    sessions_cache.pop(session_id, None)
+    return access_token
 
 
 def generate_email_token(user_data: dict) -> tuple:
-    user_identity = user_data.get("_id")
-    token_info = {"identity": str(user_identity), "expires_delta": timedelta(days=1)}
-    email_token = create_access_token(**token_info)
-    decoded_token_email = decode_token(email_token)
-    data_email_token_db = {
-        "user_id": decoded_token_email.get("sub"),
-        "jti": decoded_token_email.get("jti"),
-        "expires_at": decoded_token_email.get("exp"),
-    }
+    user_identity = str(user_data.get("_id"))
+    data_email_token_db = build_token_data(user_identity, timedelta(days=1))
+    email_token = create_access_token(
+        identity=user_identity,
+        additional_claims={
+            "jti": data_email_token_db["jti"],
+            "exp": data_email_token_db["expires_at"],
+        },
+    )
     return email_token, data_email_token_db
 
 
@@ -118,24 +158,55 @@ def get_expiration_time_refresh_token(role: int) -> timedelta:
         return timedelta(days=30)
 
 
-def delete_active_token(user_id: str) -> DeleteResult:
-    deleted_active_token = TokenModel.delete_active_token_by_user_id(user_id)
-    return deleted_active_token
+# Devuelve la sesión si sigue activa; las sesiones revocadas o inexistentes se guardan en caché como None
+def get_session(session_id: str) -> Union[dict, None]:
+    if not session_id:
+        return None
+    if session_id in sessions_cache:
+        return sessions_cache[session_id]
+    session = SessionModel.get_session(session_id)
+    if session and session.get("revoked"):
+        session = None
+    sessions_cache[session_id] = session
+    return session
+
 
+def revoke_session(session_id: str) -> Union[dict, None]:
+    revoked_session = SessionModel.revoke_session(session_id)
+    if revoked_session:
+        revocation_filter.add_session(revoked_session)
+    sessions_cache[session_id] = None
+    return revoked_session
 
-def delete_refresh_token(user_id: str) -> DeleteResult:
-    deleted_refresh_token = TokenModel.delete_refresh_token_by_user_id(user_id)
-    return deleted_refresh_token
 
+def revoke_user_sessions(user_id: str) -> UpdateResult:
+    revoked_sessions = SessionModel.revoke_sessions_by_user_id(user_id)
+    for session_id, session in list(sessions_cache.items()):
+        if session and session.get("user_id") == user_id:
+            sessions_cache[session_id] = None
+    revocation_filter.sync()
+    return revoked_sessions
 
+
+# Sólo se consulta la sesión (con caché) cuando el filtro de revocación indica un posible positivo
 @jwt.token_in_blocklist_loader
 def check_if_token_active_callback(
     jwt_header: dict, jwt_payload: dict
 ) -> Union[bool, None]:
     if config == "config.DevelopmentConfig":
         return False
-    check_token = TokenModel.get_active_token_by_user_id(jwt_payload["sub"])
-    return True if not check_token else False
+    session_id = jwt_payload.get("sid")
+    if not session_id:
+        return True
+    if not revocation_filter.might_be_revoked(jwt_payload.get("jti")):
+        return False
+    session = get_session(session_id)
+    if session and session.get(f"{jwt_payload.get('type')}_jti") == jwt_payload.get(
+        "jti"
+    ):
+        revocation_filter.record_false_positive()
+        return False
+    return True
 
 
 @jwt.revoked_token_loader
@@ -59,17 +59,31 @@ class ValueCustomError(Exception):
         elif self.error_type == "too_many_requests":
             self.message = "Se han reenviado demasiados emails de confirmación. Inténtalo más tarde."
             self.status_code = 429
+        elif self.error_type == "rate_limited":
+            self.message = (
+                "Se han realizado demasiadas solicitudes. Inténtalo más tarde."
+            )
+            self.status_code = 429
         elif self.error_type == "resource_required":
             self.message = (
                 f"'{self.resource.capitalize()}' requerido para esta operación"
             )
             self.status_code = 400
+        elif self.error_type == "invalid_value":
+            self.message = f"El valor de '{self.resource}' no es válido"
+            self.status_code = 400
+        elif self.error_type == "out_of_stock":
+            self.message = f"No hay existencias suficientes para preparar el pedido: {self.resource}"
+            self.status_code = 409
+        elif self.error_type == "conflict":
+            self.message = f"{self.resource.capitalize()} ha cambiado mientras se procesaba la solicitud. Inténtalo de nuevo."
+            self.status_code = 409
         elif self.error_type == "bar_closed_manually":
             self.message = (
                 "No se aceptan pedidos en este momento. Prueba dentro de un rato."
             )
         elif self.error_type == "bar_closed_schedule":
-            self.message = "El bar está cerrado. Nuestro horario es: de 13:00 a 16:00 y de 20:00 a 0:00."
+            self.message = "El bar está cerrado en este momento. Consulta nuestro horario de apertura."
 
         if self.error_type in [
             "password_not_match",
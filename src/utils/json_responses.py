@@ -7,6 +7,7 @@ def success_json_response(
     action: Literal[
         "añadido",
         "añadida",
+        "añadidos",
         "actualizado",
         "actualizada",
         "eliminado",
@@ -17,6 +18,8 @@ def success_json_response(
         "confirmada",
         "reenviado",
         "reenviada",
+        "revocado",
+        "revocada",
     ],
     status_code: int = 200,
 ) -> tuple[Response, int]:
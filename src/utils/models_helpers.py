@@ -1,9 +1,22 @@
-from typing import List, NotRequired, Literal, Dict, Union
+from typing import (
+    Annotated,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    NotRequired,
+    Optional,
+    Union,
+    get_args,
+)
 from typing_extensions import TypedDict
+from pydantic import Field
 from datetime import datetime
 from pymongo.cursor import Cursor
 from bson import ObjectId
 
+from src.utils.exception_handlers import ValueCustomError
+
 
 class Ingredient(TypedDict):
     name: str
@@ -20,13 +33,21 @@ class ItemOrder(TypedDict):
 
 
 class ItemBasket(TypedDict):
+    item_id: NotRequired[str]
     name: str
     qty: int
     price: float
     custom: NotRequired[Union[Dict[str, bool], None]]
 
 
+# Evento del historial de estados de un pedido
+class StateEvent(TypedDict):
+    state: str
+    at: datetime
+
+
 class Address(TypedDict):
+    address_id: NotRequired[str]
     name: NotRequired[str]
     line_one: str
     line_two: NotRequired[str]
@@ -48,6 +69,109 @@ class Address(TypedDict):
         "03015",
         "03016",
     ]
+    zone: NotRequired[str]
+
+
+Weekday = Literal[
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"
+]
+TimeStr = Annotated[str, Field(pattern=r"^([01][0-9]|2[0-3]):[0-5][0-9]$")]
+DateStr = Annotated[str, Field(pattern=r"^[0-9]{4}-[0-9]{2}-[0-9]{2}$")]
+
+
+# Si "close" es anterior o igual a "open", el intervalo termina al día siguiente (p. ej. de 20:00 a 00:00)
+class TimeInterval(TypedDict):
+    open: TimeStr
+    close: TimeStr
+
+
+# Día con horario propio (eventos, vísperas...). Con "intervals" vacío, el bar cierra ese día.
+class SpecialDay(TypedDict):
+    date: DateStr
+    name: NotRequired[str]
+    intervals: List[TimeInterval]
+
+
+# Valor del ajuste "opening_hours". Los días que no aparecen en "week" y los "holidays" el bar está cerrado.
+class OpeningHours(TypedDict):
+    timezone: str
+    week: Dict[Weekday, List[TimeInterval]]
+    holidays: NotRequired[List[DateStr]]
+    special_days: NotRequired[List[SpecialDay]]
+
+
+# Zonas de reparto. Es la única definición a modificar si cambia el área de reparto.
+DELIVERY_ZONES = {
+    "centro": ("03001", "03002", "03003", "03004", "03005"),
+    "intermedia": ("03006", "03007", "03008", "03009", "03010", "03011"),
+    "periferia": ("03012", "03013", "03014", "03015", "03016"),
+}
+
+# Tabla código postal -> zona calculada una sola vez al importar el módulo
+POSTAL_CODE_ZONES = {
+    postal_code: zone
+    for postal_code in get_args(Address.__annotations__["postal_code"])
+    for zone, postal_codes in DELIVERY_ZONES.items()
+    if postal_code in postal_codes
+}
+
+
+def get_delivery_zone(postal_code: str) -> Optional[str]:
+    return POSTAL_CODE_ZONES.get(postal_code)
+
+
+# Convierte el parámetro "fields" ("?fields=name,email") en una proyección de MongoDB. Sólo se admiten campos de
+# primer nivel incluidos en "allowed_fields"; "_id" se devuelve siempre. Sin "fields" se usa la proyección por defecto.
+def get_fields_projection(
+    fields: Optional[str], allowed_fields: Iterable[str], default: Optional[dict] = None
+) -> Optional[dict]:
+    if not fields:
+        return default
+    requested_fields = [field.strip() for field in fields.split(",") if field.strip()]
+    if not requested_fields or not set(requested_fields) <= set(allowed_fields):
+        raise ValueCustomError("invalid_value", "fields")
+    return {field: 1 for field in requested_fields}
+
+
+# Selección de campos sobre documentos ya cargados en memoria, con el mismo criterio que "get_fields_projection"
+def apply_fields_projection(
+    documents: List[dict], projection: Optional[dict]
+) -> List[dict]:
+    if not projection:
+        return documents
+    return [
+        {key: value for key, value in document.items() if key in {"_id", *projection}}
+        for document in documents
+    ]
+
+
+MAX_BATCH_IDS = 100
+
+
+# Convierte el parámetro "ids" ("?ids=a,b,c") en una lista de ids sin repetidos y en el orden de la solicitud
+def get_batch_ids(ids: str) -> List[str]:
+    batch_ids = list(
+        dict.fromkeys(
+            batch_id.strip() for batch_id in ids.split(",") if batch_id.strip()
+        )
+    )
+    if (
+        not batch_ids
+        or len(batch_ids) > MAX_BATCH_IDS
+        or not all(ObjectId.is_valid(batch_id) for batch_id in batch_ids)
+    ):
+        raise ValueCustomError("invalid_value", "ids")
+    return batch_ids
+
+
+# Ordena los documentos según "ids" y devuelve también los ids que no se han encontrado
+def sort_by_ids(documents: List[dict], ids: List[str]) -> tuple[List[dict], List[str]]:
+    documents_by_id = {document["_id"]: document for document in documents}
+    found = [
+        documents_by_id[batch_id] for batch_id in ids if batch_id in documents_by_id
+    ]
+    missing = [batch_id for batch_id in ids if batch_id not in documents_by_id]
+    return found, missing
 
 
 def to_json_serializable(obj):
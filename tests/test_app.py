@@ -16,11 +16,12 @@ def test_blueprints_registration(app):
         "products",
         "settings",
         "auth",
-        "active_tokens",
-        "refresh_tokens",
+        "sessions",
         "email_tokens",
         "orders",
         "dishes",
+        "metrics",
+        "reports",
     ]
 
     assert all(bp in app.blueprints for bp in expected_blueprints)
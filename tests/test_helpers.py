@@ -2,6 +2,7 @@ import pytest
 
 from flask_jwt_extended import create_access_token, create_refresh_token
 from src.app import run_app
+from src.services import rate_limit_service
 from config import config
 
 ID = "507f1f77bcf86cd799439011"
@@ -11,6 +12,7 @@ ID = "507f1f77bcf86cd799439011"
 def app():
     app = run_app(config)
     app.config["TESTING"] = True
+    rate_limit_service.rate_limit_backend = rate_limit_service.MemoryRateLimitBackend()
     return app
 
 
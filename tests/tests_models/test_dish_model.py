@@ -232,5 +232,39 @@ def test_update_dishes_availability(mock_db):
     mock_db.update_many.assert_called_once()
 
 
+def test_dish_allergens_from_products(mocker, mock_db):
+    mock_products = mocker.patch("src.services.db_service.db.products")
+    mock_products.find.return_value = [
+        {"name": "Huevo", "allergens": ["huevo"]},
+        {"name": "Harina", "allergens": ["gluten", "huevo"]},
+        {"name": "Azúcar"},
+    ]
+    dish = DishModel(
+        **{
+            **VALID_DATA,
+            "ingredients": [
+                {"name": "Huevo", "waste": 0.1},
+                {"name": "Harina", "waste": 0.2},
+                {"name": "Azúcar", "waste": 0.1},
+            ],
+        }
+    )
+    assert dish.allergens == ["gluten", "huevo"]
+
+
+def test_get_menu(mock_db):
+    mock_db.find.return_value = [VALID_DATA]
+    assert DishModel.get_menu() == [VALID_DATA]
+
+
+def test_update_dishes_allergens(mock_db):
+    mock_db.update_many.return_value.modified_count = 1
+    result = DishModel.update_dishes_allergens("Harina", ["gluten"])
+    assert result.modified_count == 1
+    query, pipeline = mock_db.update_many.call_args.args
+    assert query == {"ingredients.name": "Harina"}
+    assert "allergens" in pipeline[1]["$set"]
+
+
 def test_delete_dish(mock_db):
     return assert_delete_document_template(mock_db, DishModel.delete_dish)
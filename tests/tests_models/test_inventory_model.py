@@ -0,0 +1,100 @@
+import pytest
+from datetime import datetime
+from pydantic import ValidationError
+
+from src.models.inventory_model import InventoryMovementModel, InventorySnapshotModel
+
+PRODUCT_ID = "66c5e0f7d7f3a1b2c3d4e5f6"
+VALID_MOVEMENT = {
+    "product_id": PRODUCT_ID,
+    "product": "Tomate",
+    "qty": 12.5,
+    "reason": "delivery",
+}
+
+
+@pytest.fixture
+def mock_db(mocker):
+    return mocker.patch("src.models.inventory_model.db")
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {**VALID_MOVEMENT, "qty": 0},
+        {**VALID_MOVEMENT, "reason": "gift"},
+        {**VALID_MOVEMENT, "order_id": "1234"},
+        {**VALID_MOVEMENT, "product": ""},
+        {**VALID_MOVEMENT, "product_id": "Tomate"},
+    ],
+)
+def test_movement_validation_error(data):
+    with pytest.raises(ValidationError):
+        InventoryMovementModel(**data)
+
+
+def test_opening_movement_allows_zero():
+    movement = InventoryMovementModel(
+        **{**VALID_MOVEMENT, "qty": 0, "reason": "opening"}
+    )
+    assert movement.qty == 0
+
+
+def test_get_opened_products(mock_db):
+    mock_db.inventory_movements.distinct.return_value = [PRODUCT_ID]
+
+    assert InventoryMovementModel.get_opened_products() == {PRODUCT_ID}
+    mock_db.inventory_movements.distinct.assert_called_once_with(
+        "product_id", {"reason": "opening"}
+    )
+
+
+def test_insert_movements(mock_db):
+    InventoryMovementModel.insert_movements([InventoryMovementModel(**VALID_MOVEMENT)])
+
+    documents = mock_db.inventory_movements.insert_many.call_args.args[0]
+    assert documents[0]["qty"] == 12.5
+    assert "order_id" not in documents[0]
+
+
+def test_insert_movements_empty(mock_db):
+    InventoryMovementModel.insert_movements([])
+
+    mock_db.inventory_movements.insert_many.assert_not_called()
+
+
+def test_get_totals(mock_db):
+    since, until = datetime(2025, 5, 1), datetime(2025, 5, 2)
+    mock_db.inventory_movements.aggregate.return_value = [
+        {"_id": PRODUCT_ID, "qty": 3.5}
+    ]
+
+    assert InventoryMovementModel.get_totals(since, until) == {PRODUCT_ID: 3.5}
+    pipeline = mock_db.inventory_movements.aggregate.call_args.args[0]
+    assert pipeline[0] == {"$match": {"created_at": {"$gt": since, "$lte": until}}}
+    assert pipeline[1]["$group"]["_id"] == "$product_id"
+
+
+def test_get_movements_by_product(mock_db):
+    start, end = datetime(2025, 5, 1), datetime(2025, 5, 2)
+
+    InventoryMovementModel.get_movements(start, end, 0, 50, PRODUCT_ID)
+
+    query = mock_db.inventory_movements.find.call_args.args[0]
+    assert query == {
+        "created_at": {"$gte": start, "$lt": end},
+        "product_id": PRODUCT_ID,
+    }
+
+
+def test_get_latest_snapshot(mock_db):
+    until = datetime(2025, 5, 1)
+    mock_db.inventory_snapshots.find_one.return_value = {
+        "until": until,
+        "stocks": [{"product_id": PRODUCT_ID, "stock": 10}],
+    }
+
+    assert InventorySnapshotModel.get_latest_snapshot() == {
+        "until": until,
+        "stocks": {PRODUCT_ID: 10},
+    }
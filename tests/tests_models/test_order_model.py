@@ -1,7 +1,16 @@
 import pytest
 import re
 
-from src.models.order_model import OrderModel
+from datetime import datetime
+from bson import ObjectId
+
+from src.models.order_model import (
+    OrderModel,
+    ARCHIVE_STATES,
+    ORDER_LIST_PROJECTION,
+    ORDER_SUMMARY_PROJECTION,
+    to_archived_order,
+)
 from tests.test_helpers import (
     assert_get_document_template,
     assert_insert_document_template,
@@ -11,6 +20,7 @@ from tests.test_helpers import (
 )
 
 
+ID = "507f1f77bcf86cd799439012"
 USER_ID_PATTERN = re.compile(r"^[a-f0-9]{24}$")
 VALID_DATA = {
     "user_id": "507f1f77bcf86cd799439011",
@@ -45,6 +55,13 @@ def mock_db(mocker):
     return mock_db
 
 
+@pytest.fixture
+def mock_archive(mocker):
+    mock_archive = mocker.MagicMock()
+    mocker.patch("src.services.db_service.db.orders_archive", new=mock_archive)
+    return mock_archive
+
+
 def test_order_valid_data():
     order = OrderModel(**VALID_DATA)
     VALID_DATA["items"][0]["custom"] = {"Huevo": True, "Tomate": True}
@@ -297,20 +314,180 @@ def test_get_orders(mock_db):
     )
 
 
-def test_get_orders_by_user_id(mock_db):
+@pytest.mark.parametrize(
+    "fields, expected_projection",
+    [
+        (None, ORDER_LIST_PROJECTION),
+        ("state,total_price", {"state": 1, "total_price": 1}),
+    ],
+)
+def test_get_orders_projection(mock_db, fields, expected_projection):
     mock_cursor = mock_db.find.return_value
     mock_cursor.skip.return_value = mock_cursor
     mock_cursor.limit.return_value = [VALID_DATA]
-    result = OrderModel.get_orders_by_user_id(VALID_DATA["user_id"], 1, 10)
-    assert result[0]["user_id"] == VALID_DATA["user_id"]
-    assert result == [VALID_DATA]
-    mock_db.find.assert_called_once()
+    OrderModel.get_orders(0, 10, fields)
+    mock_db.find.assert_called_once_with({}, expected_projection)
+
+
+@pytest.mark.parametrize(
+    "user_id, expected_query",
+    [
+        (None, {"_id": {"$in": [ObjectId(ID)]}}),
+        (
+            "507f1f77bcf86cd799439011",
+            {"_id": {"$in": [ObjectId(ID)]}, "user_id": "507f1f77bcf86cd799439011"},
+        ),
+    ],
+)
+def test_get_orders_by_ids(mock_db, mock_archive, user_id, expected_query):
+    mock_db.find.return_value = [{"_id": ObjectId(ID)}]
+    result = OrderModel.get_orders_by_ids([ID], user_id=user_id)
+    assert result == [{"_id": ID}]
+    mock_db.find.assert_called_once_with(expected_query, ORDER_LIST_PROJECTION)
+    mock_archive.find.assert_not_called()
+
+
+def test_get_orders_by_ids_archive_fallback(mock_db, mock_archive):
+    archived_id = "507f1f77bcf86cd799439013"
+    mock_db.find.return_value = [{"_id": ObjectId(ID)}]
+    mock_archive.find.return_value = [{"_id": ObjectId(archived_id)}]
+    result = OrderModel.get_orders_by_ids([ID, archived_id])
+    assert result == [{"_id": ID}, {"_id": archived_id}]
+    mock_archive.find.assert_called_once_with(
+        {"_id": {"$in": [ObjectId(archived_id)]}}, ORDER_LIST_PROJECTION
+    )
+
+
+def test_get_order_fields_includes_user_id(mock_db):
+    mock_db.find_one.return_value = VALID_DATA
+    OrderModel.get_order(ID, "state")
+    mock_db.find_one.assert_called_once_with(
+        {"_id": ObjectId(ID)}, {"_id": 0, "state": 1, "user_id": 1}
+    )
+
+
+def test_get_orders_by_user_id(mock_db, mock_archive):
+    mock_cursor = mock_db.find.return_value
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.limit.return_value = [
+        {"_id": ObjectId(ID), "created_at": datetime(2025, 10, 10)}
+    ]
+    result = OrderModel.get_orders_by_user_id(VALID_DATA["user_id"], 10)
+    assert result == [{"_id": ID, "created_at": "2025-10-10T00:00:00"}]
+    mock_db.find.assert_called_once_with(
+        {"user_id": VALID_DATA["user_id"]}, ORDER_SUMMARY_PROJECTION
+    )
+    mock_cursor.sort.assert_called_once_with([("created_at", -1), ("_id", -1)])
+    mock_cursor.limit.assert_called_once_with(10)
+
+
+def test_get_orders_by_user_id_before_with_detail(mock_db, mock_archive):
+    mock_cursor = mock_db.find.return_value
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.limit.return_value = []
+    before = datetime(2025, 10, 10, 12, 0)
+    OrderModel.get_orders_by_user_id(VALID_DATA["user_id"], 10, before, True)
+    mock_db.find.assert_called_once_with(
+        {"user_id": VALID_DATA["user_id"], "created_at": {"$lt": before}}, None
+    )
+
+
+def test_get_orders_by_user_id_compound_cursor(mock_db, mock_archive):
+    mock_cursor = mock_db.find.return_value
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.limit.return_value = []
+    before = datetime(2025, 10, 10, 12, 0)
+    OrderModel.get_orders_by_user_id(VALID_DATA["user_id"], 10, before, False, ID)
+    query = mock_db.find.call_args.args[0]
+    assert query["$or"] == [
+        {"created_at": {"$lt": before}},
+        {"created_at": before, "_id": {"$lt": ObjectId(ID)}},
+    ]
 
 
 def test_get_order(mock_db):
     return assert_get_document_template(mock_db, OrderModel.get_order, VALID_DATA)
 
 
+def test_get_orders_by_user_id_merges_archive(mock_db, mock_archive):
+    for collection, dates in [(mock_db, [12, 9]), (mock_archive, [11, 8])]:
+        mock_cursor = collection.find.return_value
+        mock_cursor.sort.return_value = mock_cursor
+        mock_cursor.limit.return_value = [
+            {"_id": ObjectId(), "created_at": datetime(2025, 10, day)} for day in dates
+        ]
+    result = OrderModel.get_orders_by_user_id(VALID_DATA["user_id"], 3)
+    assert [order["created_at"][:10] for order in result] == [
+        "2025-10-12",
+        "2025-10-11",
+        "2025-10-09",
+    ]
+
+
+@pytest.mark.parametrize("include_archive", [False, True])
+def test_get_order_archive_fallback(mock_db, mock_archive, include_archive):
+    mock_db.find_one.return_value = None
+    mock_archive.find_one.return_value = {"state": "delivered"}
+    result = OrderModel.get_order(ID, include_archive=include_archive)
+    assert result == ({"state": "delivered"} if include_archive else None)
+    assert mock_archive.find_one.called == include_archive
+
+
+def test_to_archived_order():
+    order = {"_id": ObjectId(ID), **OrderModel(**VALID_DATA).model_dump()}
+    archived_order = to_archived_order(order)
+    assert "address" not in archived_order
+    assert archived_order["zone"] == order["address"]["zone"]
+    assert all("ingredients" not in item for item in archived_order["items"])
+    assert isinstance(archived_order["archived_at"], datetime)
+    assert "ingredients" in order["items"][0]
+
+
+def test_get_archivable_orders(mock_db):
+    before = datetime(2025, 7, 1)
+    mock_cursor = mock_db.find.return_value
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.limit.return_value = [VALID_DATA]
+    assert OrderModel.get_archivable_orders(before, 100) == [VALID_DATA]
+    mock_db.find.assert_called_once_with(
+        {"state": {"$in": ARCHIVE_STATES}, "created_at": {"$lt": before}}
+    )
+    mock_cursor.limit.assert_called_once_with(100)
+
+
+def test_archive_orders(mock_db, mock_archive):
+    order = {"_id": ObjectId(ID), **OrderModel(**VALID_DATA).model_dump()}
+    mock_db.delete_many.return_value.deleted_count = 1
+    assert OrderModel.archive_orders([order]) == 1
+    (requests,), kwargs = mock_archive.bulk_write.call_args
+    assert requests[0]._filter == {"_id": ObjectId(ID)}
+    assert requests[0]._upsert is True
+    mock_db.delete_many.assert_called_once_with(
+        {"_id": {"$in": [ObjectId(ID)]}, "state": {"$in": ARCHIVE_STATES}}
+    )
+
+
+def test_archive_orders_empty(mock_db, mock_archive):
+    assert OrderModel.archive_orders([]) == 0
+    mock_archive.bulk_write.assert_not_called()
+    mock_db.delete_many.assert_not_called()
+
+
+def test_order_initial_timeline():
+    order = OrderModel(**VALID_DATA)
+    assert order.timeline == [{"state": order.state, "at": order.created_at}]
+
+
+def test_update_order_pushes_event(mock_db):
+    event = {"state": "cooking", "at": datetime(2025, 10, 10, 14)}
+    mock_db.find_one_and_update.return_value = VALID_DATA
+    OrderModel(**VALID_DATA).update_order(ID, None, "accepted", event)
+    query, update = mock_db.find_one_and_update.call_args.args
+    assert query["state"] == "accepted"
+    assert update["$push"] == {"timeline": event}
+    assert "timeline" not in update["$set"]
+
+
 def test_update_order(mock_db):
     new_data = {**VALID_DATA, "type_order": "local"}
     order_object = OrderModel(**new_data)
@@ -319,3 +496,19 @@ def test_update_order(mock_db):
 
 def test_delete_order(mock_db):
     return assert_delete_document_template(mock_db, OrderModel.delete_order)
+
+
+def test_delete_order_expected_state(mock_db, mock_archive):
+    mock_db.delete_one.return_value.deleted_count = 0
+    assert OrderModel.delete_order(ID, None, "cooking").deleted_count == 0
+    mock_db.delete_one.assert_called_once_with(
+        {"_id": ObjectId(ID), "state": "cooking"}, session=None
+    )
+    mock_archive.delete_one.assert_not_called()
+
+
+def test_delete_order_archive_fallback(mock_db, mock_archive):
+    mock_db.delete_one.return_value.deleted_count = 0
+    mock_archive.delete_one.return_value.deleted_count = 1
+    assert OrderModel.delete_order(ID).deleted_count == 1
+    mock_archive.delete_one.assert_called_once_with({"_id": ObjectId(ID)})
@@ -1,17 +1,22 @@
 import pytest
+from bson import ObjectId
 from pydantic import ValidationError
 from flask_jwt_extended import create_access_token
+from pymongo import ReturnDocument
 
 from src.models.product_model import (
     ProductModel,
     get_allowed_values,
+    get_order_ingredients,
 )
+from src.utils.exception_handlers import ValueCustomError
 from tests.test_helpers import (
+    app,
     assert_insert_document_template,
     assert_get_all_documents_template,
     assert_get_document_template,
-    assert_update_document_template,
     assert_delete_document_template,
+    ID,
 )
 
 USER_ID = "507f1f77bcf86cd799439011"
@@ -119,7 +124,7 @@ def test_product_valid_data():
     assert all(
         allergen in get_allowed_values("allergens") for allergen in product.allergens
     )
-    assert isinstance(product.stock, int) and product.stock >= 0
+    assert isinstance(product.stock, float) and product.stock >= 0
     assert product.brand is None or (
         isinstance(product.brand, str) and 1 <= len(product.brand) <= 50
     )
@@ -308,26 +313,121 @@ def test_get_product(mock_db_products):
     )
 
 
+def test_product_fractional_stock():
+    product = ProductModel.model_construct(stock=2.75)
+    assert ProductModel.model_fields["stock"].annotation is float
+    assert product.stock == 2.75
+
+
 def test_update_product(mock_db_products):
     new_data = {**VALID_DATA, "name": "new_value"}
-    return assert_update_document_template(
-        mock_db_products, ProductModel(**new_data).update_product, new_data
+    mock_db_products.find_one_and_update.return_value = {
+        **VALID_DATA,
+        "stock": 7,
+        "reserved": 2,
+    }
+    previous_product, updated_product = ProductModel(**new_data).update_product(ID)
+    assert previous_product["stock"] == 7
+    assert updated_product["name"] == "new_value"
+    assert updated_product["stock"] == new_data["stock"]
+    assert updated_product["reserved"] == 2
+    assert (
+        mock_db_products.find_one_and_update.call_args.kwargs["return_document"]
+        == ReturnDocument.BEFORE
     )
 
 
-def test_update_product_stock_by_name(mock_db_products):
-    mock_db_products.find_one_and_update.return_value = {**VALID_DATA, "stock": 100}
-    item_data = {
+def test_update_product_not_found(mock_db_products):
+    mock_db_products.find_one_and_update.return_value = None
+    assert ProductModel(**VALID_DATA).update_product(ID) == (None, None)
+
+
+ITEMS_ORDER = [
+    {
         "name": "Plato 1",
         "ingredients": [
-            {"name": "Cacahuetes", "allergens": ["cereal", "huevo"], "waste": 10}
+            {"name": "Cacahuetes", "allergens": ["cereal", "huevo"], "waste": 10},
+            {"name": "Sal", "waste": 1},
         ],
-        "qty": 10,
+        "qty": 2,
         "price": 10.99,
+    },
+    {"name": "Plato 2", "ingredients": [{"name": "Sal", "waste": 1}], "qty": 1},
+]
+
+
+def test_get_order_ingredients():
+    assert get_order_ingredients(ITEMS_ORDER) == {"Cacahuetes": 20, "Sal": 3}
+
+
+def test_reserve_stock(mock_db_products):
+    mock_db_products.bulk_write.return_value.matched_count = 2
+
+    ProductModel.reserve_stock(ITEMS_ORDER)
+
+    operations = mock_db_products.bulk_write.call_args.args[0]
+    assert len(operations) == 2
+    assert operations[0]._doc == {"$inc": {"reserved": 20}}
+    assert operations[0]._filter["$expr"]["$gte"][1] == 20
+
+
+def test_reserve_stock_out_of_stock_error(app, mock_db_products):
+    mock_db_products.bulk_write.return_value.matched_count = 1
+    mock_db_products.find.return_value = [
+        {"name": "Cacahuetes", "stock": 30, "reserved": 15},
+        {"name": "Sal", "stock": 10},
+    ]
+
+    with app.app_context():
+        with pytest.raises(ValueCustomError) as error:
+            ProductModel.reserve_stock(ITEMS_ORDER)
+
+    assert error.value.error_type == "out_of_stock"
+    assert error.value.resource == "Cacahuetes"
+
+
+@pytest.mark.parametrize("method", ["release_stock", "commit_stock"])
+def test_release_and_commit_stock(mock_db_products, method):
+    getattr(ProductModel, method)(ITEMS_ORDER)
+
+    operations = mock_db_products.bulk_write.call_args.args[0]
+    update = operations[0]._doc[0]["$set"]
+    assert len(operations) == 2
+    assert "reserved" in update
+    assert ("stock" in update) is (method == "commit_stock")
+
+
+def test_get_stocks_by_id(mock_db_products):
+    mock_db_products.find.return_value = [
+        {"_id": ObjectId(ID), "name": "Cacahuetes", "stock": 2.5}
+    ]
+
+    assert ProductModel.get_stocks() == {ID: {"name": "Cacahuetes", "stock": 2.5}}
+
+
+def test_apply_stock_movements(mock_db_products):
+    other_id = "507f1f77bcf86cd799439012"
+    mock_db_products.find_one_and_update.side_effect = [
+        {"_id": ObjectId(ID), "name": "Cacahuetes", "stock": 12.5},
+        None,
+    ]
+
+    assert ProductModel.apply_stock_movements({ID: 2.5, other_id: -3}) == {
+        ID: {"name": "Cacahuetes", "stock": 12.5}
+    }
+    calls = mock_db_products.find_one_and_update.call_args_list
+    assert calls[0].args[0] == {"_id": ObjectId(ID)}
+    assert calls[1].args[0] == {"_id": ObjectId(other_id), "stock": {"$gte": 3}}
+    assert calls[1].kwargs["return_document"] == ReturnDocument.AFTER
+
+
+def test_get_product_ids(mock_db_products):
+    mock_db_products.find.return_value = [{"_id": ObjectId(ID), "name": "Cacahuetes"}]
+
+    assert ProductModel.get_product_ids(["Cacahuetes", "Sal"]) == {"Cacahuetes": ID}
+    assert mock_db_products.find.call_args.args[0] == {
+        "name": {"$in": ["Cacahuetes", "Sal"]}
     }
-    result = ProductModel.update_product_stock_by_name([item_data])
-    assert result[0]["stock"] == 100
-    mock_db_products.find_one_and_update.assert_called_once()
 
 
 def test_delete_product(mock_db_products):
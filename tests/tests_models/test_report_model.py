@@ -0,0 +1,143 @@
+import pytest
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from src.models.report_model import (
+    ReportModel,
+    get_percentiles,
+    get_report_key,
+    get_service,
+    get_timing_bucket,
+    to_field_key,
+)
+
+ORDER_DATA = {
+    "items": [
+        {
+            "name": "pizza",
+            "qty": 2,
+            "price": 10.0,
+            "ingredients": [
+                {"name": "tomate", "waste": 0.5},
+                {"name": "queso", "waste": 1},
+            ],
+        },
+        {
+            "name": "pan de ajo",
+            "qty": 1,
+            "price": 4.0,
+            "ingredients": [{"name": "tomate", "waste": 0.25}],
+        },
+    ],
+    "total_price": 24.0,
+    # 14:30 en Madrid
+    "created_at": datetime(2025, 10, 10, 12, 30, tzinfo=timezone.utc),
+}
+
+
+@pytest.fixture(autouse=True)
+def mock_get_timezone(mocker):
+    return mocker.patch(
+        "src.models.report_model.opening_hours.get_timezone",
+        return_value=ZoneInfo("Europe/Madrid"),
+    )
+
+
+@pytest.fixture
+def mock_db(mocker):
+    mock_db = mocker.MagicMock()
+    mocker.patch("src.services.db_service.db.reports", new=mock_db)
+    return mock_db
+
+
+@pytest.mark.parametrize(
+    "hour, expected_service",
+    [(14, "lunch"), (21, "dinner"), (18, "other")],
+)
+def test_get_service(hour, expected_service):
+    assert get_service(datetime(2025, 10, 10, hour)) == expected_service
+
+
+@pytest.mark.parametrize(
+    "order_date, expected_key",
+    [
+        (datetime(2025, 10, 10, 19, 30, tzinfo=timezone.utc), ("2025-10-10", "dinner")),
+        (datetime(2025, 10, 10, 22, 30, tzinfo=timezone.utc), ("2025-10-11", "other")),
+        (datetime(2025, 1, 10, 12, 30, tzinfo=timezone.utc), ("2025-01-10", "lunch")),
+    ],
+)
+def test_get_report_key(order_date, expected_key):
+    assert get_report_key(order_date) == expected_key
+
+
+def test_to_field_key():
+    assert to_field_key("s.a.l") == "s．a．l"
+    assert "$" not in to_field_key("$pan")
+
+
+def test_add_order_sale(mock_db):
+    ReportModel.add_order_sale(ORDER_DATA)
+
+    query, update = mock_db.update_one.call_args.args
+    assert query == {"_id": "2025-10-10:lunch"}
+    assert update["$inc"] == {
+        "orders": 1,
+        "revenue": 24.0,
+        "dishes.pizza.qty": 2,
+        "dishes.pizza.revenue": 20.0,
+        "dishes.pan de ajo.qty": 1,
+        "dishes.pan de ajo.revenue": 4.0,
+    }
+    assert update["$set"]["dishes.pizza.name"] == "pizza"
+    assert mock_db.update_one.call_args.kwargs["upsert"] is True
+
+
+def test_add_order_consumption(mock_db):
+    ReportModel.add_order_consumption(ORDER_DATA)
+
+    query, update = mock_db.update_one.call_args.args
+    assert query == {"_id": "2025-10-10:lunch"}
+    assert update["$inc"] == {
+        "ingredients.tomate.consumed": 1.25,
+        "ingredients.queso.consumed": 2,
+    }
+
+
+def test_get_reports(mock_db):
+    mock_db.find.return_value.sort.return_value = [{"date": "2025-10-10"}]
+
+    result = ReportModel.get_reports("2025-10-01", "2025-10-10", {"orders": 1})
+
+    assert result == [{"date": "2025-10-10"}]
+    assert mock_db.find.call_args.args[0] == {
+        "date": {"$gte": "2025-10-01", "$lte": "2025-10-10"}
+    }
+
+
+@pytest.mark.parametrize(
+    "seconds, expected_bucket", [(30, 0), (60, 0), (61, 1), (600, 6), (9000, 13)]
+)
+def test_get_timing_bucket(seconds, expected_bucket):
+    assert get_timing_bucket(seconds) == expected_bucket
+
+
+def test_get_percentiles():
+    # 10 pedidos entre 5 y 7 minutos y 10 entre 10 y 15 minutos
+    buckets = {"5": 10, "7": 10}
+
+    assert get_percentiles(buckets) == {"p50": 420.0, "p90": 840.0, "p95": 870.0}
+    assert get_percentiles({}) == {"p50": None, "p90": None, "p95": None}
+
+
+def test_add_state_duration(mock_db):
+    ReportModel.add_state_duration(ORDER_DATA, "cooking", 400)
+
+    query, update = mock_db.update_one.call_args.args
+    assert query == {"_id": "2025-10-10:lunch"}
+    assert update["$inc"] == {
+        "timings.cooking.count": 1,
+        "timings.cooking.total": 400,
+        "timings.cooking.buckets.5": 1,
+        "timings.dishes.pizza.buckets.5": 1,
+        "timings.dishes.pan de ajo.buckets.5": 1,
+    }
@@ -0,0 +1,120 @@
+import pytest
+from datetime import datetime
+from pydantic import ValidationError
+from bson import ObjectId
+
+from src.models.session_model import SessionModel
+from tests.test_helpers import (
+    assert_get_all_documents_template,
+    assert_get_document_template,
+)
+
+ID = "507f1f77bcf86cd799439011"
+VALID_DATA = {
+    "session_id": "507f1f77bcf86cd799439012",
+    "user_id": ID,
+    "access_jti": "bb53e637-8627-457c-840f-6cae52a12e8b",
+    "access_expires_at": 1900757341,
+    "refresh_jti": "cc53e637-8627-457c-840f-6cae52a12e8b",
+    "expires_at": 1900757341,
+}
+
+SESSION_OBJECT = SessionModel(**VALID_DATA)
+
+
+@pytest.fixture
+def mock_db(mocker):
+    mock_db = mocker.MagicMock()
+    mocker.patch("src.services.db_service.db.sessions", new=mock_db)
+    return mock_db
+
+
+def test_session_model_valid_data():
+    assert SESSION_OBJECT.session_id == VALID_DATA["session_id"]
+    assert isinstance(SESSION_OBJECT.access_expires_at, datetime)
+    assert isinstance(SESSION_OBJECT.expires_at, datetime)
+    assert isinstance(SESSION_OBJECT.created_at, datetime)
+
+
+def test_session_model_default_session_id():
+    session_data = {
+        key: value for key, value in VALID_DATA.items() if key != "session_id"
+    }
+    session = SessionModel(**session_data)
+    assert ObjectId.is_valid(session.session_id)
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("user_id", "507f1f77bcf86cd79943901122"),
+        ("access_jti", "bb53e637dd-8627-457c-840f-6cae52a12e8b"),
+        ("refresh_jti", ""),
+        ("session_id", "not_an_id"),
+        ("expires_at", None),
+    ],
+)
+def test_session_validation_errors(field, value):
+    with pytest.raises(ValidationError):
+        SessionModel(**{**VALID_DATA, field: value})
+
+
+def test_insert_session(mock_db):
+    mock_db.insert_one.return_value.inserted_id = ObjectId(VALID_DATA["session_id"])
+    result = SESSION_OBJECT.insert_session()
+    inserted_document = mock_db.insert_one.call_args.args[0]
+    assert result.inserted_id == inserted_document["_id"]
+    assert "session_id" not in inserted_document
+    mock_db.insert_one.assert_called_once()
+
+
+def test_get_sessions(mock_db):
+    return assert_get_all_documents_template(
+        mock_db, SessionModel.get_sessions, [VALID_DATA]
+    )
+
+
+def test_get_session(mock_db):
+    return assert_get_document_template(mock_db, SessionModel.get_session, VALID_DATA)
+
+
+def test_update_session_access_token(mock_db):
+    mock_db.find_one_and_update.return_value = {"access_jti": VALID_DATA["access_jti"]}
+    result = SessionModel.update_session_access_token(
+        ID, "dd53e637-8627-457c-840f-6cae52a12e8b", datetime.now()
+    )
+    assert result == {"access_jti": VALID_DATA["access_jti"]}
+    pipeline = mock_db.find_one_and_update.call_args.args[1]
+    assert isinstance(pipeline, list)
+    assert "revoked_jtis" in pipeline[0]["$set"]
+    mock_db.find_one_and_update.assert_called_once()
+
+
+def test_revoke_session(mock_db):
+    mock_db.find_one_and_update.return_value = {**VALID_DATA, "revoked": True}
+    result = SessionModel.revoke_session(ID)
+    assert result["revoked"] is True
+    update = mock_db.find_one_and_update.call_args.args[1]
+    assert update["$set"]["revoked"] is True
+    mock_db.find_one_and_update.assert_called_once()
+
+
+def test_revoke_sessions_by_user_id(mock_db):
+    mock_db.update_many.return_value.modified_count = 2
+    result = SessionModel.revoke_sessions_by_user_id(ID)
+    assert result.modified_count == 2
+    assert mock_db.update_many.call_args.args[0]["user_id"] == ID
+
+
+@pytest.mark.parametrize(
+    "since, expected_query",
+    [
+        (None, {"revoked_at": {"$ne": None}}),
+        (datetime(2030, 1, 1), {"revoked_at": {"$gt": datetime(2030, 1, 1)}}),
+    ],
+)
+def test_get_revoked_sessions(mock_db, since, expected_query):
+    mock_db.find.return_value = [VALID_DATA]
+    result = SessionModel.get_revoked_sessions(since)
+    assert result == [VALID_DATA]
+    assert mock_db.find.call_args.args[0] == expected_query
@@ -91,3 +91,43 @@ def test_update_setting(mock_db):
 
 def test_delete_setting(mock_db):
     return assert_delete_document_template(mock_db, SettingModel.delete_setting)
+
+
+def test_update_setting_value_by_name(mock_db):
+    SettingModel.update_setting_value_by_name("manual_closure", False, {"value": True})
+    query, update = mock_db.update_one.call_args.args
+    assert query == {"name": "manual_closure", "value": True}
+    assert update["$set"]["value"] is False
+
+
+OPENING_HOURS = {
+    "timezone": "Europe/Madrid",
+    "week": {"tuesday": [{"open": "13:00", "close": "16:00"}]},
+    "holidays": ["2025-12-25"],
+}
+
+
+@pytest.mark.parametrize(
+    "name, value, is_valid",
+    [
+        ("opening_hours", OPENING_HOURS, True),
+        ("opening_hours", {**OPENING_HOURS, "timezone": "Europe/Nowhere"}, False),
+        ("opening_hours", {**OPENING_HOURS, "holidays": ["2025-13-40"]}, False),
+        (
+            "opening_hours",
+            {
+                **OPENING_HOURS,
+                "week": {"tuesday": [{"open": "25:00", "close": "16:00"}]},
+            },
+            False,
+        ),
+        ("opening_hours", True, False),
+        ("TestSetting", OPENING_HOURS, False),
+    ],
+)
+def test_setting_opening_hours(name, value, is_valid):
+    if is_valid:
+        assert SettingModel(name=name, value=value).value == value
+    else:
+        with pytest.raises(ValidationError):
+            SettingModel(name=name, value=value)
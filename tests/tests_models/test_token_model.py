@@ -38,8 +38,6 @@ JTI_PATTERN = re.compile(
 @pytest.fixture
 def mock_db(mocker):
     mock_db = mocker.MagicMock()
-    mocker.patch("src.services.db_service.db.refresh_tokens", new=mock_db)
-    mocker.patch("src.services.db_service.db.active_tokens", new=mock_db)
     mocker.patch("src.services.db_service.db.email_tokens", new=mock_db)
     return mock_db
 
@@ -78,95 +76,30 @@ def test_token_validation_errors(user_id, jti, expires_at):
         TokenModel(user_id=user_id, jti=jti, expires_at=expires_at)
 
 
-@pytest.mark.parametrize(
-    "insert_token_function",
-    [
-        TOKEN_OBJECT.insert_refresh_token,
-        TOKEN_OBJECT.insert_email_token,
-        TOKEN_OBJECT.insert_active_token,
-    ],
-)
-def test_insert_token(mock_db, insert_token_function):
-    return assert_insert_document_template(mock_db, insert_token_function)
+def test_insert_email_token(mock_db):
+    return assert_insert_document_template(mock_db, TOKEN_OBJECT.insert_email_token)
 
 
-@pytest.mark.parametrize(
-    "get_tokens_function, expected_result",
-    [
-        (TokenModel.get_refresh_tokens, [VALID_DATA]),
-        (TokenModel.get_email_tokens, [VALID_DATA]),
-        (TokenModel.get_active_tokens, [VALID_DATA]),
-    ],
-)
-def test_get_all_tokens(mock_db, get_tokens_function, expected_result):
+def test_get_email_tokens(mock_db):
     return assert_get_all_documents_template(
-        mock_db, get_tokens_function, expected_result
+        mock_db, TokenModel.get_email_tokens, [VALID_DATA]
     )
 
 
-@pytest.mark.parametrize(
-    "get_token_function, expected_result",
-    [
-        (TokenModel.get_refresh_token_by_user_id, VALID_DATA),
-        (TokenModel.get_active_token_by_user_id, VALID_DATA),
-        (TokenModel.get_email_token, VALID_DATA),
-        (TokenModel.get_active_token_by_token_id, VALID_DATA),
-        (TokenModel.get_refresh_token_by_token_id, VALID_DATA),
-    ],
-)
-def test_get_token(mock_db, get_token_function, expected_result):
-    return assert_get_document_template(mock_db, get_token_function, expected_result)
+def test_get_email_token(mock_db):
+    return assert_get_document_template(mock_db, TokenModel.get_email_token, VALID_DATA)
 
 
-@pytest.mark.parametrize(
-    "update_token_function, expected_result",
-    [
-        (
-            TOKEN_OBJECT_UPDATED.update_refresh_token,
-            {**VALID_DATA, "expires_at": "2030-03-22T14:22:05+01:00"},
-        ),
-        (
-            TOKEN_OBJECT_UPDATED.update_email_token,
-            {**VALID_DATA, "expires_at": "2030-03-22T14:22:05+01:00"},
-        ),
-        (
-            TOKEN_OBJECT_UPDATED.update_active_token,
-            {**VALID_DATA, "expires_at": "2030-03-22T14:22:05+01:00"},
-        ),
-    ],
-)
-def test_update_token(mock_db, update_token_function, expected_result):
+def test_update_email_token(mock_db):
     return assert_update_document_template(
-        mock_db, update_token_function, expected_result
+        mock_db,
+        TOKEN_OBJECT_UPDATED.update_email_token,
+        {**VALID_DATA, "expires_at": "2030-03-22T14:22:05+01:00"},
     )
 
 
-@pytest.mark.parametrize(
-    "delete_token_function",
-    [
-        TokenModel.delete_refresh_token_by_token_id,
-        TokenModel.delete_email_token,
-        TokenModel.delete_active_token_by_token_id,
-        TokenModel.delete_refresh_token_by_user_id,
-        TokenModel.delete_active_token_by_user_id,
-    ],
-)
-def test_delete_token(mock_db, delete_token_function):
-    return assert_delete_document_template(mock_db, delete_token_function)
-
-
-@pytest.mark.parametrize(
-    "update_or_insert_token_function",
-    [
-        TOKEN_OBJECT.update_or_insert_refresh_token_by_user_id,
-        TOKEN_OBJECT.update_or_insert_active_token_by_user_id,
-    ],
-)
-def test_update_or_insert_token(mock_db, update_or_insert_token_function):
-    mock_db.find_one_and_update.return_value = VALID_DATA
-    result = update_or_insert_token_function(ID)
-    assert result == VALID_DATA
-    mock_db.find_one_and_update.assert_called_once()
+def test_delete_email_token(mock_db):
+    return assert_delete_document_template(mock_db, TokenModel.delete_email_token)
 
 
 def test_get_email_tokens_by_user_id(mock_db):
@@ -2,10 +2,13 @@ import pytest
 import re
 from pydantic import ValidationError
 from email_validator import validate_email
-from datetime import datetime
+from datetime import datetime, timezone
+from bson import ObjectId
 
-from src.models.user_model import UserModel
+from src.models.user_model import UserModel, USER_LIST_PROJECTION
+from src.utils.exception_handlers import ValueCustomError
 from tests.test_helpers import (
+    app,
     assert_update_document_template,
     assert_delete_document_template,
     assert_get_document_template,
@@ -320,11 +323,32 @@ def test_insert_user(mock_db):
     )
 
 
-def test_insert_or_update_user_by_email(mock_db):
-    mock_db.find_one_and_update.return_value = VALID_DATA_EMAIL
-    result = UserModel(**VALID_DATA_EMAIL).insert_or_update_user_by_email()
-    assert result == VALID_DATA_EMAIL
-    mock_db.find_one_and_update.assert_called_once()
+@pytest.mark.parametrize(
+    "context, expected_calls", [(None, 1), ({"stored_email": "test@example.com"}, 0)]
+)
+def test_user_email_deliverability_stored_email(mocker, context, expected_calls):
+    mock_check = mocker.patch("src.models.user_model.deliverability_cache.check")
+    UserModel.model_validate(
+        {**VALID_DATA_EMAIL, "email": "test@example.com"}, context=context
+    )
+    assert mock_check.call_count == expected_calls
+
+
+def test_upsert_google_user(mock_db):
+    mock_db.find_one_and_update.return_value = {"_id": ObjectId(ID), "role": 3}
+    result = UserModel.upsert_google_user("test_user", "test_user@google.com")
+    assert result == {"_id": ID, "role": 3}
+    query, update = mock_db.find_one_and_update.call_args.args
+    assert query == {"email": "test_user@google.com"}
+    assert update["$set"] == {
+        "name": "test_user",
+        "auth_provider": "google",
+        "confirmed": True,
+        "expires_at": None,
+    }
+    assert update["$setOnInsert"]["role"] == 3
+    assert not set(update["$set"]) & set(update["$setOnInsert"])
+    assert mock_db.find_one_and_update.call_args.kwargs["projection"] == {"role": 1}
 
 
 def test_get_users(mock_db):
@@ -333,6 +357,40 @@ def test_get_users(mock_db):
     )
 
 
+@pytest.mark.parametrize(
+    "fields, expected_projection",
+    [
+        (None, USER_LIST_PROJECTION),
+        ("name,email", {"name": 1, "email": 1}),
+    ],
+)
+def test_get_users_projection(mock_db, fields, expected_projection):
+    mock_cursor = mock_db.find.return_value
+    mock_cursor.skip.return_value = mock_cursor
+    mock_cursor.limit.return_value = []
+    UserModel.get_users(0, 10, fields)
+    mock_db.find.assert_called_once_with({}, expected_projection)
+
+
+def test_get_users_password_field_error(app, mock_db):
+    with app.app_context(), pytest.raises(ValueCustomError):
+        UserModel.get_users(0, 10, "name,password")
+    mock_db.find.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "fields, expected_projection",
+    [
+        (None, {"_id": 0, "password": 0}),
+        ("name", {"_id": 0, "name": 1}),
+    ],
+)
+def test_get_user_profile(mock_db, fields, expected_projection):
+    mock_db.find_one.return_value = VALID_DATA_EMAIL
+    UserModel.get_user_profile(ID, fields)
+    mock_db.find_one.assert_called_once_with({"_id": ObjectId(ID)}, expected_projection)
+
+
 @pytest.mark.parametrize(
     "method, expected_result",
     [
@@ -351,6 +409,21 @@ def test_get_user_by_email(mock_db):
     mock_db.find_one.assert_called_once()
 
 
+def test_get_user_login_data_by_email(mock_db):
+    login_data = {
+        "_id": ID,
+        "password": "hashed_password",
+        "confirmed": True,
+        "role": 3,
+    }
+    mock_db.find_one.return_value = login_data
+    result = UserModel.get_user_login_data_by_email(VALID_DATA_EMAIL["email"])
+    assert result == login_data
+    projection = mock_db.find_one.call_args.args[1]
+    assert set(projection.keys()) == {"password", "confirmed", "role"}
+    mock_db.find_one.assert_called_once()
+
+
 def test_update_user(mock_db):
     new_data = {**VALID_DATA_EMAIL, "name": "Jane Doe"}
     user_object = UserModel(**new_data)
@@ -359,3 +432,104 @@ def test_update_user(mock_db):
 
 def test_delete_user(mock_db):
     return assert_delete_document_template(mock_db, UserModel.delete_user)
+
+
+BASKET_ITEM = {"name": "Hamburguesa", "qty": 1, "price": 9.5, "custom": None}
+
+
+def test_add_basket_item_increments_existing_item(mock_db):
+    mock_db.find_one_and_update.return_value = {"basket": [{**BASKET_ITEM, "qty": 2}]}
+    result = UserModel.add_basket_item(ID, BASKET_ITEM)
+    assert result == [{**BASKET_ITEM, "qty": 2}]
+    query, update = mock_db.find_one_and_update.call_args.args
+    assert query["basket"] == {"$elemMatch": {"name": "Hamburguesa", "custom": None}}
+    assert update == {"$inc": {"basket.$.qty": 1}}
+
+
+def test_add_basket_item_pushes_new_item(mock_db):
+    mock_db.find_one_and_update.side_effect = [None, {"basket": [BASKET_ITEM]}]
+    result = UserModel.add_basket_item(ID, BASKET_ITEM)
+    assert result == [BASKET_ITEM]
+    query, pipeline = mock_db.find_one_and_update.call_args.args
+    assert "$not" in query["basket"]
+    new_item = pipeline[0]["$set"]["basket"]["$concatArrays"][1][0]["$literal"]
+    assert new_item["name"] == "Hamburguesa" and len(new_item["item_id"]) == 24
+
+
+def test_add_basket_item_user_not_found(mock_db):
+    mock_db.find_one_and_update.return_value = None
+    assert UserModel.add_basket_item(ID, BASKET_ITEM) is None
+    assert mock_db.find_one_and_update.call_count == 4
+
+
+@pytest.mark.parametrize(
+    "method, args, expected_update",
+    [
+        (
+            UserModel.update_basket_item_qty,
+            (ID, "item", 3),
+            {"$set": {"basket.$.qty": 3}},
+        ),
+        (
+            UserModel.remove_basket_item,
+            (ID, "item"),
+            {"$pull": {"basket": {"item_id": "item"}}},
+        ),
+        (UserModel.clear_basket, (ID,), {"$set": {"basket": []}}),
+    ],
+)
+def test_basket_updates(mock_db, method, args, expected_update):
+    mock_db.find_one_and_update.return_value = {"basket": []}
+    assert method(*args) == []
+    assert mock_db.find_one_and_update.call_args.args[1] == expected_update
+    mock_db.find_one_and_update.return_value = None
+    assert method(*args) is None
+
+
+ADDRESS = {
+    "address_id": "507f1f77bcf86cd799439012",
+    "line_one": "Calle Mayor 1",
+    "postal_code": "03001",
+    "zone": "centro",
+}
+
+
+def test_get_addresses(mock_db):
+    mock_db.find_one.return_value = {"addresses": None}
+    assert UserModel.get_addresses(ID) == []
+    mock_db.find_one.return_value = None
+    assert UserModel.get_addresses(ID) is None
+
+
+def test_add_address(mock_db):
+    mock_db.find_one_and_update.return_value = {"addresses": [ADDRESS]}
+    assert UserModel.add_address(ID, ADDRESS) == [ADDRESS]
+    pipeline = mock_db.find_one_and_update.call_args.args[1]
+    assert pipeline[0]["$set"]["addresses"]["$concatArrays"][1] == [
+        {"$literal": ADDRESS}
+    ]
+
+
+def test_update_address(mock_db):
+    mock_db.find_one_and_update.return_value = {"addresses": [ADDRESS]}
+    result = UserModel.update_address(ID, ADDRESS["address_id"], ADDRESS)
+    assert result == [ADDRESS]
+    args, kwargs = mock_db.find_one_and_update.call_args
+    assert args[1] == {"$set": {"addresses.$[address]": ADDRESS}}
+    assert kwargs["array_filters"] == [{"address.address_id": ADDRESS["address_id"]}]
+
+
+def test_delete_address_not_found(mock_db):
+    mock_db.find_one_and_update.return_value = None
+    assert UserModel.delete_address(ID, ADDRESS["address_id"]) is None
+    assert mock_db.find_one_and_update.call_args.args[1] == {
+        "$pull": {"addresses": {"address_id": ADDRESS["address_id"]}}
+    }
+
+
+def test_delete_expired_users_only_unconfirmed(mock_db):
+    now = datetime.now(timezone.utc)
+    UserModel.delete_expired_users(now)
+    mock_db.delete_many.assert_called_once_with(
+        {"confirmed": False, "expires_at": {"$lt": now}}
+    )
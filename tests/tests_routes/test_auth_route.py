@@ -19,6 +19,7 @@ INVALID_USER_DATA = {
     "password": "wrong_password",
 }
 ID = "507f1f77bcf86cd799439011"
+SESSION_ID = "507f1f77bcf86cd799439012"
 VALID_TOKEN_DATA = {
     "user_id": ID,
     "jti": "123e4567-e89b-42d3-a456-426614174000",
@@ -52,8 +53,11 @@ def mock_generate_access_token(mocker):
 
 
 @pytest.fixture
-def mock_generate_refresh_token(mocker):
-    return mocker.patch("src.routes.auth_route.generate_refresh_token")
+def mock_generate_session_tokens(mocker):
+    return mocker.patch(
+        "src.routes.auth_route.generate_session_tokens",
+        return_value=("access_token", "refresh_token"),
+    )
 
 
 @pytest.fixture
@@ -66,22 +70,6 @@ def mock_verify_password(mocker):
     return mocker.patch("src.routes.auth_route.verify_password")
 
 
-@pytest.fixture
-def mock_db_get_email_tokens(mocker):
-    return mocker.patch.object(
-        TokenModel,
-        "get_email_tokens_by_user_id",
-        return_value=[
-            {
-                "user_id": ID,
-                "jti": "123e4567-e89b-12d3-a456-426614174000",
-                "created_at": "2025-10-10T12:00:00Z",
-                "expires_at": "2025-12-10T12:00:00Z",
-            }
-        ],
-    )
-
-
 @pytest.fixture
 def mock_db_get_user_by_user_id(mocker):
     return mocker.patch.object(UserModel, "get_user_by_user_id")
@@ -97,6 +85,11 @@ def mock_db_get_user_by_email(mocker):
     return mocker.patch.object(UserModel, "get_user_by_email")
 
 
+@pytest.fixture
+def mock_db_get_user_login_data_by_email(mocker):
+    return mocker.patch.object(UserModel, "get_user_login_data_by_email")
+
+
 @pytest.fixture
 def mock_db_insert_user(mocker):
     return mocker.patch.object(UserModel, "insert_user")
@@ -108,13 +101,24 @@ def mock_db_update_user(mocker):
 
 
 @pytest.fixture
-def mock_db_get_refresh_token_by_user_id(mocker):
-    return mocker.patch.object(TokenModel, "get_refresh_token_by_user_id")
+def mock_run_in_transaction(mocker):
+    return mocker.patch(
+        "src.routes.auth_route.run_in_transaction",
+        side_effect=lambda operations: operations(None),
+    )
+
+
+@pytest.fixture
+def mock_get_session(mocker):
+    return mocker.patch("src.routes.auth_route.get_session")
 
 
 @pytest.fixture
 def mock_google_access(mocker):
-    return mocker.patch("src.routes.auth_route.google.authorize_access_token")
+    return mocker.patch(
+        "src.routes.auth_route.google.authorize_access_token",
+        return_value={"access_token": "access_token", "id_token": "id_token"},
+    )
 
 
 @pytest.fixture
@@ -126,11 +130,11 @@ def mock_google_parse(mocker):
 
 
 @pytest.fixture
-def insert_or_update_call_db(mocker):
+def mock_upsert_google_user(mocker):
     return mocker.patch.object(
         UserModel,
-        "insert_or_update_user_by_email",
-        return_value={**VALID_USER_DATA, "_id": ID},
+        "upsert_google_user",
+        return_value={"_id": ID, "role": 3},
     )
 
 
@@ -147,15 +151,18 @@ def test_user_not_found_error(
     client,
     auth_header,
     mock_decode_token,
-    mock_db_get_email_tokens,
     mock_db_get_user_by_user_id,
     mock_db_get_user_by_email,
+    mock_db_get_user_login_data_by_email,
     mock_db_get_user_by_user_id_without_id,
     mock_get_jwt,
     url,
     method,
 ):
-    if ("login" in url) or ("resend-email" in url):
+    if "login" in url:
+        mock_db_get_user_login_data_by_email.return_value = None
+        get_user_call_db = mock_db_get_user_login_data_by_email
+    elif "resend-email" in url:
         mock_db_get_user_by_email.return_value = None
         get_user_call_db = mock_db_get_user_by_email
     else:
@@ -192,6 +199,22 @@ def test_register_success(mocker, client, mock_send_email, mock_db_insert_user):
     mock_send_email.assert_called_once()
 
 
+def test_register_transaction_error_does_not_send_email(
+    mocker, client, mock_send_email, mock_run_in_transaction
+):
+    # Sin validar el email contra DNS: sólo importa el orden entre la transacción y el envío
+    mocker.patch("src.routes.auth_route.UserModel")
+    mock_run_in_transaction.side_effect = PyMongoError("Database error")
+
+    response = client.post(
+        "/auth/register",
+        json=VALID_USER_DATA,
+    )
+
+    assert response.status_code == 500
+    mock_send_email.assert_not_called()
+
+
 def test_register_with_role_error(client):
     response = client.post(
         "/auth/register",
@@ -319,20 +342,17 @@ def test_change_email_without_password_error(
 
 def test_login_success(
     client,
-    mock_db_get_user_by_email,
-    mock_generate_access_token,
-    mock_generate_refresh_token,
+    mock_db_get_user_login_data_by_email,
+    mock_generate_session_tokens,
     mock_verify_password,
 ):
-    mock_db_get_user_by_email.return_value = {
+    mock_db_get_user_login_data_by_email.return_value = {
         **VALID_USER_DATA,
         "_id": ID,
         "confirmed": True,
     }
 
     mock_verify_password.return_value = True
-    mock_generate_access_token.return_value = "access_token"
-    mock_generate_refresh_token.return_value = "refresh_token"
 
     response = client.post("/auth/login", json=VALID_USER_DATA)
 
@@ -343,49 +363,54 @@ def test_login_success(
     )
     assert response.json["access_token"] == "access_token"
     assert response.json["refresh_token"] == "refresh_token"
-    mock_db_get_user_by_email.assert_called_once()
+    mock_db_get_user_login_data_by_email.assert_called_once()
     mock_verify_password.assert_called_once()
-    mock_generate_access_token.assert_called_once()
-    mock_generate_refresh_token.assert_called_once()
+    mock_generate_session_tokens.assert_called_once()
 
 
 def test_login_password_not_match_error(
-    client, mock_db_get_user_by_email, mock_verify_password
+    client, mock_db_get_user_login_data_by_email, mock_verify_password
 ):
-    mock_db_get_user_by_email.return_value = INVALID_USER_DATA
+    mock_db_get_user_login_data_by_email.return_value = INVALID_USER_DATA
     mock_verify_password.return_value = False
 
     response = client.post("/auth/login", json=INVALID_USER_DATA)
 
     assert response.status_code == 401
     assert response.json["err"] == "password_not_match"
-    mock_db_get_user_by_email.assert_called_once()
+    mock_db_get_user_login_data_by_email.assert_called_once()
     mock_verify_password.assert_called_once()
 
 
 def test_login_user_not_confirmed_error(
-    client, mock_db_get_user_by_email, mock_verify_password
+    client, mock_db_get_user_login_data_by_email, mock_verify_password
 ):
-    mock_db_get_user_by_email.return_value = {**INVALID_USER_DATA, "confirmed": False}
+    mock_db_get_user_login_data_by_email.return_value = {
+        **INVALID_USER_DATA,
+        "confirmed": False,
+    }
     mock_verify_password.return_value = True
 
     response = client.post("/auth/login", json=INVALID_USER_DATA)
 
     assert response.status_code == 401
     assert response.json["err"] == "email_not_confirmed"
-    mock_db_get_user_by_email.assert_called_once()
+    mock_db_get_user_login_data_by_email.assert_called_once()
     mock_verify_password.assert_called_once()
 
 
 def test_login_db_error(
     client,
-    mock_db_get_user_by_email,
+    mock_db_get_user_login_data_by_email,
     mock_verify_password,
-    mock_generate_access_token,
+    mock_generate_session_tokens,
 ):
-    mock_db_get_user_by_email.return_value = {**VALID_USER_DATA, "confirmed": True}
+    mock_db_get_user_login_data_by_email.return_value = {
+        **VALID_USER_DATA,
+        "confirmed": True,
+    }
     mock_verify_password.return_value = True
-    mock_generate_access_token.side_effect = PyMongoError("Database error")
+    mock_generate_session_tokens.side_effect = PyMongoError("Database error")
 
     response = client.post(
         "/auth/login",
@@ -397,24 +422,20 @@ def test_login_db_error(
 
     assert response.status_code == 500
     assert response.json["err"] == "db_generic"
-    mock_db_get_user_by_email.assert_called_once()
+    mock_db_get_user_login_data_by_email.assert_called_once()
     mock_verify_password.assert_called_once()
-    mock_generate_access_token.assert_called_once()
+    mock_generate_session_tokens.assert_called_once()
 
 
 def test_logout_success(client, auth_header, mock_get_jwt, mocker):
-    mock_get_jwt.return_value = {"sub": ID}
-    mock_delete_active_token = mocker.patch("src.routes.auth_route.delete_active_token")
-    mock_delete_refresh_token = mocker.patch(
-        "src.routes.auth_route.delete_refresh_token"
-    )
+    mock_get_jwt.return_value = {"sub": ID, "sid": SESSION_ID}
+    mock_revoke_session = mocker.patch("src.routes.auth_route.revoke_session")
 
     response = client.post("/auth/logout", headers=auth_header)
 
     assert response.status_code == 200
     assert response.json["msg"] == "Logout del usuario realizado de forma satisfactoria"
-    mock_delete_active_token.assert_called_once()
-    mock_delete_refresh_token.assert_called_once()
+    mock_revoke_session.assert_called_once_with(SESSION_ID)
 
 
 def test_login_google_success(client, mocker):
@@ -434,16 +455,12 @@ def test_callback_google_success(
     client,
     mock_google_access,
     mock_google_parse,
-    insert_or_update_call_db,
-    mock_generate_access_token,
-    mock_generate_refresh_token,
+    mock_upsert_google_user,
+    mock_generate_session_tokens,
 ):
     mock_google_access
     mock_google_parse
-    insert_or_update_call_db
-
-    mock_generate_access_token.return_value = "access_token"
-    mock_generate_refresh_token.return_value = "refresh_token"
+    mock_upsert_google_user
 
     response = client.get("/auth/callback/google")
 
@@ -456,9 +473,43 @@ def test_callback_google_success(
     assert response.json["refresh_token"] == "refresh_token"
     mock_google_access.assert_called_once()
     mock_google_parse.assert_called_once()
-    insert_or_update_call_db.assert_called_once()
-    mock_generate_refresh_token.assert_called_once()
-    mock_generate_access_token.assert_called_once()
+    mock_upsert_google_user.assert_called_once_with("test_user", "test_user@google.com")
+    mock_generate_session_tokens.assert_called_once()
+
+
+def test_callback_google_userinfo_not_parsed_again(
+    client,
+    mock_google_access,
+    mock_google_parse,
+    mock_upsert_google_user,
+    mock_generate_session_tokens,
+):
+    mock_google_access.return_value = {
+        "id_token": "id_token",
+        "userinfo": {"name": "test_user", "email": "test_user@google.com"},
+    }
+
+    response = client.get("/auth/callback/google")
+
+    assert response.status_code == 200
+    mock_google_parse.assert_not_called()
+    mock_upsert_google_user.assert_called_once()
+
+
+def test_callback_google_email_not_verified_error(
+    client, mock_google_access, mock_google_parse, mock_upsert_google_user
+):
+    mock_google_parse.return_value = {
+        "name": "test_user",
+        "email": "test_user@google.com",
+        "email_verified": False,
+    }
+
+    response = client.get("/auth/callback/google")
+
+    assert response.status_code == 401
+    assert response.json["err"] == "email_not_confirmed"
+    mock_upsert_google_user.assert_not_called()
 
 
 def test_callback_google_db_error(
@@ -466,13 +517,13 @@ def test_callback_google_db_error(
     mock_get_jwt,
     mock_google_parse,
     mock_google_access,
-    insert_or_update_call_db,
-    mock_generate_access_token,
+    mock_upsert_google_user,
+    mock_generate_session_tokens,
 ):
     mock_google_access
     mock_google_parse
-    insert_or_update_call_db
-    mock_generate_access_token.side_effect = PyMongoError("Database error")
+    mock_upsert_google_user
+    mock_generate_session_tokens.side_effect = PyMongoError("Database error")
 
     response = client.get("/auth/callback/google")
 
@@ -480,8 +531,8 @@ def test_callback_google_db_error(
     assert response.json["err"] == "db_generic"
     mock_google_access.assert_called_once()
     mock_google_parse.assert_called_once()
-    insert_or_update_call_db.assert_called_once()
-    mock_generate_access_token.assert_called_once()
+    mock_upsert_google_user.assert_called_once()
+    mock_generate_session_tokens.assert_called_once()
 
 
 def test_refresh_token_success(
@@ -490,10 +541,10 @@ def test_refresh_token_success(
     mock_get_jwt,
     mock_generate_access_token,
     mock_db_get_user_by_user_id,
-    mock_db_get_refresh_token_by_user_id,
+    mock_get_session,
 ):
-    mock_get_jwt.return_value({"sub": ID})
-    mock_db_get_refresh_token_by_user_id.return_value = VALID_TOKEN_DATA
+    mock_get_jwt.return_value = {"sub": ID, "sid": SESSION_ID}
+    mock_get_session.return_value = {"_id": SESSION_ID, "user_id": ID}
     mock_db_get_user_by_user_id.return_value = VALID_USER_DATA
     mock_generate_access_token.return_value = "access_token"
 
@@ -502,25 +553,27 @@ def test_refresh_token_success(
     assert response.status_code == 200
     assert response.json["msg"] == "Token de acceso generado de forma satisfactoria"
     assert response.json["access_token"] == "access_token"
-    mock_db_get_refresh_token_by_user_id.assert_called_once()
+    mock_get_session.assert_called_once_with(SESSION_ID)
     mock_db_get_user_by_user_id.assert_called_once()
-    mock_generate_access_token.assert_called_once()
+    mock_generate_access_token.assert_called_once_with(VALID_USER_DATA, SESSION_ID)
 
 
 def test_refresh_token_error(
-    client, auth_header_refresh, mock_get_jwt, mock_db_get_refresh_token_by_user_id
+    client, auth_header_refresh, mock_get_jwt, mock_get_session
 ):
     mock_get_jwt.return_value({"role": 3, "sub": ID})
-    mock_db_get_refresh_token_by_user_id.return_value = None
+    mock_get_session.return_value = None
 
     response = client.get("/auth/refresh-token", headers=auth_header_refresh)
 
     assert response.status_code == 404
     assert response.json["err"] == "not_found"
-    mock_db_get_refresh_token_by_user_id.assert_called_once()
+    mock_get_session.assert_called_once()
 
 
 def test_confirm_email_success(
+    mocker,
+    mock_run_in_transaction,
     client,
     mock_db_get_user_by_user_id_without_id,
     mock_db_update_user,
@@ -537,6 +590,9 @@ def test_confirm_email_success(
         "auth_provider": "email",
         "confirmed": True,
     }
+    mock_delete_email_tokens = mocker.patch(
+        "src.routes.auth_route.TokenModel.delete_email_tokens_by_user_id"
+    )
 
     response = client.get("/auth/confirm-email/test_token")
 
@@ -545,6 +601,8 @@ def test_confirm_email_success(
     mock_decode_token.assert_called_once()
     mock_db_get_user_by_user_id_without_id.assert_called_once()
     mock_db_update_user.assert_called_once()
+    mock_run_in_transaction.assert_called_once()
+    mock_delete_email_tokens.assert_called_once_with(ID, session=None)
 
 
 def test_confirm_email_invalid_token_error(client, mock_decode_token):
@@ -576,6 +634,8 @@ def test_confirm_email_already_confirmed_error(
 
 
 def test_confirm_email_mongodb_error(
+    mocker,
+    mock_run_in_transaction,
     mock_db_update_user,
     client,
     mock_db_get_user_by_user_id_without_id,
@@ -588,6 +648,9 @@ def test_confirm_email_mongodb_error(
         "confirmed": False,
     }
     mock_db_update_user.side_effect = PyMongoError("Database error")
+    mock_delete_email_tokens = mocker.patch(
+        "src.routes.auth_route.TokenModel.delete_email_tokens_by_user_id"
+    )
 
     response = client.get("/auth/confirm-email/test_token")
 
@@ -596,13 +659,11 @@ def test_confirm_email_mongodb_error(
     mock_decode_token.assert_called_once()
     mock_db_get_user_by_user_id_without_id.assert_called_once()
     mock_db_update_user.assert_called_once()
+    mock_delete_email_tokens.assert_not_called()
 
 
-def test_resend_email_success(
-    client, mock_db_get_user_by_email, mock_send_email, mock_db_get_email_tokens
-):
+def test_resend_email_success(client, mock_db_get_user_by_email, mock_send_email):
     mock_db_get_user_by_email.return_value = {**VALID_USER_DATA, "_id": ID}
-    mock_db_get_email_tokens
     mock_send_email
 
     response = client.post(
@@ -613,24 +674,118 @@ def test_resend_email_success(
     assert (
         response.json["msg"] == "Email de confirmación reenviado de forma satisfactoria"
     )
-    mock_db_get_email_tokens.assert_called_once()
     mock_db_get_user_by_email.assert_called_once()
     mock_send_email.assert_called_once()
 
 
 def test_resend_email_too_many_requests_error(
-    client, mock_db_get_email_tokens, mock_db_get_user_by_email
+    client, mock_db_get_user_by_email, mock_send_email
 ):
     mock_db_get_user_by_email.return_value = {**VALID_USER_DATA, "_id": ID}
-    mock_db_get_email_tokens.return_value = mock_db_get_email_tokens.return_value * 5
+    mock_send_email
 
+    for _ in range(5):
+        client.post(f"/auth/resend-email", json={"email": VALID_USER_DATA["email"]})
     response = client.post(
-        f"/auth/resend-email", json={"email": VALID_USER_DATA["email"]}
+        f"/auth/resend-email", json={"email": VALID_USER_DATA["email"].upper()}
     )
 
     assert response.status_code == 429
     assert response.json["err"] == "too_many_requests"
-    mock_db_get_email_tokens.assert_called_once()
+    assert mock_db_get_user_by_email.call_count == 5
+
+
+def test_resend_email_account_limit_is_per_ip(
+    client, mock_db_get_user_by_email, mock_send_email
+):
+    mock_db_get_user_by_email.return_value = {**VALID_USER_DATA, "_id": ID}
+
+    for _ in range(5):
+        client.post(f"/auth/resend-email", json={"email": VALID_USER_DATA["email"]})
+    response = client.post(
+        f"/auth/resend-email",
+        json={"email": VALID_USER_DATA["email"]},
+        environ_base={"REMOTE_ADDR": "203.0.113.7"},
+    )
+
+    assert response.status_code == 200
+    assert mock_send_email.call_count == 6
+
+
+def test_login_rate_limited_error(client, mock_db_get_user_login_data_by_email):
+    mock_db_get_user_login_data_by_email.return_value = None
+
+    for _ in range(5):
+        client.post("/auth/login", json=VALID_USER_DATA)
+    response = client.post("/auth/login", json=VALID_USER_DATA)
+
+    assert response.status_code == 429
+    assert response.json["err"] == "rate_limited"
+    assert mock_db_get_user_login_data_by_email.call_count == 5
+
+
+def test_login_successes_do_not_consume_account_limit(
+    mocker, client, mock_db_get_user_login_data_by_email
+):
+    mock_db_get_user_login_data_by_email.return_value = {
+        **VALID_USER_DATA,
+        "_id": ID,
+        "confirmed": True,
+    }
+    mocker.patch("src.routes.auth_route.verify_password", return_value=True)
+    mock_generate_session_tokens = mocker.patch(
+        "src.routes.auth_route.generate_session_tokens",
+        return_value=("access", "refresh"),
+    )
+
+    for _ in range(6):
+        response = client.post("/auth/login", json=VALID_USER_DATA)
+
+    assert response.status_code == 200
+    assert mock_generate_session_tokens.call_count == 6
+
+
+def test_login_failures_are_limited_per_ip(
+    client, mock_db_get_user_login_data_by_email
+):
+    mock_db_get_user_login_data_by_email.return_value = None
+
+    for _ in range(5):
+        client.post("/auth/login", json=VALID_USER_DATA)
+    response = client.post(
+        "/auth/login",
+        json=VALID_USER_DATA,
+        environ_base={"REMOTE_ADDR": "203.0.113.7"},
+    )
+
+    assert response.status_code == 404
+    assert response.json["err"] == "not_found"
+
+
+@pytest.mark.parametrize(
+    "trust_fly_client_ip, status_code", [(False, 429), (True, 404)]
+)
+def test_login_fly_client_ip_only_trusted_when_enabled(
+    mocker,
+    client,
+    mock_db_get_user_login_data_by_email,
+    trust_fly_client_ip,
+    status_code,
+):
+    mocker.patch(
+        "src.services.rate_limit_service.TRUST_FLY_CLIENT_IP", trust_fly_client_ip
+    )
+    mock_db_get_user_login_data_by_email.return_value = None
+
+    for _ in range(5):
+        client.post("/auth/login", json=VALID_USER_DATA)
+    response = client.post(
+        "/auth/login",
+        json=VALID_USER_DATA,
+        headers={"Fly-Client-IP": "203.0.113.7"},
+    )
+
+    assert response.status_code == status_code
 
 
 def test_resend_email_resource_required_error(client):
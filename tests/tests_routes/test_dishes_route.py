@@ -2,6 +2,7 @@ import pytest
 import json
 
 from src.models.dish_model import DishModel
+from src.services.menu_service import MenuIndex
 from tests.test_helpers import app, client, auth_header
 
 
@@ -15,6 +16,11 @@ VALID_DISH_DATA = {
 ID = "507f1f77bcf86cd799439011"
 
 
+@pytest.fixture(autouse=True)
+def mock_refresh_menu(mocker):
+    return mocker.patch("src.routes.dishes_route.refresh_menu")
+
+
 @pytest.fixture
 def mock_get_jwt(mocker):
     return mocker.patch("src.routes.dishes_route.get_jwt")
@@ -161,6 +167,90 @@ def test_get_dishes_success(mocker, client):
     mock_db.assert_called_once()
 
 
+def test_get_dishes_exclude_allergens_success(mocker, client):
+    mock_menu = mocker.patch(
+        "src.routes.dishes_route.menu_index.get_dishes",
+        return_value=[{**VALID_DISH_DATA, "_id": str(i)} for i in range(15)],
+    )
+    mock_db = mocker.patch.object(DishModel, "get_dishes")
+
+    response = client.get("/dishes/?exclude_allergens=gluten,lactosa&page=2")
+
+    assert response.status_code == 200
+    assert [dish["_id"] for dish in response.json] == [str(i) for i in range(10, 15)]
+    mock_menu.assert_called_once_with(["gluten", "lactosa"])
+    mock_db.assert_not_called()
+
+
+def test_get_dishes_exclude_allergens_fields_success(mocker, client):
+    mocker.patch(
+        "src.routes.dishes_route.menu_index.get_dishes",
+        return_value=[{**VALID_DISH_DATA, "_id": ID}],
+    )
+
+    response = client.get("/dishes/?exclude_allergens=gluten&fields=name,price")
+
+    assert response.status_code == 200
+    assert response.json == [
+        {"_id": ID, "name": VALID_DISH_DATA["name"], "price": VALID_DISH_DATA["price"]}
+    ]
+
+
+def test_get_dishes_exclude_unknown_allergen_error(mocker, client):
+    mocker.patch(
+        "src.services.menu_service.DishModel.get_menu",
+        return_value=[{**VALID_DISH_DATA, "_id": ID}],
+    )
+    mocker.patch(
+        "src.services.menu_service.get_allowed_values", return_value=["gluten"]
+    )
+    mocker.patch("src.routes.dishes_route.menu_index", new=MenuIndex())
+
+    response = client.get("/dishes/?exclude_allergens=gluten,desconocido")
+
+    assert response.status_code == 400
+    assert response.json["err"] == "invalid_value"
+
+
+def test_get_dishes_invalid_fields_error(client):
+    response = client.get("/dishes/?exclude_allergens=gluten&fields=password")
+
+    assert response.status_code == 400
+    assert response.json["err"] == "invalid_value"
+
+
+def test_get_dishes_by_ids_success(mocker, client):
+    missing_id = "507f1f77bcf86cd799439012"
+    mock_menu = mocker.patch(
+        "src.routes.dishes_route.menu_index.get_dishes_by_ids",
+        return_value=[{**VALID_DISH_DATA, "_id": ID}],
+    )
+    mock_db = mocker.patch.object(DishModel, "get_dishes")
+
+    response = client.get(f"/dishes/?ids={missing_id},{ID}&fields=name")
+
+    assert response.status_code == 200
+    assert response.json == {
+        "dishes": [{"_id": ID, "name": VALID_DISH_DATA["name"]}],
+        "missing": [missing_id],
+    }
+    mock_menu.assert_called_once_with([missing_id, ID])
+    mock_db.assert_not_called()
+
+
+def test_search_dishes_success(mocker, client):
+    mock_search = mocker.patch(
+        "src.routes.dishes_route.dishes_search.search",
+        return_value=[{"_id": ID, "name": VALID_DISH_DATA["name"]}],
+    )
+
+    response = client.get("/dishes/search?q=tarta&limit=100")
+
+    assert response.status_code == 200
+    assert response.json == [{"_id": ID, "name": VALID_DISH_DATA["name"]}]
+    mock_search.assert_called_once_with("tarta", 50)
+
+
 def test_get_dishes_by_category_success(mocker, client):
     mock_db = mocker.patch.object(
         DishModel, "get_dishes_by_category", return_value=[VALID_DISH_DATA]
@@ -0,0 +1,208 @@
+import pytest
+from datetime import datetime
+
+from src.models.dish_model import DishModel
+from src.models.inventory_model import InventoryMovementModel
+from src.models.product_model import ProductModel
+from tests.test_helpers import app, client, auth_header
+
+TOMATE_ID = "66c5e0f7d7f3a1b2c3d4e5f1"
+SAL_ID = "66c5e0f7d7f3a1b2c3d4e5f2"
+MOVEMENTS = [
+    {"product_id": TOMATE_ID, "qty": 10, "reason": "delivery"},
+    {"product_id": SAL_ID, "qty": -1, "reason": "adjustment", "notes": "Recuento"},
+]
+
+
+@pytest.fixture
+def mock_get_jwt(mocker):
+    return mocker.patch(
+        "src.routes.inventory_route.get_jwt",
+        return_value={"role": 2, "sub": "507f1f77bcf86cd799439011"},
+    )
+
+
+@pytest.fixture
+def mock_get_products(mocker):
+    return mocker.patch.object(
+        ProductModel,
+        "get_products_by_ids",
+        return_value=[
+            {"_id": TOMATE_ID, "name": "Tomate"},
+            {"_id": SAL_ID, "name": "Sal"},
+        ],
+    )
+
+
+@pytest.fixture
+def mock_run_in_transaction(mocker):
+    return mocker.patch(
+        "src.routes.inventory_route.run_in_transaction",
+        side_effect=lambda operations: operations(None),
+    )
+
+
+@pytest.mark.parametrize("method", ["get", "post"])
+def test_inventory_not_authorized_error(mock_get_jwt, client, auth_header, method):
+    mock_get_jwt.return_value = {"role": 3}
+
+    if method == "get":
+        response = client.get("/inventory/movements", headers=auth_header)
+    else:
+        response = client.post(
+            "/inventory/movements", json=MOVEMENTS, headers=auth_header
+        )
+
+    assert response.status_code == 403
+    assert response.json["err"] == "not_auth"
+
+
+def test_add_movements_success(
+    mocker,
+    mock_get_jwt,
+    mock_get_products,
+    mock_run_in_transaction,
+    client,
+    auth_header,
+):
+    # Sal llega a 0 por un pedido concurrente: el cambio se calcula con el stock que deja la escritura
+    mock_apply = mocker.patch.object(
+        ProductModel,
+        "apply_stock_movements",
+        return_value={
+            TOMATE_ID: {"name": "Tomate", "stock": 10},
+            SAL_ID: {"name": "Sal", "stock": 0},
+        },
+    )
+    mock_insert = mocker.patch.object(InventoryMovementModel, "insert_movements")
+    mock_availability = mocker.patch.object(DishModel, "update_dishes_availability")
+    mock_refresh_menu = mocker.patch("src.routes.inventory_route.refresh_menu")
+
+    response = client.post("/inventory/movements", json=MOVEMENTS, headers=auth_header)
+
+    assert response.status_code == 201
+    mock_apply.assert_called_once_with({TOMATE_ID: 10, SAL_ID: -1}, None)
+    movements = mock_insert.call_args.args[0]
+    assert [movement.product for movement in movements] == ["Tomate", "Sal"]
+    assert [movement.user_id for movement in movements] == [
+        "507f1f77bcf86cd799439011"
+    ] * 2
+    assert mock_availability.call_args_list == [
+        mocker.call("Tomate", True, None),
+        mocker.call("Sal", False, None),
+    ]
+    mock_refresh_menu.assert_called_once()
+
+
+def test_add_movements_without_availability_changes(
+    mocker,
+    mock_get_jwt,
+    mock_get_products,
+    mock_run_in_transaction,
+    client,
+    auth_header,
+):
+    mocker.patch.object(
+        ProductModel,
+        "apply_stock_movements",
+        return_value={TOMATE_ID: {"name": "Tomate", "stock": 15}},
+    )
+    mocker.patch.object(InventoryMovementModel, "insert_movements")
+    mock_availability = mocker.patch.object(DishModel, "update_dishes_availability")
+    mock_refresh_menu = mocker.patch("src.routes.inventory_route.refresh_menu")
+
+    response = client.post(
+        "/inventory/movements", json=[MOVEMENTS[0]], headers=auth_header
+    )
+
+    assert response.status_code == 201
+    mock_availability.assert_not_called()
+    mock_refresh_menu.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "movements, status_code, error",
+    [
+        ([{**MOVEMENTS[0], "reason": "order"}], 400, "invalid_value"),
+        (
+            [{**MOVEMENTS[0], "user_id": "507f1f77bcf86cd799439011"}],
+            403,
+            "not_auth_set",
+        ),
+        (
+            [{**MOVEMENTS[0], "product_id": "507f1f77bcf86cd799439012"}],
+            404,
+            "not_found",
+        ),
+        ([{**MOVEMENTS[0], "product_id": "Tomate"}], 400, "invalid_value"),
+        ([{**MOVEMENTS[0], "product": "Caviar"}], 403, "not_auth_set"),
+        ([], 400, "resource_required"),
+    ],
+)
+def test_add_movements_error(
+    mock_get_jwt,
+    mock_get_products,
+    client,
+    auth_header,
+    movements,
+    status_code,
+    error,
+):
+    response = client.post("/inventory/movements", json=movements, headers=auth_header)
+
+    assert response.status_code == status_code
+    assert response.json["err"] == error
+
+
+def test_add_movements_out_of_stock_error(
+    mocker,
+    mock_get_jwt,
+    mock_get_products,
+    mock_run_in_transaction,
+    client,
+    auth_header,
+):
+    mocker.patch.object(
+        ProductModel,
+        "apply_stock_movements",
+        return_value={TOMATE_ID: {"name": "Tomate", "stock": 10}},
+    )
+    mock_insert = mocker.patch.object(InventoryMovementModel, "insert_movements")
+
+    response = client.post(
+        "/inventory/movements",
+        json=[{**MOVEMENTS[1], "qty": -6}, MOVEMENTS[0]],
+        headers=auth_header,
+    )
+
+    assert response.status_code == 409
+    assert response.json["err"] == "out_of_stock"
+    assert response.json["msg"].endswith("Sal")
+    mock_insert.assert_not_called()
+
+
+def test_get_movements_success(mocker, mock_get_jwt, client, auth_header):
+    mock_db = mocker.patch.object(
+        InventoryMovementModel, "get_movements", return_value=[MOVEMENTS[0]]
+    )
+
+    response = client.get(
+        f"/inventory/movements?start=2025-05-01T00:00:00&end=2025-05-02T00:00:00&product_id={TOMATE_ID}",
+        headers=auth_header,
+    )
+
+    assert response.status_code == 200
+    assert response.json == [MOVEMENTS[0]]
+    mock_db.assert_called_once_with(
+        datetime(2025, 5, 1), datetime(2025, 5, 2), 0, 50, TOMATE_ID
+    )
+
+
+def test_get_movements_invalid_range_error(mock_get_jwt, client, auth_header):
+    response = client.get(
+        "/inventory/movements?start=2025-05-03T00:00:00&end=2025-05-02T00:00:00",
+        headers=auth_header,
+    )
+
+    assert response.status_code == 400
+    assert response.json["err"] == "invalid_value"
@@ -0,0 +1,30 @@
+import pytest
+
+from tests.test_helpers import app, client, auth_header
+
+
+@pytest.fixture
+def mock_get_jwt(mocker):
+    return mocker.patch("src.routes.metrics_route.get_jwt")
+
+
+def test_get_metrics_not_authorized_error(client, auth_header, mock_get_jwt):
+    mock_get_jwt.return_value = {"role": 1}
+
+    response = client.get("/metrics/", headers=auth_header)
+
+    assert response.status_code == 403
+    assert response.json["err"] == "not_auth"
+
+
+def test_get_metrics_success(mocker, client, auth_header, mock_get_jwt):
+    mock_get_jwt.return_value = {"role": 0}
+    mocker.patch(
+        "src.routes.metrics_route.get_metrics",
+        return_value={"counters": {"revocation.syncs": 1}, "timings": {}},
+    )
+
+    response = client.get("/metrics/", headers=auth_header)
+
+    assert response.status_code == 200
+    assert response.json["counters"] == {"revocation.syncs": 1}
@@ -1,13 +1,18 @@
 import pytest
 import json
+from datetime import datetime
 from pymongo.errors import PyMongoError
 
+from src.models.inventory_model import InventoryMovementModel
 from src.models.order_model import OrderModel
 from src.models.product_model import ProductModel
+from src.models.report_model import ReportModel
+from src.utils.exception_handlers import ValueCustomError
 from tests.test_helpers import app, client, auth_header
 
 
 ID = "507f1f77bcf86cd799439011"
+ORDER_ID = "507f1f77bcf86cd799439012"
 VALID_ORDER_DATA = {
     "user_id": ID,
     "items": [
@@ -206,12 +211,14 @@ def test_add_order_success(mocker, client, auth_header):
         "insert_order",
         return_value=mocker.MagicMock(inserted_id=ID),
     )
+    mock_reserve_stock = mocker.patch.object(ProductModel, "reserve_stock")
 
     response = client.post("/orders/", json=VALID_ORDER_DATA, headers=auth_header)
 
     assert response.status_code == 201
     assert response.json["msg"] == f"Orden añadida de forma satisfactoria"
     mock_db.assert_called_once()
+    mock_reserve_stock.assert_called_once()
     mock_manual_closure.assert_called_once()
     mock_schedule.assert_called_once()
 
@@ -229,6 +236,35 @@ def test_get_orders_success(mocker, client, auth_header, mock_get_jwt):
     mock_db.assert_called_once()
 
 
+@pytest.mark.parametrize(
+    "token, expected_user_id",
+    [
+        ({"role": 1, "sub": "507f1f77bcf86cd799439013"}, None),
+        ({"role": 3, "sub": "507f1f77bcf86cd799439013"}, "507f1f77bcf86cd799439013"),
+    ],
+)
+def test_get_orders_by_ids_success(
+    mocker, client, auth_header, mock_get_jwt, token, expected_user_id
+):
+    mock_get_jwt.return_value = token
+    order_id = "507f1f77bcf86cd799439011"
+    missing_id = "507f1f77bcf86cd799439012"
+    mock_db = mocker.patch.object(
+        OrderModel,
+        "get_orders_by_ids",
+        return_value=[{**VALID_ORDER_DATA, "_id": order_id}],
+    )
+
+    response = client.get(f"/orders/?ids={missing_id},{order_id}", headers=auth_header)
+
+    assert response.status_code == 200
+    assert response.json == {
+        "orders": [{**VALID_ORDER_DATA, "_id": order_id}],
+        "missing": [missing_id],
+    }
+    mock_db.assert_called_once_with([missing_id, order_id], None, expected_user_id)
+
+
 def test_get_user_orders_success(mocker, client, auth_header):
     mock_db = mocker.patch.object(
         OrderModel, "get_orders_by_user_id", return_value=[VALID_ORDER_DATA]
@@ -237,8 +273,56 @@ def test_get_user_orders_success(mocker, client, auth_header):
     response = client.get(f"/orders/user/{ID}", headers=auth_header)
 
     assert response.status_code == 200
-    assert json.loads(response.data.decode()) == [VALID_ORDER_DATA]
-    mock_db.assert_called_once()
+    assert json.loads(response.data.decode()) == {
+        "orders": [VALID_ORDER_DATA],
+        "next": None,
+    }
+    mock_db.assert_called_once_with(ID, 10, None, False, None)
+
+
+def test_get_user_orders_next_page(mocker, client, auth_header):
+    summary = {"_id": ID, "created_at": "2025-10-10T12:00:00", "state": "delivered"}
+    mock_db = mocker.patch.object(
+        OrderModel, "get_orders_by_user_id", return_value=[summary]
+    )
+
+    response = client.get(
+        f"/orders/user/{ID}?per-page=1&before=2025-10-11T12:00:00_{ORDER_ID}&detail=full",
+        headers=auth_header,
+    )
+
+    assert response.status_code == 200
+    assert response.json["next"] == f"2025-10-10T12:00:00_{ID}"
+    mock_db.assert_called_once_with(
+        ID, 1, datetime(2025, 10, 11, 12, 0), True, ORDER_ID
+    )
+
+
+@pytest.mark.parametrize(
+    "per_page, expected_per_page", [("0", 1), ("-5", 1), ("80", 50)]
+)
+def test_get_user_orders_per_page_clamped(
+    mocker, client, auth_header, per_page, expected_per_page
+):
+    mock_db = mocker.patch.object(OrderModel, "get_orders_by_user_id", return_value=[])
+
+    response = client.get(f"/orders/user/{ID}?per-page={per_page}", headers=auth_header)
+
+    assert response.status_code == 200
+    assert mock_db.call_args.args[1] == expected_per_page
+
+
+@pytest.mark.parametrize(
+    "query", ["before=yesterday", "before=2025-10-11T12:00:00_1234", "per-page=diez"]
+)
+def test_get_user_orders_invalid_cursor_error(mocker, client, auth_header, query):
+    mock_db = mocker.patch.object(OrderModel, "get_orders_by_user_id")
+
+    response = client.get(f"/orders/user/{ID}?{query}", headers=auth_header)
+
+    assert response.status_code == 400
+    assert response.json["err"] == "invalid_value"
+    mock_db.assert_not_called()
 
 
 def test_update_order_success(
@@ -247,28 +331,120 @@ def test_update_order_success(
     mock_get_jwt.return_value = {"role": 1}
     mock_get_order.return_value = {**VALID_ORDER_DATA, "state": "cooking"}
     mock_update_order.return_value = {**VALID_ORDER_DATA, "state": "ready"}
-    mock_update_product = mocker.patch.object(
-        ProductModel,
-        "update_product_stock_by_name",
-        return_value=[
-            {
-                "name": "Cacahuetes",
-                "stock": 345,
-                "categories": ["snack", "otro"],
-                "allergens": ["cacahuete"],
-                "brand": "marca",
-                "notes": "notas",
-            }
-        ],
+    mock_commit_stock = mocker.patch.object(
+        ProductModel, "commit_stock", return_value={"tomato": 2.0}
+    )
+    mocker.patch.object(ProductModel, "get_product_ids", return_value={"tomato": ID})
+    mock_insert_movements = mocker.patch.object(
+        InventoryMovementModel, "insert_movements"
     )
 
+    mock_add_consumption = mocker.patch.object(ReportModel, "add_order_consumption")
+
     response = client.put(f"/orders/{ID}", json={"state": "ready"}, headers=auth_header)
 
     assert response.status_code == 200
     assert json.loads(response.data.decode()) == {**VALID_ORDER_DATA, "state": "ready"}
     mock_get_order.assert_called_once()
     mock_update_order.assert_called_once()
-    mock_update_product.assert_called_once()
+    mock_commit_stock.assert_called_once()
+    movement = mock_insert_movements.call_args.args[0][0]
+    assert (movement.product_id, movement.product, movement.qty, movement.reason) == (
+        ID,
+        "tomato",
+        -2.0,
+        "order",
+    )
+    assert mock_update_order.call_args.args[2] == "cooking"
+    mock_add_consumption.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "old_state, new_state, reserve, release",
+    [
+        ("pending", "accepted", 1, 0),
+        ("accepted", "cooking", 0, 0),
+        ("cooking", "canceled", 0, 1),
+        ("pending", "canceled", 0, 0),
+    ],
+)
+def test_update_order_stock_reservation(
+    mocker,
+    mock_get_jwt,
+    client,
+    auth_header,
+    mock_get_order,
+    mock_update_order,
+    old_state,
+    new_state,
+    reserve,
+    release,
+):
+    mock_get_jwt.return_value = {"role": 1}
+    mock_get_order.return_value = {**VALID_ORDER_DATA, "state": old_state}
+    mock_update_order.return_value = {**VALID_ORDER_DATA, "state": new_state}
+    mock_reserve_stock = mocker.patch.object(ProductModel, "reserve_stock")
+    mock_release_stock = mocker.patch.object(ProductModel, "release_stock")
+
+    response = client.put(
+        f"/orders/{ID}", json={"state": new_state}, headers=auth_header
+    )
+
+    assert response.status_code == 200
+    assert mock_reserve_stock.call_count == reserve
+    assert mock_release_stock.call_count == release
+
+
+def test_update_order_out_of_stock_error(
+    app, mocker, mock_get_jwt, client, auth_header, mock_get_order, mock_update_order
+):
+    mock_get_jwt.return_value = {"role": 1}
+    mock_get_order.return_value = {**VALID_ORDER_DATA, "state": "pending"}
+    mock_update_order.return_value = {**VALID_ORDER_DATA, "state": "accepted"}
+    with app.app_context():
+        error = ValueCustomError("out_of_stock", "tomato")
+    mocker.patch.object(ProductModel, "reserve_stock", side_effect=error)
+
+    response = client.put(
+        f"/orders/{ID}", json={"state": "accepted"}, headers=auth_header
+    )
+
+    assert response.status_code == 409
+    assert response.json["err"] == "out_of_stock"
+
+
+def test_update_order_state_conflict_error(
+    mocker, mock_get_jwt, client, auth_header, mock_get_order, mock_update_order
+):
+    mock_get_jwt.return_value = {"role": 1}
+    mock_get_order.return_value = {**VALID_ORDER_DATA, "state": "pending"}
+    mock_update_order.return_value = None
+    mock_reserve_stock = mocker.patch.object(ProductModel, "reserve_stock")
+
+    response = client.put(
+        f"/orders/{ID}", json={"state": "accepted"}, headers=auth_header
+    )
+
+    assert response.status_code == 409
+    assert response.json["err"] == "conflict"
+    mock_reserve_stock.assert_not_called()
+
+
+def test_update_order_delivered_adds_sale(
+    mocker, mock_get_jwt, client, auth_header, mock_get_order, mock_update_order
+):
+    mock_get_jwt.return_value = {"role": 1}
+    mock_get_order.return_value = {**VALID_ORDER_DATA, "state": "ready"}
+    mock_update_order.return_value = {**VALID_ORDER_DATA, "state": "delivered"}
+    mock_add_sale = mocker.patch.object(ReportModel, "add_order_sale")
+
+    response = client.put(
+        f"/orders/{ID}", json={"state": "delivered"}, headers=auth_header
+    )
+
+    assert response.status_code == 200
+    mock_add_sale.assert_called_once()
+    assert mock_add_sale.call_args.args[0]["state"] == "delivered"
 
 
 def test_update_order_exception(
@@ -293,17 +469,114 @@ def test_get_order_success(client, auth_header, mock_get_order):
 
     assert response.status_code == 200
     assert json.loads(response.data.decode()) == VALID_ORDER_DATA
-    mock_get_order.assert_called_once()
+    mock_get_order.assert_called_once_with(ID, None, include_archive=True)
+
+
+def test_get_archived_orders_success(mocker, client, auth_header, mock_get_jwt):
+    mock_get_jwt.return_value = {"role": 1}
+    mock_get_orders = mocker.patch.object(
+        OrderModel, "get_orders", return_value=[VALID_ORDER_DATA]
+    )
+
+    response = client.get("/orders/?archived=true", headers=auth_header)
+
+    assert response.status_code == 200
+    mock_get_orders.assert_called_once_with(0, 10, None, True)
 
 
 def test_delete_order_success(
-    mocker, mock_get_jwt, client, auth_header, mock_delete_order
+    mocker, mock_get_jwt, client, auth_header, mock_get_order, mock_delete_order
 ):
     mock_get_jwt.return_value = {"role": 1}
+    mock_get_order.return_value = {**VALID_ORDER_DATA, "state": "delivered"}
     mock_delete_order.return_value = mocker.MagicMock(deleted_count=1)
+    mock_release_stock = mocker.patch.object(ProductModel, "release_stock")
 
     response = client.delete(f"/orders/{ID}", headers=auth_header)
 
     assert response.status_code == 200
     assert response.json["msg"] == f"Orden eliminada de forma satisfactoria"
-    mock_delete_order.assert_called_once()
+    mock_delete_order.assert_called_once_with(ID)
+    mock_release_stock.assert_not_called()
+
+
+@pytest.mark.parametrize("deleted_count, status_code", [(1, 200), (0, 409)])
+def test_delete_reserved_order_releases_stock(
+    mocker,
+    mock_get_jwt,
+    client,
+    auth_header,
+    mock_get_order,
+    mock_delete_order,
+    deleted_count,
+    status_code,
+):
+    mock_get_jwt.return_value = {"role": 1}
+    mock_get_order.return_value = {**VALID_ORDER_DATA, "state": "cooking"}
+    mock_delete_order.return_value = mocker.MagicMock(deleted_count=deleted_count)
+    mock_release_stock = mocker.patch.object(ProductModel, "release_stock")
+
+    response = client.delete(f"/orders/{ID}", headers=auth_header)
+
+    assert response.status_code == status_code
+    assert mock_delete_order.call_args.args[0] == ID
+    assert mock_delete_order.call_args.args[2] == "cooking"
+    assert mock_release_stock.call_count == deleted_count
+
+
+def test_update_reserved_order_items_error(
+    mock_get_jwt, client, auth_header, mock_get_order, mock_update_order
+):
+    mock_get_jwt.return_value = {"role": 1}
+    mock_get_order.return_value = {**VALID_ORDER_DATA, "state": "accepted"}
+
+    response = client.put(
+        f"/orders/{ID}",
+        json={"items": VALID_ORDER_DATA["items"]},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 403
+    assert response.json["err"] == "not_auth_set"
+    mock_update_order.assert_not_called()
+
+
+def test_update_order_appends_event_and_state_duration(
+    mocker, mock_get_jwt, client, auth_header, mock_get_order, mock_update_order
+):
+    mock_get_jwt.return_value = {"role": 1}
+    mock_get_order.return_value = {
+        **VALID_ORDER_DATA,
+        "state": "accepted",
+        "created_at": "2025-10-10T14:00:00",
+        "timeline": [{"state": "accepted", "at": "2025-10-10T14:00:00"}],
+    }
+    mock_update_order.return_value = {**VALID_ORDER_DATA, "state": "cooking"}
+    mock_add_duration = mocker.patch.object(ReportModel, "add_state_duration")
+
+    response = client.put(
+        f"/orders/{ID}", json={"state": "cooking"}, headers=auth_header
+    )
+
+    assert response.status_code == 200
+    event = mock_update_order.call_args.args[3]
+    assert event["state"] == "cooking"
+    order, state, seconds = mock_add_duration.call_args.args[:3]
+    assert state == "accepted"
+    assert seconds == (event["at"] - datetime(2025, 10, 10, 14)).total_seconds()
+
+
+def test_update_order_without_timeline_skips_duration(
+    mocker, mock_get_jwt, client, auth_header, mock_get_order, mock_update_order
+):
+    mock_get_jwt.return_value = {"role": 1}
+    mock_get_order.return_value = {**VALID_ORDER_DATA, "state": "accepted"}
+    mock_update_order.return_value = {**VALID_ORDER_DATA, "state": "cooking"}
+    mock_add_duration = mocker.patch.object(ReportModel, "add_state_duration")
+
+    response = client.put(
+        f"/orders/{ID}", json={"state": "cooking"}, headers=auth_header
+    )
+
+    assert response.status_code == 200
+    mock_add_duration.assert_not_called()
@@ -3,6 +3,7 @@ import json
 from pymongo.errors import PyMongoError
 
 from tests.test_helpers import app, client, auth_header
+from src.models.inventory_model import InventoryMovementModel
 from src.models.product_model import ProductModel
 from src.models.dish_model import DishModel
 
@@ -18,6 +19,11 @@ VALID_PRODUCT_DATA = {
 ID = "507f1f77bcf86cd799439011"
 
 
+@pytest.fixture(autouse=True)
+def mock_refresh_menu(mocker):
+    return mocker.patch("src.routes.products_route.refresh_menu")
+
+
 @pytest.fixture
 def mock_get_jwt(mocker):
     return mocker.patch("src.routes.products_route.get_jwt")
@@ -46,6 +52,7 @@ def mock_delete_product(mocker):
         ("/products/507f1f77bcf86cd799439011", "get"),
         ("/products/507f1f77bcf86cd799439011", "delete"),
         ("/products/", "get"),
+        ("/products/search?q=cacahuetes", "get"),
     ],
 )
 def test_token_not_authorized_error(mock_get_jwt, client, auth_header, url, method):
@@ -94,6 +101,28 @@ def test_not_authorized_to_set_error(
         )
     assert response.status_code == 403
     assert response.json["err"] == "not_auth_set"
+
+
+@pytest.mark.parametrize(
+    "url, method",
+    [("/products/", "post"), ("/products/507f1f77bcf86cd799439011", "put")],
+)
+def test_not_authorized_to_set_reserved_error(
+    client, auth_header, mock_get_jwt, mock_get_product, url, method
+):
+    mock_get_jwt.return_value = {"role": 1}
+    mock_get_product.return_value = {**VALID_PRODUCT_DATA, "reserved": 5}
+
+    if method == "post":
+        response = client.post(
+            url, json={**VALID_PRODUCT_DATA, "reserved": 0}, headers=auth_header
+        )
+    elif method == "put":
+        response = client.put(url, json={"reserved": 0}, headers=auth_header)
+
+    assert response.status_code == 403
+    assert response.json["err"] == "not_auth_set"
+    assert response.json["msg"] == "No está autorizado a establecer 'reserved'"
     mock_get_jwt.assert_called_once()
     mock_get_product.assert_called_once() if method == "put" else None
 
@@ -171,12 +200,57 @@ def test_get_products_success(mocker, mock_get_jwt, client, auth_header):
     mock_db.assert_called_once()
 
 
+def test_get_products_by_ids_success(mocker, mock_get_jwt, client, auth_header):
+    mock_get_jwt.return_value = {"role": 2}
+    other_id = "507f1f77bcf86cd799439012"
+    missing_id = "507f1f77bcf86cd799439013"
+    mock_db = mocker.patch.object(
+        ProductModel,
+        "get_products_by_ids",
+        return_value=[
+            {"_id": ID, "name": "Cacahuetes"},
+            {"_id": other_id, "name": "Pan"},
+        ],
+    )
+
+    response = client.get(
+        f"/products/?ids={other_id},{missing_id},{ID}", headers=auth_header
+    )
+
+    assert response.status_code == 200
+    assert response.json == {
+        "products": [
+            {"_id": other_id, "name": "Pan"},
+            {"_id": ID, "name": "Cacahuetes"},
+        ],
+        "missing": [missing_id],
+    }
+    mock_db.assert_called_once_with([other_id, missing_id, ID], None)
+
+
+def test_search_products_success(mocker, mock_get_jwt, client, auth_header):
+    mock_get_jwt.return_value = {"role": 2}
+    mock_search = mocker.patch(
+        "src.routes.products_route.products_search.search",
+        return_value=[{"_id": ID, "name": VALID_PRODUCT_DATA["name"]}],
+    )
+
+    response = client.get("/products/search?q=cacahu", headers=auth_header)
+
+    assert response.status_code == 200
+    assert response.json == [{"_id": ID, "name": VALID_PRODUCT_DATA["name"]}]
+    mock_search.assert_called_once_with("cacahu", 10)
+
+
 def test_update_product_success(
     mocker, client, auth_header, mock_get_jwt, mock_get_product, mock_update_product
 ):
     mock_get_jwt.return_value = {"role": 1}
     mock_get_product.return_value = VALID_PRODUCT_DATA
-    mock_update_product.return_value = {**VALID_PRODUCT_DATA, "stock": 0}
+    mock_update_product.return_value = (
+        VALID_PRODUCT_DATA,
+        {**VALID_PRODUCT_DATA, "stock": 0},
+    )
     mock_update_dishes = mocker.patch.object(
         DishModel,
         "update_dishes_availability",
@@ -211,6 +285,32 @@ def test_update_product_exception(
     mock_update_product.assert_called_once()
 
 
+def test_update_product_movement_uses_previous_stock(
+    mocker, client, auth_header, mock_get_jwt, mock_get_product, mock_update_product
+):
+    mock_get_jwt.return_value = {"role": 1}
+    mock_get_product.return_value = {**VALID_PRODUCT_DATA, "stock": 10}
+    # Entre la lectura y la escritura un pedido ha descontado 3 unidades
+    mock_update_product.return_value = (
+        {**VALID_PRODUCT_DATA, "stock": 7},
+        {**VALID_PRODUCT_DATA, "stock": 12},
+    )
+    mock_insert_movements = mocker.patch.object(
+        InventoryMovementModel, "insert_movements"
+    )
+    mocker.patch("src.routes.products_route.refresh_menu")
+    mocker.patch(
+        "src.models.product_model.get_allowed_values",
+        side_effect=lambda field: VALID_PRODUCT_DATA[field],
+    )
+
+    response = client.put(f"/products/{ID}", json={"stock": 12}, headers=auth_header)
+
+    assert response.status_code == 200
+    movements = mock_insert_movements.call_args.args[0]
+    assert (movements[0].product_id, movements[0].qty) == (ID, 5)
+
+
 def test_get_product_success(client, auth_header, mock_get_jwt, mock_get_product):
     mock_get_jwt.return_value = {"role": 1}
     mock_get_product.return_value = VALID_PRODUCT_DATA
@@ -0,0 +1,149 @@
+import pytest
+
+from src.models.report_model import ReportModel
+from tests.test_helpers import app, client, auth_header
+
+REPORTS = [
+    {
+        "date": "2025-10-10",
+        "service": "lunch",
+        "orders": 2,
+        "revenue": 30.0,
+        "dishes": {
+            "pizza": {"name": "pizza", "qty": 2, "revenue": 20.0},
+            "pan de ajo": {"name": "pan de ajo", "qty": 1, "revenue": 4.0},
+        },
+        "ingredients": {"tomate": {"name": "tomate", "consumed": 1.5}},
+    },
+    {
+        "date": "2025-10-10",
+        "service": "dinner",
+        "orders": 1,
+        "revenue": 12.5,
+        "dishes": {"pan de ajo": {"name": "pan de ajo", "qty": 3, "revenue": 12.0}},
+        "ingredients": {
+            "tomate": {"name": "tomate", "consumed": 0.5},
+            "queso": {"name": "queso", "consumed": 3},
+        },
+    },
+]
+
+
+@pytest.fixture
+def mock_get_jwt(mocker):
+    return mocker.patch("src.routes.reports_route.get_jwt", return_value={"role": 1})
+
+
+@pytest.fixture
+def mock_get_reports(mocker):
+    return mocker.patch.object(ReportModel, "get_reports", return_value=REPORTS)
+
+
+@pytest.mark.parametrize(
+    "url, role",
+    [
+        ("/reports/sales", 2),
+        ("/reports/ingredients", 2),
+        ("/reports/kitchen", 3),
+    ],
+)
+def test_reports_not_authorized_error(client, auth_header, mock_get_jwt, url, role):
+    mock_get_jwt.return_value = {"role": role}
+
+    response = client.get(url, headers=auth_header)
+
+    assert response.status_code == 403
+    assert response.json["err"] == "not_auth"
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["?start=10-10-2025", "?start=2025-10-11&end=2025-10-10", "?group_by=week"],
+)
+def test_sales_report_invalid_value_error(
+    client, auth_header, mock_get_jwt, mock_get_reports, query
+):
+    response = client.get(f"/reports/sales{query}", headers=auth_header)
+
+    assert response.status_code == 400
+    assert response.json["err"] == "invalid_value"
+    mock_get_reports.assert_not_called()
+
+
+def test_sales_report_by_day(client, auth_header, mock_get_jwt, mock_get_reports):
+    response = client.get(
+        "/reports/sales?start=2025-10-01&end=2025-10-10", headers=auth_header
+    )
+
+    assert response.status_code == 200
+    assert response.json["orders"] == 3
+    assert response.json["revenue"] == 42.5
+    assert response.json["periods"] == [
+        {"date": "2025-10-10", "orders": 3, "revenue": 42.5}
+    ]
+    assert response.json["top_dishes"][0] == {
+        "name": "pan de ajo",
+        "qty": 4,
+        "revenue": 16.0,
+    }
+    assert mock_get_reports.call_args.args[:2] == ("2025-10-01", "2025-10-10")
+
+
+def test_sales_report_by_service(client, auth_header, mock_get_jwt, mock_get_reports):
+    response = client.get("/reports/sales?group_by=service&top=1", headers=auth_header)
+
+    assert response.status_code == 200
+    assert [period["service"] for period in response.json["periods"]] == [
+        "lunch",
+        "dinner",
+    ]
+    assert len(response.json["top_dishes"]) == 1
+
+
+def test_ingredients_report(client, auth_header, mock_get_jwt, mock_get_reports):
+    response = client.get("/reports/ingredients", headers=auth_header)
+
+    assert response.status_code == 200
+    assert response.json["ingredients"] == [
+        {"name": "queso", "consumed": 3},
+        {"name": "tomate", "consumed": 2.0},
+    ]
+
+
+def test_kitchen_report(client, auth_header, mock_get_jwt, mock_get_reports):
+    mock_get_jwt.return_value = {"role": 2}
+    mock_get_reports.return_value = [
+        {
+            "date": "2025-10-10",
+            "service": "lunch",
+            "timings": {
+                "cooking": {"count": 10, "total": 4000, "buckets": {"5": 10}},
+                "dishes": {"pizza": {"name": "pizza", "buckets": {"5": 10}}},
+            },
+        },
+        {
+            "date": "2025-10-10",
+            "service": "dinner",
+            "timings": {
+                "cooking": {"count": 10, "total": 8000, "buckets": {"7": 10}},
+                "ready": {"count": 1, "total": 100, "buckets": {"1": 1}},
+                "dishes": {"pizza": {"name": "pizza", "buckets": {"7": 10}}},
+            },
+        },
+    ]
+
+    response = client.get("/reports/kitchen", headers=auth_header)
+
+    assert response.status_code == 200
+    assert response.json["states"]["cooking"] == {
+        "count": 20,
+        "avg": 600.0,
+        "p50": 420.0,
+        "p90": 840.0,
+        "p95": 870.0,
+    }
+    assert response.json["services"]["dinner"]["ready"]["count"] == 1
+    assert response.json["dishes"] == [
+        {"name": "pizza", "count": 20, "p50": 420.0, "p90": 840.0, "p95": 870.0}
+    ]
+    assert mock_get_reports.call_args.args[2] == {"timings": 1}
@@ -0,0 +1,113 @@
+import pytest
+import json
+
+from tests.test_helpers import app, client, auth_header
+from src.models.session_model import SessionModel
+
+
+ID = "507f1f77bcf86cd799439011"
+VALID_SESSION_DATA = {
+    "_id": "507f1f77bcf86cd799439012",
+    "user_id": ID,
+    "access_jti": "bb53e637-8627-457c-840f-6cae52a12e8b",
+    "refresh_jti": "cc53e637-8627-457c-840f-6cae52a12e8b",
+    "expires_at": "2030-10-01T00:00:00Z",
+}
+
+
+@pytest.fixture
+def mock_get_jwt(mocker):
+    return mocker.patch("src.routes.sessions_route.get_jwt")
+
+
+@pytest.fixture
+def mock_get_session(mocker):
+    return mocker.patch.object(SessionModel, "get_session")
+
+
+@pytest.fixture
+def mock_revoke_session(mocker):
+    return mocker.patch("src.routes.sessions_route.revoke_session")
+
+
+@pytest.mark.parametrize(
+    "url, method",
+    [
+        ("/sessions/", "get"),
+        ("/sessions/507f1f77bcf86cd799439011", "delete"),
+        ("/sessions/507f1f77bcf86cd799439011", "get"),
+    ],
+)
+def test_session_not_authorized_error(mock_get_jwt, client, auth_header, url, method):
+    mock_get_jwt.return_value = {"role": 1}
+
+    if method == "get":
+        response = client.get(url, headers=auth_header)
+    elif method == "delete":
+        response = client.delete(url, headers=auth_header)
+
+    assert response.status_code == 403
+    assert response.json["err"] == "not_auth"
+    mock_get_jwt.assert_called_once()
+
+
+@pytest.mark.parametrize("method", ["get", "delete"])
+def test_session_not_found_error(
+    client,
+    auth_header,
+    mock_get_jwt,
+    mock_get_session,
+    mock_revoke_session,
+    method,
+):
+    mock_get_jwt.return_value = {"role": 0}
+    mock_get_session.return_value = None
+    mock_revoke_session.return_value = None
+
+    if method == "get":
+        response = client.get(f"/sessions/{ID}", headers=auth_header)
+    elif method == "delete":
+        response = client.delete(f"/sessions/{ID}", headers=auth_header)
+
+    assert response.status_code == 404
+    assert response.json["err"] == "not_found"
+    (
+        mock_get_session.assert_called_once()
+        if method == "get"
+        else mock_revoke_session.assert_called_once()
+    )
+
+
+def test_get_sessions_success(mocker, mock_get_jwt, client, auth_header):
+    mock_get_jwt.return_value = {"role": 0}
+    mock_db = mocker.patch.object(
+        SessionModel, "get_sessions", return_value=[VALID_SESSION_DATA]
+    )
+
+    response = client.get("/sessions/", headers=auth_header)
+
+    assert response.status_code == 200
+    assert json.loads(response.data.decode()) == [VALID_SESSION_DATA]
+    mock_db.assert_called_once_with(0, 10)
+
+
+def test_get_session_success(client, auth_header, mock_get_jwt, mock_get_session):
+    mock_get_jwt.return_value = {"role": 0}
+    mock_get_session.return_value = VALID_SESSION_DATA
+
+    response = client.get(f"/sessions/{ID}", headers=auth_header)
+
+    assert response.status_code == 200
+    assert json.loads(response.data.decode()) == VALID_SESSION_DATA
+    mock_get_session.assert_called_once()
+
+
+def test_delete_session_success(client, auth_header, mock_get_jwt, mock_revoke_session):
+    mock_get_jwt.return_value = {"role": 0}
+    mock_revoke_session.return_value = {**VALID_SESSION_DATA, "revoked": True}
+
+    response = client.delete(f"/sessions/{ID}", headers=auth_header)
+
+    assert response.status_code == 200
+    assert response.json["msg"] == "Sesión revocada de forma satisfactoria"
+    mock_revoke_session.assert_called_once_with(ID)
@@ -74,6 +74,9 @@ def test_user_not_found_error(
 ):
     mock_get_jwt.return_value = {"role": 0, "sub": ID}
 
+    mock_get_user_profile = mocker.patch.object(
+        UserModel, "get_user_profile", return_value=None
+    )
     if method in ["get", "put"]:
         mock_get_user.return_value = None
     else:
@@ -89,11 +92,12 @@ def test_user_not_found_error(
     assert response.status_code == 404
     assert response.json["err"] == "not_found"
     mock_get_jwt.assert_called_once()
-    (
+    if method == "get":
+        mock_get_user_profile.assert_called_once()
+    elif method == "put":
         mock_get_user.assert_called_once()
-        if method != "delete"
-        else mock_delete_user.assert_called_once()
-    )
+    else:
+        mock_delete_user.assert_called_once()
 
 
 @pytest.mark.parametrize(
@@ -143,24 +147,26 @@ def test_get_users_success(mocker, client, auth_header, mock_get_jwt):
         UserModel, "get_users", return_value=[VALID_USER_DATA]
     )
 
-    response = client.get("/users/", headers=auth_header)
+    response = client.get("/users/?page=2&per-page=5&fields=name", headers=auth_header)
 
     assert response.status_code == 200
     assert json.loads(response.data.decode()) == [VALID_USER_DATA]
     mock_get_jwt.assert_called_once()
-    mock_db.assert_called_once()
+    mock_db.assert_called_once_with(5, 5, "name")
 
 
-def test_get_user_success(mock_get_user, client, auth_header, mock_get_jwt):
+def test_get_user_success(mocker, client, auth_header, mock_get_jwt):
     mock_get_jwt.return_value = {"role": 0, "sub": ID}
-    mock_get_user.return_value = VALID_USER_DATA
+    mock_get_user_profile = mocker.patch.object(
+        UserModel, "get_user_profile", return_value=VALID_USER_DATA
+    )
 
     response = client.get(f"/users/{ID}", headers=auth_header)
 
     assert response.status_code == 200
     assert json.loads(response.data.decode()) == VALID_USER_DATA
     mock_get_jwt.assert_called_once()
-    mock_get_user.assert_called_once()
+    mock_get_user_profile.assert_called_once_with(ID, None)
 
 
 def test_update_user_success(mocker, mock_get_user, client, auth_header, mock_get_jwt):
@@ -193,11 +199,8 @@ def test_delete_user_success(
 ):
     mock_get_jwt.return_value = {"role": 0, "sub": ID}
     mock_delete_user.return_value = mocker.MagicMock(deleted_count=1)
-    mock_revoke_access_token = mocker.patch(
-        "src.routes.users_route.delete_active_token"
-    )
-    mock_delete_refresh_token = mocker.patch(
-        "src.routes.users_route.delete_refresh_token"
+    mock_revoke_user_sessions = mocker.patch(
+        "src.routes.users_route.revoke_user_sessions"
     )
 
     response = client.delete(f"/users/{ID}", headers=auth_header)
@@ -206,5 +209,203 @@ def test_delete_user_success(
     assert response.json["msg"] == f"Usuario eliminado de forma satisfactoria"
     mock_get_jwt.assert_called_once()
     mock_delete_user.assert_called_once()
-    mock_revoke_access_token.assert_called_once()
-    mock_delete_refresh_token.assert_called_once()
+    mock_revoke_user_sessions.assert_called_once_with(ID)
+
+
+BASKET_ITEM = {"name": "Hamburguesa", "qty": 2, "price": 9.5}
+
+
+@pytest.mark.parametrize(
+    "url, method",
+    [
+        ("/users/507f1f77bcf86cd799439012/basket", "post"),
+        ("/users/507f1f77bcf86cd799439012/basket", "delete"),
+        ("/users/507f1f77bcf86cd799439012/basket/item", "patch"),
+        ("/users/507f1f77bcf86cd799439012/basket/item", "delete"),
+    ],
+)
+def test_basket_not_authorized_error(mock_get_jwt, client, auth_header, url, method):
+    mock_get_jwt.return_value = {"role": 3, "sub": ID}
+
+    response = getattr(client, method)(url, json=BASKET_ITEM, headers=auth_header)
+
+    assert response.status_code == 403
+    assert response.json["err"] == "not_auth"
+
+
+def test_add_basket_item_success(mocker, mock_get_jwt, client, auth_header):
+    mock_get_jwt.return_value = {"role": 3, "sub": ID}
+    mock_db = mocker.patch.object(
+        UserModel, "add_basket_item", return_value=[BASKET_ITEM]
+    )
+
+    response = client.post(
+        f"/users/{ID}/basket",
+        json={**BASKET_ITEM, "custom": {"queso": True, "cebolla": False}},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 200
+    assert response.json == [BASKET_ITEM]
+    mock_db.assert_called_once_with(ID, {**BASKET_ITEM, "custom": {"cebolla": False}})
+
+
+@pytest.mark.parametrize(
+    "item, error",
+    [
+        ({**BASKET_ITEM, "qty": 0}, "invalid_value"),
+        ({**BASKET_ITEM, "item_id": "item"}, "not_auth_set"),
+        ({"name": "Hamburguesa"}, "field_required"),
+    ],
+)
+def test_add_basket_item_error(mocker, mock_get_jwt, client, auth_header, item, error):
+    mock_get_jwt.return_value = {"role": 3, "sub": ID}
+    mock_db = mocker.patch.object(UserModel, "add_basket_item")
+
+    response = client.post(f"/users/{ID}/basket", json=item, headers=auth_header)
+
+    assert response.json["err"] == error
+    mock_db.assert_not_called()
+
+
+def test_clear_basket_success(mocker, mock_get_jwt, client, auth_header):
+    mock_get_jwt.return_value = {"role": 1, "sub": "other"}
+    mock_db = mocker.patch.object(UserModel, "clear_basket", return_value=[])
+
+    response = client.delete(f"/users/{ID}/basket", headers=auth_header)
+
+    assert response.status_code == 200
+    assert response.json == []
+    mock_db.assert_called_once_with(ID)
+
+
+@pytest.mark.parametrize(
+    "method, body, model_method",
+    [
+        ("patch", {"qty": 3}, "update_basket_item_qty"),
+        ("patch", {"qty": 0}, "remove_basket_item"),
+        ("delete", None, "remove_basket_item"),
+    ],
+)
+def test_handle_basket_item_success(
+    mocker, mock_get_jwt, client, auth_header, method, body, model_method
+):
+    mock_get_jwt.return_value = {"role": 3, "sub": ID}
+    mock_db = mocker.patch.object(UserModel, model_method, return_value=[])
+
+    response = getattr(client, method)(
+        f"/users/{ID}/basket/item", json=body, headers=auth_header
+    )
+
+    assert response.status_code == 200
+    mock_db.assert_called_once()
+
+
+def test_handle_basket_item_not_found_error(mocker, mock_get_jwt, client, auth_header):
+    mock_get_jwt.return_value = {"role": 3, "sub": ID}
+    mocker.patch.object(UserModel, "update_basket_item_qty", return_value=None)
+
+    response = client.patch(
+        f"/users/{ID}/basket/item", json={"qty": 1}, headers=auth_header
+    )
+
+    assert response.status_code == 404
+    assert response.json["err"] == "not_found"
+
+
+@pytest.mark.parametrize("qty", [-1, "2", True])
+def test_update_basket_item_invalid_qty_error(
+    mocker, mock_get_jwt, client, auth_header, qty
+):
+    mock_get_jwt.return_value = {"role": 3, "sub": ID}
+
+    response = client.patch(
+        f"/users/{ID}/basket/item", json={"qty": qty}, headers=auth_header
+    )
+
+    assert response.status_code == 400
+    assert response.json["err"] == "invalid_value"
+
+
+ADDRESS = {"line_one": "Calle Mayor 1", "postal_code": "03015"}
+
+
+@pytest.mark.parametrize(
+    "url, method",
+    [
+        ("/users/507f1f77bcf86cd799439012/addresses", "get"),
+        ("/users/507f1f77bcf86cd799439012/addresses", "post"),
+        ("/users/507f1f77bcf86cd799439012/addresses/address", "put"),
+        ("/users/507f1f77bcf86cd799439012/addresses/address", "delete"),
+    ],
+)
+def test_addresses_not_authorized_error(mock_get_jwt, client, auth_header, url, method):
+    mock_get_jwt.return_value = {"role": 3, "sub": ID}
+
+    response = getattr(client, method)(url, json=ADDRESS, headers=auth_header)
+
+    assert response.status_code == 403
+    assert response.json["err"] == "not_auth"
+
+
+def test_get_addresses_success(mocker, mock_get_jwt, client, auth_header):
+    mock_get_jwt.return_value = {"role": 3, "sub": ID}
+    mocker.patch.object(UserModel, "get_addresses", return_value=[ADDRESS])
+
+    response = client.get(f"/users/{ID}/addresses", headers=auth_header)
+
+    assert response.status_code == 200
+    assert response.json == [ADDRESS]
+
+
+def test_add_address_success(mocker, mock_get_jwt, client, auth_header):
+    mock_get_jwt.return_value = {"role": 3, "sub": ID}
+    mock_db = mocker.patch.object(UserModel, "add_address", return_value=[])
+
+    response = client.post(f"/users/{ID}/addresses", json=ADDRESS, headers=auth_header)
+
+    assert response.status_code == 200
+    address = mock_db.call_args.args[1]
+    assert address["zone"] == "periferia"
+    assert len(address["address_id"]) == 24
+
+
+@pytest.mark.parametrize(
+    "address, error",
+    [
+        ({**ADDRESS, "postal_code": "28001"}, "literal_value"),
+        ({**ADDRESS, "zone": "centro"}, "not_auth_set"),
+    ],
+)
+def test_add_address_error(mocker, mock_get_jwt, client, auth_header, address, error):
+    mock_get_jwt.return_value = {"role": 3, "sub": ID}
+    mock_db = mocker.patch.object(UserModel, "add_address")
+
+    response = client.post(f"/users/{ID}/addresses", json=address, headers=auth_header)
+
+    assert response.json["err"] == error
+    mock_db.assert_not_called()
+
+
+def test_update_address_success(mocker, mock_get_jwt, client, auth_header):
+    mock_get_jwt.return_value = {"role": 3, "sub": ID}
+    mock_db = mocker.patch.object(UserModel, "update_address", return_value=[])
+
+    response = client.put(
+        f"/users/{ID}/addresses/address", json=ADDRESS, headers=auth_header
+    )
+
+    assert response.status_code == 200
+    mock_db.assert_called_once_with(
+        ID, "address", {**ADDRESS, "address_id": "address", "zone": "periferia"}
+    )
+
+
+def test_delete_address_not_found_error(mocker, mock_get_jwt, client, auth_header):
+    mock_get_jwt.return_value = {"role": 3, "sub": ID}
+    mocker.patch.object(UserModel, "delete_address", return_value=None)
+
+    response = client.delete(f"/users/{ID}/addresses/address", headers=auth_header)
+
+    assert response.status_code == 404
+    assert response.json["err"] == "not_found"
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import pytest
+from click.testing import CliRunner
+
+from config import ORDER_ARCHIVE_DAYS
+from src.services.archive_service import archive_orders, archive_orders_command
+
+ORDERS = [{"_id": index} for index in range(3)]
+
+
+@pytest.fixture
+def mock_get_archivable_orders(mocker):
+    return mocker.patch("src.services.archive_service.OrderModel.get_archivable_orders")
+
+
+@pytest.fixture
+def mock_archive_orders(mocker):
+    return mocker.patch(
+        "src.services.archive_service.OrderModel.archive_orders",
+        side_effect=lambda orders: len(orders),
+    )
+
+
+@pytest.fixture
+def mock_sleep(mocker):
+    return mocker.patch("src.services.archive_service.time.sleep")
+
+
+def test_archive_orders_until_last_batch(
+    mock_get_archivable_orders, mock_archive_orders, mock_sleep
+):
+    mock_get_archivable_orders.side_effect = [ORDERS, ORDERS, ORDERS[:1]]
+
+    assert archive_orders(None, batch_size=3, pause=0.5) == 7
+    assert mock_archive_orders.call_count == 3
+    assert mock_sleep.call_count == 2
+    mock_sleep.assert_called_with(0.5)
+    before, batch_size = mock_get_archivable_orders.call_args.args
+    assert batch_size == 3
+    assert abs(
+        before - (datetime.now() - timedelta(days=ORDER_ARCHIVE_DAYS))
+    ) < timedelta(seconds=5)
+
+
+def test_archive_orders_max_batches(
+    mock_get_archivable_orders, mock_archive_orders, mock_sleep
+):
+    mock_get_archivable_orders.return_value = ORDERS
+
+    assert archive_orders(2, batch_size=3, pause=0) == 6
+    assert mock_get_archivable_orders.call_count == 2
+
+
+def test_archive_orders_nothing_to_archive(
+    mock_get_archivable_orders, mock_archive_orders, mock_sleep
+):
+    mock_get_archivable_orders.return_value = []
+
+    assert archive_orders() == 0
+    mock_archive_orders.assert_not_called()
+    mock_sleep.assert_not_called()
+
+
+def test_archive_orders_command(mocker):
+    mock_archive = mocker.patch(
+        "src.services.archive_service.archive_orders", return_value=4
+    )
+
+    result = CliRunner().invoke(archive_orders_command, ["--max-batches", "2"])
+
+    assert result.exit_code == 0
+    assert "Pedidos archivados: 4" in result.output
+    mock_archive.assert_called_once_with(2)
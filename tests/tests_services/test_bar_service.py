@@ -1,75 +1,77 @@
 import pytest
-from datetime import datetime
 
-from src.services.bar_service import check_manual_closure, check_schedule_bar
 from src.models.setting_model import SettingModel
+from src.services.bar_service import (
+    check_manual_closure,
+    check_schedule_bar,
+    get_bar_status,
+    reopen_manual_closure,
+)
+from src.services.opening_hours_service import BarState
+
+OPEN_STATE = BarState(True, False, 1746885600.0, 1746885600.0, "Europe/Madrid")
+MANUALLY_CLOSED_STATE = OPEN_STATE._replace(manually_closed=True)
+MANUAL_CLOSURE = {"value": True, "updated_at": "2025-05-10T15:00:00"}
+
+
+@pytest.fixture
+def mock_get_state(mocker):
+    return mocker.patch(
+        "src.services.bar_service.opening_hours.get_state", return_value=OPEN_STATE
+    )
+
+
+@pytest.fixture
+def mock_update(mocker):
+    return mocker.patch.object(SettingModel, "update_setting_value_by_name")
 
 
 @pytest.mark.parametrize(
-    "mocked_datetime, expected_result",
-    [
-        (datetime(2025, 5, 10, 13, 30), True),
-        (datetime(2025, 5, 10, 16, 30), False),
-        (datetime(2025, 5, 10, 21, 0), True),
-        (datetime(2025, 5, 11, 1, 0), False),
-        (datetime(2025, 5, 12, 14, 0), False),
-    ],
+    "state, schedule_open, not_manually_closed",
+    [(OPEN_STATE, True, True), (MANUALLY_CLOSED_STATE, True, False)],
 )
-def test_check_schedule_bar(mocker, mocked_datetime, expected_result):
-    mocker.patch("src.services.bar_service.datetime", autospec=True)
-    mocker_datetime = mocker.MagicMock()
-    mocker_datetime.now.return_value = mocked_datetime
-    mocker_datetime.time.return_value = mocked_datetime.time()
-    mocker_datetime.strftime.return_value = mocked_datetime.strftime("%A").lower()
-    mocker.patch("src.services.bar_service.datetime", mocker_datetime)
+def test_check_bar(mock_get_state, state, schedule_open, not_manually_closed):
+    mock_get_state.return_value = state
+
+    assert check_schedule_bar() is schedule_open
+    assert check_manual_closure() is not_manually_closed
+
+
+def test_get_bar_status(mock_get_state):
+    mock_get_state.return_value = MANUALLY_CLOSED_STATE
 
-    result = check_schedule_bar()
+    status = get_bar_status()
 
-    assert result == expected_result
+    assert status == {
+        "open": False,
+        "manual_closure": True,
+        "next_change": "2025-05-10T16:00:00+02:00",
+        "timezone": "Europe/Madrid",
+    }
 
 
 @pytest.mark.parametrize(
-    "closing_time, mocked_datetime, manual_closure_value, expected_result",
+    "manual_closure, state, expected_result",
     [
-        (
-            datetime(2025, 5, 9, 23, 30),
-            datetime(2025, 5, 10, 13, 30),
-            True,
-            True,
-        ),
-        (datetime(2025, 5, 10, 15, 0), datetime(2025, 5, 10, 15, 30), True, False),
-        (
-            datetime(2025, 5, 10, 15, 0),
-            datetime(2025, 5, 10, 21, 0),
-            True,
-            True,
-        ),
-        (datetime(2025, 5, 11, 23, 0), datetime(2025, 5, 11, 23, 30), True, False),
-        (datetime(2025, 5, 11, 23, 0), datetime(2025, 5, 12, 14, 0), False, True),
+        (MANUAL_CLOSURE, OPEN_STATE, True),
+        (MANUAL_CLOSURE, MANUALLY_CLOSED_STATE, False),
+        ({**MANUAL_CLOSURE, "value": False}, OPEN_STATE, False),
     ],
 )
-def test_check_manual_closure(
-    mocker, closing_time, mocked_datetime, manual_closure_value, expected_result
+def test_reopen_manual_closure(
+    mocker, mock_get_state, mock_update, manual_closure, state, expected_result
 ):
-    mock_get = mocker.patch.object(
-        SettingModel,
-        "get_setting_by_name",
-        return_value={
-            "value": manual_closure_value,
-            "updated_at": closing_time.isoformat(),
-            "_id": "some_id",
-        },
+    mocker.patch.object(
+        SettingModel, "get_setting_by_name", return_value=manual_closure
     )
+    mock_get_state.return_value = state
+    mock_update.return_value.modified_count = 1
 
-    mock_update = mocker.patch.object(SettingModel, "update_setting")
-
-    mocker.patch("src.services.bar_service.datetime", wraps=datetime)
-    mocker.patch("src.services.bar_service.datetime.now", return_value=mocked_datetime)
-
-    result = check_manual_closure()
-
-    assert result == expected_result
-    mock_get.assert_called_once()
+    result = reopen_manual_closure()
 
-    if expected_result and manual_closure_value:
-        mock_update.assert_called_once()
+    assert result is expected_result
+    if expected_result:
+        name, value, expected = mock_update.call_args.args
+        assert (name, value, expected["value"]) == ("manual_closure", False, True)
+    else:
+        mock_update.assert_not_called()
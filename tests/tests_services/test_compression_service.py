@@ -0,0 +1,73 @@
+import gzip
+import json
+
+import pytest
+from flask import jsonify
+
+from tests.test_helpers import app
+from src.services import compression_service
+from src.services.compression_service import compress_response
+
+LARGE_BODY = [
+    {"name": f"Plato {i}", "ingredients": ["tomate", "cebolla"]} for i in range(100)
+]
+
+
+@pytest.fixture(autouse=True)
+def reset_compression(mocker):
+    mocker.patch.object(compression_service, "brotli", None)
+    compression_service._compressed_bodies.clear()
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, body, expected_encoding",
+    [
+        ("gzip", LARGE_BODY, "gzip"),
+        ("gzip;q=0", LARGE_BODY, None),
+        (None, LARGE_BODY, None),
+        ("gzip", {"msg": "corto"}, None),
+    ],
+)
+def test_compress_response(app, accept_encoding, body, expected_encoding):
+    headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+
+    with app.test_request_context("/orders/", headers=headers):
+        response = compress_response(jsonify(body))
+
+    assert response.headers.get("Content-Encoding") == expected_encoding
+    assert "Accept-Encoding" in response.headers["Vary"]
+    data = response.get_data()
+    if expected_encoding:
+        data = gzip.decompress(data)
+    assert json.loads(data) == body
+
+
+def test_compress_response_error_not_compressed(app):
+    with app.test_request_context("/orders/", headers={"Accept-Encoding": "gzip"}):
+        response = jsonify(LARGE_BODY)
+        response.status_code = 400
+        response = compress_response(response)
+
+    assert "Content-Encoding" not in response.headers
+
+
+def test_compress_response_cacheable_compressed_once(mocker, app):
+    mock_compress = mocker.spy(compression_service, "compress")
+
+    for _ in range(3):
+        with app.test_request_context("/dishes/", headers={"Accept-Encoding": "gzip"}):
+            response = compress_response(jsonify(LARGE_BODY))
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert mock_compress.call_count == 1
+    assert compression_service.get_compression_metrics()["cached_bodies"] == 1
+
+
+def test_compress_response_not_cacheable_compressed_each_time(mocker, app):
+    mock_compress = mocker.spy(compression_service, "compress")
+
+    for _ in range(2):
+        with app.test_request_context("/orders/", headers={"Accept-Encoding": "gzip"}):
+            compress_response(jsonify(LARGE_BODY))
+
+    assert mock_compress.call_count == 2
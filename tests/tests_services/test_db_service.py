@@ -1,9 +1,10 @@
 import pytest
-from pymongo.errors import ConnectionFailure
+from pymongo.errors import ConnectionFailure, PyMongoError
 from pymongo.database import Database
 from flask import Response
 
-from src.services.db_service import db_connection
+from src.services.db_service import db_connection, run_in_transaction
+from src.services.metrics_service import get_metrics, reset_metrics
 from tests.test_helpers import app
 
 
@@ -32,3 +33,78 @@ def test_db_connection_error(mocker, app):
         assert status_code == 500
         assert result.json["err"] == "db_connection"
         mock_client.__getitem__.assert_called_once()
+
+
+@pytest.fixture
+def mock_session(mocker):
+    mock_client = mocker.patch("src.services.db_service.client")
+    mocker.patch("src.services.db_service.time.sleep")
+    return mock_client.start_session.return_value.__enter__.return_value
+
+
+def labeled_error(label):
+    return PyMongoError("error", error_labels=[label])
+
+
+def test_run_in_transaction_success(mock_session):
+    reset_metrics()
+
+    result = run_in_transaction(lambda session: session is mock_session)
+
+    assert result is True
+    mock_session.start_transaction.assert_called_once()
+    mock_session.commit_transaction.assert_called_once()
+    assert get_metrics()["counters"]["transactions.committed"] == 1
+
+
+def test_run_in_transaction_retries_transient_error(mocker, mock_session):
+    reset_metrics()
+    operations = mocker.MagicMock(
+        side_effect=[labeled_error("TransientTransactionError"), "ok"]
+    )
+
+    result = run_in_transaction(operations)
+
+    assert result == "ok"
+    assert operations.call_count == 2
+    mock_session.abort_transaction.assert_called_once()
+    counters = get_metrics()["counters"]
+    assert counters["transactions.retries"] == 1
+    assert counters["transactions.aborted"] == 1
+
+
+def test_run_in_transaction_retries_unknown_commit_result(mocker, mock_session):
+    reset_metrics()
+    mock_session.commit_transaction.side_effect = [
+        labeled_error("UnknownTransactionCommitResult"),
+        None,
+    ]
+    operations = mocker.MagicMock(return_value="ok")
+
+    assert run_in_transaction(operations) == "ok"
+    operations.assert_called_once()
+    assert mock_session.commit_transaction.call_count == 2
+    assert get_metrics()["counters"]["transactions.commit_retries"] == 1
+
+
+def test_run_in_transaction_gives_up_after_max_attempts(mocker, mock_session):
+    operations = mocker.MagicMock(
+        side_effect=labeled_error("TransientTransactionError")
+    )
+
+    with pytest.raises(PyMongoError):
+        run_in_transaction(operations, max_attempts=3)
+
+    assert operations.call_count == 3
+    assert mock_session.abort_transaction.call_count == 3
+
+
+def test_run_in_transaction_does_not_retry_other_errors(mocker, mock_session):
+    operations = mocker.MagicMock(side_effect=ValueError("error"))
+
+    with pytest.raises(ValueError):
+        run_in_transaction(operations)
+
+    operations.assert_called_once()
+    mock_session.abort_transaction.assert_called_once()
+    mock_session.commit_transaction.assert_not_called()
@@ -0,0 +1,54 @@
+import pytest
+from email_validator import EmailUndeliverableError
+
+from src.services.email_deliverability_service import DeliverabilityCache
+
+
+@pytest.fixture
+def mock_validate_deliverability(mocker):
+    return mocker.patch(
+        "src.services.email_deliverability_service.validate_email_deliverability",
+        return_value={"mx": [(10, "mx.example.com")]},
+    )
+
+
+def test_check_caches_deliverable_domain(mock_validate_deliverability):
+    deliverability_cache = DeliverabilityCache(mode="dns")
+
+    deliverability_cache.check("example.com", "example.com")
+    deliverability_cache.check("example.com", "example.com")
+
+    mock_validate_deliverability.assert_called_once_with(
+        "example.com", "example.com", timeout=deliverability_cache.timeout
+    )
+
+
+def test_check_caches_undeliverable_domain(mock_validate_deliverability):
+    mock_validate_deliverability.side_effect = EmailUndeliverableError(
+        "The domain name example.invalid does not exist."
+    )
+    deliverability_cache = DeliverabilityCache(mode="dns")
+
+    for _ in range(2):
+        with pytest.raises(EmailUndeliverableError, match="does not exist"):
+            deliverability_cache.check("example.invalid", "example.invalid")
+
+    mock_validate_deliverability.assert_called_once()
+
+
+def test_check_unknown_deliverability_not_cached(mock_validate_deliverability):
+    mock_validate_deliverability.return_value = {"unknown-deliverability": "timeout"}
+    deliverability_cache = DeliverabilityCache(mode="dns")
+
+    deliverability_cache.check("example.com", "example.com")
+    deliverability_cache.check("example.com", "example.com")
+
+    assert mock_validate_deliverability.call_count == 2
+
+
+def test_check_offline_mode(mock_validate_deliverability):
+    deliverability_cache = DeliverabilityCache(mode="offline")
+
+    deliverability_cache.check("example.com", "example.com")
+
+    mock_validate_deliverability.assert_not_called()
@@ -0,0 +1,58 @@
+from click.testing import CliRunner
+from pymongo.errors import OperationFailure
+
+from src.services.index_service import (
+    INDEX_REGISTRY,
+    ensure_indexes,
+    ensure_indexes_command,
+)
+
+
+def test_index_registry_declares_unique_and_ttl_indexes():
+    indexes = {
+        collection: {index.document["name"]: index.document for index in indexes}
+        for collection, indexes in INDEX_REGISTRY.items()
+    }
+
+    assert indexes["users"]["email_1"]["unique"] is True
+    assert indexes["dishes"]["name_1"]["unique"] is True
+    assert indexes["products"]["name_1"]["unique"] is True
+    assert indexes["settings"]["name_1"]["unique"] is True
+    assert indexes["email_tokens"]["jti_1"]["unique"] is True
+    for collection in ("users", "sessions", "email_tokens", "rate_limits"):
+        assert indexes[collection]["expires_at_1"]["expireAfterSeconds"] == 0
+
+
+def test_ensure_indexes(mocker):
+    mock_database = mocker.MagicMock()
+    mock_database.__getitem__.return_value.create_indexes.return_value = ["name_1"]
+
+    result = ensure_indexes(mock_database)
+
+    assert set(result) == set(INDEX_REGISTRY)
+    assert mock_database.__getitem__.return_value.create_indexes.call_count == len(
+        INDEX_REGISTRY
+    )
+
+
+def test_ensure_indexes_conflict(mocker):
+    mock_database = mocker.MagicMock()
+    mock_database.__getitem__.return_value.create_indexes.side_effect = (
+        OperationFailure("Index already exists with different options")
+    )
+
+    result = ensure_indexes(mock_database)
+
+    assert all("error" in indexes for indexes in result.values())
+
+
+def test_ensure_indexes_command(mocker):
+    mocker.patch(
+        "src.services.index_service.ensure_indexes",
+        return_value={"users": ["email_1"]},
+    )
+
+    result = CliRunner().invoke(ensure_indexes_command)
+
+    assert result.exit_code == 0
+    assert "users: ['email_1']" in result.output
@@ -0,0 +1,134 @@
+from datetime import datetime
+
+import pytest
+from click.testing import CliRunner
+
+from src.services.inventory_service import (
+    SNAPSHOT_LAG,
+    rebuild_stocks,
+    replay_inventory_command,
+    seed_inventory,
+    take_inventory_snapshot,
+)
+
+TOMATE, SAL, QUESO, PAN = (f"66c5e0f7d7f3a1b2c3d4e5f{index}" for index in range(4))
+SNAPSHOT = {"until": datetime(2025, 5, 1), "stocks": {TOMATE: 10, SAL: 4}}
+
+
+def get_stocks(stocks: dict) -> dict:
+    names = {TOMATE: "Tomate", SAL: "Sal", QUESO: "Queso", PAN: "Pan"}
+    return {
+        product_id: {"name": names[product_id], "stock": stock}
+        for product_id, stock in stocks.items()
+    }
+
+
+@pytest.fixture
+def mock_get_latest_snapshot(mocker):
+    return mocker.patch(
+        "src.services.inventory_service.InventorySnapshotModel.get_latest_snapshot",
+        return_value=SNAPSHOT,
+    )
+
+
+@pytest.fixture
+def mock_get_totals(mocker):
+    return mocker.patch(
+        "src.services.inventory_service.InventoryMovementModel.get_totals",
+        return_value={TOMATE: -2.5, QUESO: 3},
+    )
+
+
+def test_rebuild_stocks(mock_get_latest_snapshot, mock_get_totals):
+    assert rebuild_stocks() == {TOMATE: 7.5, SAL: 4, QUESO: 3}
+    mock_get_totals.assert_called_once_with(SNAPSHOT["until"], None)
+
+
+def test_rebuild_stocks_without_snapshot(mock_get_latest_snapshot, mock_get_totals):
+    mock_get_latest_snapshot.return_value = None
+
+    assert rebuild_stocks() == {TOMATE: -2.5, QUESO: 3}
+    mock_get_totals.assert_called_once_with(None, None)
+
+
+def test_take_inventory_snapshot(mocker, mock_get_latest_snapshot, mock_get_totals):
+    mock_insert = mocker.patch(
+        "src.services.inventory_service.InventorySnapshotModel.insert_snapshot"
+    )
+
+    take_inventory_snapshot()
+
+    until, stocks = mock_insert.call_args.args
+    assert datetime.now() - until >= SNAPSHOT_LAG
+    assert stocks[TOMATE] == 7.5
+
+
+@pytest.fixture
+def mock_get_opened_products(mocker):
+    return mocker.patch(
+        "src.services.inventory_service.InventoryMovementModel.get_opened_products",
+        return_value={TOMATE, SAL, QUESO},
+    )
+
+
+def test_seed_inventory(
+    mocker, mock_get_latest_snapshot, mock_get_totals, mock_get_opened_products
+):
+    mock_get_opened_products.return_value = {TOMATE}
+    mocker.patch(
+        "src.services.inventory_service.ProductModel.get_stocks",
+        return_value=get_stocks({TOMATE: 9, SAL: 4, QUESO: 5, PAN: 0}),
+    )
+    mock_insert = mocker.patch(
+        "src.services.inventory_service.InventoryMovementModel.insert_movements"
+    )
+
+    assert seed_inventory() == ["Sal", "Queso", "Pan"]
+    movements = mock_insert.call_args.args[0]
+    assert {movement.product_id: movement.qty for movement in movements} == {
+        SAL: 0,
+        QUESO: 2,
+        PAN: 0,
+    }
+    assert all(movement.reason == "opening" for movement in movements)
+
+
+@pytest.mark.parametrize("apply", [False, True])
+def test_replay_inventory_command(
+    mocker, mock_get_latest_snapshot, mock_get_totals, mock_get_opened_products, apply
+):
+    mocker.patch(
+        "src.services.inventory_service.ProductModel.get_stocks",
+        return_value=get_stocks({TOMATE: 9, SAL: 4, QUESO: 3}),
+    )
+    mock_set_stocks = mocker.patch(
+        "src.services.inventory_service.ProductModel.set_stocks", return_value=1
+    )
+
+    result = CliRunner().invoke(replay_inventory_command, ["--apply"] if apply else [])
+
+    assert result.exit_code == 0
+    assert "Tomate: guardado 9, registro 7.5" in result.output
+    if apply:
+        mock_set_stocks.assert_called_once_with({TOMATE: 7.5})
+    else:
+        mock_set_stocks.assert_not_called()
+
+
+def test_replay_inventory_command_skips_products_without_opening(
+    mocker, mock_get_latest_snapshot, mock_get_totals, mock_get_opened_products
+):
+    mock_get_opened_products.return_value = {QUESO}
+    mocker.patch(
+        "src.services.inventory_service.ProductModel.get_stocks",
+        return_value=get_stocks({TOMATE: 9, SAL: 4, QUESO: 5}),
+    )
+    mock_set_stocks = mocker.patch(
+        "src.services.inventory_service.ProductModel.set_stocks", return_value=1
+    )
+
+    result = CliRunner().invoke(replay_inventory_command, ["--apply"])
+
+    assert result.exit_code == 0
+    assert "Sin apertura en el registro, no se actualizan: Tomate" in result.output
+    mock_set_stocks.assert_called_once_with({QUESO: 3})
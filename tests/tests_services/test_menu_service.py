@@ -0,0 +1,121 @@
+import pytest
+
+from src.services.menu_service import MenuIndex
+from src.utils.exception_handlers import ValueCustomError
+from tests.test_helpers import app
+
+DISHES = [
+    {"_id": "1", "name": "Tarta de queso", "allergens": ["huevo", "lactosa"]},
+    {"_id": "2", "name": "Ensalada", "allergens": []},
+    {"_id": "3", "name": "Croquetas", "allergens": ["gluten", "lactosa"]},
+    {"_id": "4", "name": "Sepia", "allergens": ["moluscos"]},
+]
+
+
+@pytest.fixture
+def mock_get_menu(mocker):
+    return mocker.patch(
+        "src.services.menu_service.DishModel.get_menu", return_value=DISHES
+    )
+
+
+@pytest.fixture(autouse=True)
+def mock_get_allowed_values(mocker):
+    return mocker.patch(
+        "src.services.menu_service.get_allowed_values",
+        return_value=["gluten", "huevo", "lactosa"],
+    )
+
+
+@pytest.mark.parametrize(
+    "exclude_allergens, expected_ids",
+    [
+        (None, ["1", "2", "3", "4"]),
+        (["gluten"], ["1", "2", "4"]),
+        (["gluten", "lactosa"], ["2", "4"]),
+        (["moluscos"], ["1", "2", "3"]),
+    ],
+)
+def test_get_dishes_exclude_allergens(mock_get_menu, exclude_allergens, expected_ids):
+    menu_index = MenuIndex()
+
+    dishes = menu_index.get_dishes(exclude_allergens)
+
+    assert [dish["_id"] for dish in dishes] == expected_ids
+
+
+def test_get_dishes_exclude_unknown_allergen_error(app, mock_get_menu):
+    menu_index = MenuIndex()
+
+    with app.app_context(), pytest.raises(ValueCustomError) as error:
+        menu_index.get_dishes(["desconocido"])
+    assert error.value.error_type == "invalid_value"
+
+
+def test_get_dishes_legacy_dish_uses_ingredient_allergens(mock_get_menu):
+    mock_get_menu.return_value = [
+        *DISHES,
+        {
+            "_id": "5",
+            "name": "Pan",
+            "ingredients": [{"name": "Harina", "allergens": ["gluten"]}],
+        },
+    ]
+    menu_index = MenuIndex()
+
+    dishes = menu_index.get_dishes(["gluten"])
+
+    assert [dish["_id"] for dish in dishes] == ["1", "2", "4"]
+
+
+def test_get_dishes_by_ids(mock_get_menu):
+    menu_index = MenuIndex()
+
+    dishes = menu_index.get_dishes_by_ids(["3", "9", "1"])
+
+    assert [dish["_id"] for dish in dishes] == ["3", "1"]
+
+
+def test_menu_index_loads_once_until_invalidated(mock_get_menu):
+    menu_index = MenuIndex()
+
+    menu_index.get_dishes(["gluten"])
+    menu_index.get_dishes(["huevo"])
+    assert mock_get_menu.call_count == 1
+
+    menu_index.invalidate()
+    menu_index.get_dishes()
+    assert mock_get_menu.call_count == 2
+
+
+def test_menu_index_reloads_after_ttl(mocker, mock_get_menu):
+    mock_monotonic = mocker.patch(
+        "src.services.menu_service.time.monotonic", return_value=100.0
+    )
+    menu_index = MenuIndex(ttl=60)
+
+    menu_index.get_dishes()
+    mock_monotonic.return_value = 161.0
+    menu_index.get_dishes()
+
+    assert mock_get_menu.call_count == 2
+
+
+def test_menu_index_invalidate_during_request_keeps_loaded_state(mocker, mock_get_menu):
+    menu_index = MenuIndex()
+    ensure_loaded = menu_index._ensure_loaded
+
+    # Otra petición invalida el índice justo después de que esta lo haya cargado
+    def ensure_loaded_and_invalidate():
+        state = ensure_loaded()
+        menu_index.invalidate()
+        return state
+
+    mocker.patch.object(
+        menu_index, "_ensure_loaded", side_effect=ensure_loaded_and_invalidate
+    )
+
+    dishes = menu_index.get_dishes(["gluten"])
+
+    assert [dish["_id"] for dish in dishes] == ["1", "2", "4"]
+    assert [dish["_id"] for dish in menu_index.get_dishes_by_ids(["3"])] == ["3"]
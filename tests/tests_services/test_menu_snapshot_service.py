@@ -0,0 +1,62 @@
+import gzip
+import json
+
+import pytest
+
+from tests.test_helpers import app
+from src.services.menu_snapshot_service import (
+    send_menu_snapshot,
+    write_menu_snapshot,
+)
+
+DISHES = [
+    {"_id": "1", "name": "Tarta de queso", "allergens": ["huevo", "lactosa"]},
+    {"_id": "2", "name": "Piña colada", "allergens": []},
+]
+
+
+@pytest.fixture(autouse=True)
+def mock_get_snapshot(mocker):
+    return mocker.patch(
+        "src.services.menu_snapshot_service.menu_index.get_snapshot",
+        return_value=DISHES,
+    )
+
+
+def test_write_menu_snapshot(tmp_path):
+    write_menu_snapshot(str(tmp_path))
+
+    assert json.loads((tmp_path / "menu.json").read_bytes()) == DISHES
+    assert json.loads(gzip.decompress((tmp_path / "menu.json.gz").read_bytes())) == (
+        DISHES
+    )
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected_encoding",
+    [("gzip, deflate", "gzip"), ("gzip;q=0", None), (None, None)],
+)
+def test_send_menu_snapshot(mocker, app, tmp_path, accept_encoding, expected_encoding):
+    mocker.patch("src.services.menu_snapshot_service.brotli", None)
+    headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+
+    with app.test_request_context("/menu.json", headers=headers):
+        response = send_menu_snapshot(str(tmp_path))
+
+    assert response.status_code == 200
+    assert response.headers.get("Content-Encoding") == expected_encoding
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.get_etag() == (response.headers["ETag"].strip('"'), False)
+    response.close()
+
+
+def test_send_menu_snapshot_not_modified(app, tmp_path):
+    write_menu_snapshot(str(tmp_path))
+    with app.test_request_context("/menu.json"):
+        etag = send_menu_snapshot(str(tmp_path)).headers["ETag"]
+
+    with app.test_request_context("/menu.json", headers={"If-None-Match": etag}):
+        response = send_menu_snapshot(str(tmp_path))
+
+    assert response.status_code == 304
@@ -0,0 +1,34 @@
+import pytest
+
+from src.services.metrics_service import (
+    increment,
+    observe,
+    register_collector,
+    get_metrics,
+    reset_metrics,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    reset_metrics()
+    yield
+    reset_metrics()
+
+
+def test_increment():
+    increment("test.counter")
+    increment("test.counter", 2)
+    assert get_metrics()["counters"]["test.counter"] == 3
+
+
+def test_observe():
+    observe("test.timing", 1.0)
+    observe("test.timing", 3.0)
+    timing = get_metrics()["timings"]["test.timing"]
+    assert timing == {"count": 2, "total": 4.0, "max": 3.0, "avg": 2.0}
+
+
+def test_register_collector():
+    register_collector("test_collector", lambda: {"value": 1})
+    assert get_metrics()["test_collector"] == {"value": 1}
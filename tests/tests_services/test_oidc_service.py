@@ -0,0 +1,78 @@
+import pytest
+import requests
+
+from config import GOOGLE_METADATA_URL
+from src.services.oidc_service import GoogleOIDCCache, get_max_age
+
+METADATA = {
+    "issuer": "https://accounts.google.com",
+    "jwks_uri": "https://www.googleapis.com/oauth2/v3/certs",
+}
+JWKS = {"keys": [{"kid": "1", "kty": "RSA"}]}
+
+
+@pytest.fixture
+def client(mocker):
+    return mocker.Mock(spec=["server_metadata"], server_metadata={})
+
+
+@pytest.fixture
+def mock_requests_get(mocker):
+    def get(url, timeout):
+        response = mocker.Mock()
+        if url == GOOGLE_METADATA_URL:
+            response.json.return_value = METADATA
+            response.headers = {"Cache-Control": "public, max-age=3600"}
+        else:
+            response.json.return_value = JWKS
+            response.headers = {"Cache-Control": "public, max-age=20000"}
+        return response
+
+    return mocker.patch("src.services.oidc_service.requests.get", side_effect=get)
+
+
+@pytest.mark.parametrize(
+    "cache_control, expected",
+    [("public, max-age=21600, must-revalidate", 21600), ("no-cache", 60), (None, 60)],
+)
+def test_get_max_age(cache_control, expected):
+    assert get_max_age(cache_control, 60) == expected
+
+
+def test_refresh_loads_metadata_and_jwks(mocker, client, mock_requests_get):
+    mocker.patch("src.services.oidc_service.time.monotonic", return_value=1000)
+    oidc_cache = GoogleOIDCCache(client)
+
+    oidc_cache.refresh()
+
+    assert client.server_metadata["issuer"] == METADATA["issuer"]
+    assert client.server_metadata["jwks"] == JWKS
+    assert "_loaded_at" in client.server_metadata
+    assert oidc_cache.expires_at == 1000 + 3600
+    assert mock_requests_get.call_count == 2
+
+
+def test_refresh_error_keeps_previous_keys(mocker, client):
+    client.server_metadata.update({**METADATA, "jwks": JWKS})
+    mocker.patch(
+        "src.services.oidc_service.requests.get",
+        side_effect=requests.ConnectionError(),
+    )
+    oidc_cache = GoogleOIDCCache(client)
+
+    with pytest.raises(requests.ConnectionError):
+        oidc_cache.refresh()
+
+    assert client.server_metadata["jwks"] == JWKS
+
+
+def test_start_runs_single_thread(mocker, client):
+    mock_thread = mocker.patch("src.services.oidc_service.Thread")
+    mock_thread.return_value.is_alive.return_value = True
+    oidc_cache = GoogleOIDCCache(client)
+
+    oidc_cache.start()
+    oidc_cache.start()
+
+    mock_thread.assert_called_once()
+    mock_thread.return_value.start.assert_called_once()
@@ -0,0 +1,147 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.services.opening_hours_service import (
+    DEFAULT_OPENING_HOURS,
+    OpeningHoursEngine,
+    get_open_intervals,
+)
+
+MADRID = ZoneInfo("Europe/Madrid")
+OPENING_HOURS = {
+    "timezone": "Europe/Madrid",
+    "week": {
+        "saturday": [{"open": "13:00", "close": "16:00"}],
+        "sunday": [{"open": "20:00", "close": "02:00"}],
+    },
+    "holidays": ["2025-05-17"],
+    "special_days": [
+        {
+            "date": "2025-05-14",
+            "name": "Fiesta",
+            "intervals": [{"open": "18:00", "close": "23:00"}],
+        }
+    ],
+}
+
+
+def timestamp(*args) -> float:
+    return datetime(*args, tzinfo=MADRID).timestamp()
+
+
+@pytest.fixture
+def loader(mocker):
+    return mocker.Mock(return_value={})
+
+
+def test_get_open_intervals():
+    intervals = get_open_intervals(OPENING_HOURS, date(2025, 5, 10), 8)
+
+    assert intervals == [
+        (timestamp(2025, 5, 10, 13), timestamp(2025, 5, 10, 16)),
+        (timestamp(2025, 5, 11, 20), timestamp(2025, 5, 12, 2)),
+        (timestamp(2025, 5, 14, 18), timestamp(2025, 5, 14, 23)),
+    ]
+
+
+def test_get_open_intervals_merges_overlapping():
+    opening_hours = {
+        "timezone": "Europe/Madrid",
+        "week": {
+            "monday": [
+                {"open": "12:00", "close": "16:00"},
+                {"open": "15:00", "close": "17:00"},
+            ]
+        },
+    }
+
+    intervals = get_open_intervals(opening_hours, date(2025, 5, 12), 1)
+
+    assert intervals == [(timestamp(2025, 5, 12, 12), timestamp(2025, 5, 12, 17))]
+
+
+@pytest.mark.parametrize(
+    "now, schedule_open, next_change",
+    [
+        ((2025, 5, 10, 13, 30), True, (2025, 5, 10, 16)),
+        ((2025, 5, 10, 16, 30), False, (2025, 5, 10, 20)),
+        ((2025, 5, 10, 23, 30), True, (2025, 5, 11, 0)),
+        ((2025, 5, 11, 0, 30), False, (2025, 5, 11, 13)),
+        ((2025, 5, 12, 14, 0), False, (2025, 5, 13, 13)),
+    ],
+)
+def test_compute_default_schedule(loader, now, schedule_open, next_change):
+    engine = OpeningHoursEngine(loader)
+
+    state = engine.compute({}, timestamp(*now))
+
+    assert state.schedule_open is schedule_open
+    assert state.next_change == timestamp(*next_change)
+    assert state.timezone == DEFAULT_OPENING_HOURS["timezone"]
+
+
+def test_compute_uses_opening_hours_setting(loader):
+    engine = OpeningHoursEngine(loader)
+    settings = {"opening_hours": {"value": OPENING_HOURS}}
+
+    holiday = engine.compute(settings, timestamp(2025, 5, 17, 14))
+    special_day = engine.compute(settings, timestamp(2025, 5, 14, 19))
+
+    assert holiday.schedule_open is False
+    assert special_day.schedule_open is True
+    assert special_day.next_change == timestamp(2025, 5, 14, 23)
+
+
+@pytest.mark.parametrize(
+    "closed_at, now, manually_closed",
+    [
+        (datetime(2025, 5, 10, 15, 0), (2025, 5, 10, 15, 30), True),
+        (datetime(2025, 5, 10, 15, 0), (2025, 5, 10, 21, 0), False),
+        (datetime(2025, 5, 9, 23, 30), (2025, 5, 10, 13, 30), False),
+        (datetime(2025, 5, 11, 23, 0), (2025, 5, 12, 14, 0), True),
+    ],
+)
+def test_compute_manual_closure_lasts_until_next_opening(
+    loader, closed_at, now, manually_closed
+):
+    engine = OpeningHoursEngine(loader)
+    settings = {
+        "manual_closure": {
+            "value": True,
+            "updated_at": closed_at.replace(tzinfo=MADRID).isoformat(),
+        }
+    }
+
+    state = engine.compute(settings, timestamp(*now))
+
+    assert state.manually_closed is manually_closed
+
+
+def test_get_state_is_cached_until_next_change(loader):
+    engine = OpeningHoursEngine(loader, ttl=3600)
+
+    first = engine.get_state(timestamp(2025, 5, 10, 15, 30))
+    second = engine.get_state(timestamp(2025, 5, 10, 15, 59))
+    third = engine.get_state(timestamp(2025, 5, 10, 16, 0))
+
+    assert first is second
+    assert third.schedule_open is False
+    assert loader.call_count == 2
+
+
+def test_get_state_reloads_after_invalidate(loader):
+    engine = OpeningHoursEngine(loader)
+
+    engine.get_state(timestamp(2025, 5, 10, 15, 30))
+    engine.invalidate()
+    engine.get_state(timestamp(2025, 5, 10, 15, 30))
+
+    assert loader.call_count == 2
+
+
+def test_get_timezone(loader):
+    engine = OpeningHoursEngine(loader)
+
+    assert engine.get_timezone() == MADRID
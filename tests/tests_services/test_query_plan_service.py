@@ -0,0 +1,222 @@
+import pytest
+from datetime import datetime
+
+from bson import ObjectId
+
+from config import QUERY_PLAN_CHECK
+from src.services.query_plan_service import (
+    QueryRecorder,
+    check_query_plans,
+    get_plan_problems,
+    has_filter,
+    query_recorder,
+)
+
+IXSCAN_PLAN = {
+    "queryPlanner": {
+        "winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}
+    }
+}
+COLLSCAN_PLAN = {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}
+SORT_PLAN = {
+    "queryPlanner": {
+        "winningPlan": {
+            "queryPlan": {
+                "stage": "SORT",
+                "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}},
+            }
+        }
+    }
+}
+
+
+def test_query_recorder_records_only_when_enabled(mocker):
+    recorder = QueryRecorder()
+    event = mocker.MagicMock(
+        command_name="find",
+        database_name="test",
+        command={
+            "find": "users",
+            "filter": {"email": "a@b.c"},
+            "lsid": {},
+            "$db": "test",
+        },
+    )
+
+    recorder.started(event)
+    assert recorder.commands == []
+
+    recorder.enabled = True
+    recorder.started(event)
+    event.command_name = "insert"
+    recorder.started(event)
+
+    assert recorder.commands == [
+        ("test", {"find": "users", "filter": {"email": "a@b.c"}})
+    ]
+
+
+@pytest.mark.parametrize(
+    "command, explain, expected_problems",
+    [
+        ({"find": "users", "filter": {"email": "a@b.c"}}, IXSCAN_PLAN, []),
+        ({"find": "users", "filter": {"email": "a@b.c"}}, COLLSCAN_PLAN, ["COLLSCAN"]),
+        ({"find": "users", "filter": {}}, COLLSCAN_PLAN, []),
+        ({"find": "orders", "filter": {"user_id": "1"}}, SORT_PLAN, ["SORT"]),
+        (
+            {"delete": "users", "deletes": [{"q": {"_id": 1}, "limit": 1}]},
+            COLLSCAN_PLAN,
+            ["COLLSCAN"],
+        ),
+        (
+            {"aggregate": "orders", "pipeline": [{"$sort": {"total_price": 1}}]},
+            {"stages": [{"$cursor": COLLSCAN_PLAN}, {"$sort": {}}]},
+            ["SORT"],
+        ),
+    ],
+)
+def test_get_plan_problems(command, explain, expected_problems):
+    assert get_plan_problems(command, explain) == expected_problems
+
+
+@pytest.mark.parametrize(
+    "command, expected",
+    [
+        ({"find": "users", "filter": {"email": "a@b.c"}}, True),
+        ({"find": "users", "filter": {}}, False),
+        ({"aggregate": "orders", "pipeline": [{"$match": {"state": "ready"}}]}, True),
+        ({"aggregate": "orders", "pipeline": [{"$match": {}}, {"$limit": 1}]}, False),
+        ({"aggregate": "orders", "pipeline": [{"$group": {"_id": "$state"}}]}, False),
+        ({"update": "users", "updates": [{"q": {"_id": 1}, "u": {}}]}, True),
+        ({"update": "users", "updates": [{"q": {}, "u": {}}]}, False),
+        ({"delete": "users", "deletes": [{"q": {}, "limit": 0}]}, False),
+    ],
+)
+def test_has_filter(command, expected):
+    assert has_filter(command) is expected
+
+
+def test_check_query_plans(mocker):
+    mock_database = mocker.MagicMock()
+    mock_database.client.__getitem__.return_value.command.side_effect = [
+        IXSCAN_PLAN,
+        COLLSCAN_PLAN,
+    ]
+    commands = [
+        ("test", {"find": "users", "filter": {"email": "a@b.c"}}),
+        ("test", {"find": "dishes", "filter": {"available": True}}),
+    ]
+
+    problems = check_query_plans(mock_database, commands)
+
+    assert problems == [
+        {
+            "command": {"find": "dishes", "filter": {"available": True}},
+            "problems": ["COLLSCAN"],
+        }
+    ]
+
+
+# Modo de comprobación de planes: se ejecuta contra una base de datos real con QUERY_PLAN_CHECK=true
+@pytest.mark.skipif(not QUERY_PLAN_CHECK, reason="Requiere QUERY_PLAN_CHECK=true")
+def test_model_query_plans():
+    from src.models.dish_model import DishModel
+    from src.models.inventory_model import (
+        InventoryMovementModel,
+        InventorySnapshotModel,
+    )
+    from src.models.order_model import OrderModel
+    from src.models.product_model import ProductModel
+    from src.models.report_model import ReportModel
+    from src.models.session_model import SessionModel
+    from src.models.setting_model import SettingModel
+    from src.models.token_model import TokenModel
+    from src.models.user_model import UserModel
+    from src.services.db_service import db
+    from src.services.index_service import ensure_indexes
+    from src.utils.exception_handlers import ValueCustomError
+    from tests.test_helpers import app
+
+    object_id = str(ObjectId())
+    now = datetime.now()
+    items = [
+        {"name": "Plato", "qty": 1, "ingredients": [{"name": "tomate", "waste": 1}]}
+    ]
+    address = {"line_one": "Calle Mayor 1", "postal_code": "03001"}
+    ensure_indexes()
+    query_recorder.clear()
+    query_recorder.enabled = True
+    try:
+        DishModel.get_dishes(0, 10)
+        DishModel.get_menu()
+        DishModel.get_dishes_by_category("main")
+        DishModel.get_dish(object_id)
+        DishModel.update_dishes_availability("tomate", True)
+        DishModel.update_dishes_allergens("tomate", ["gluten"])
+        DishModel.delete_dish(object_id)
+        InventoryMovementModel.get_movements(now, now, 0, 10)
+        InventoryMovementModel.get_movements(now, now, 0, 10, object_id)
+        InventoryMovementModel.get_opened_products()
+        InventoryMovementModel.get_totals(now, now)
+        InventorySnapshotModel.get_latest_snapshot()
+        OrderModel.get_orders(0, 10)
+        OrderModel.get_orders(0, 10, archived=True)
+        OrderModel.get_orders_by_user_id(object_id, 10)
+        OrderModel.get_orders_by_user_id(object_id, 10, now)
+        OrderModel.get_orders_by_user_id(object_id, 10, now, before_id=object_id)
+        OrderModel.get_orders_by_ids([object_id])
+        OrderModel.get_order(object_id)
+        OrderModel.get_order(object_id, include_archive=True)
+        OrderModel.get_archivable_orders(now, 10)
+        OrderModel.delete_order(object_id)
+        ProductModel.get_products(0, 10)
+        ProductModel.get_products_by_ids([object_id])
+        ProductModel.get_product(object_id)
+        ProductModel.get_product_ids(["tomate"])
+        # Sin productos no se puede reservar: la consulta de ingredientes que faltan también se comprueba
+        with app.app_context(), pytest.raises(ValueCustomError):
+            ProductModel.reserve_stock(items)
+        ProductModel.release_stock(items)
+        ProductModel.commit_stock(items)
+        ProductModel.apply_stock_movements({object_id: -1})
+        ProductModel.set_stocks({object_id: 1})
+        ProductModel.delete_product(object_id)
+        ReportModel.get_reports("2025-01-01", "2025-01-31", {"orders": 1})
+        SessionModel.get_sessions(0, 10)
+        SessionModel.get_session(object_id)
+        SessionModel.update_session_access_token(object_id, object_id, now)
+        SessionModel.revoke_sessions_by_user_id(object_id)
+        SessionModel.get_revoked_sessions()
+        SessionModel.get_revoked_sessions(now)
+        SessionModel.delete_expired_sessions(now)
+        SettingModel.get_settings(0, 10)
+        SettingModel.get_setting(object_id)
+        SettingModel.get_setting_by_name("manual_closure")
+        SettingModel.get_settings_by_names(["manual_closure"])
+        SettingModel.delete_setting(object_id)
+        TokenModel.get_email_tokens(0, 10)
+        TokenModel.get_email_tokens_by_user_id(object_id)
+        TokenModel.get_email_token(object_id)
+        TokenModel.delete_email_tokens_by_user_id(object_id)
+        TokenModel.delete_expired_email_tokens(now)
+        UserModel.get_users(0, 10)
+        UserModel.get_user_profile(object_id)
+        UserModel.get_user_by_user_id(object_id)
+        UserModel.get_user_login_data_by_email("test@test.com")
+        UserModel.get_user_by_email("test@test.com")
+        UserModel.upsert_google_user("Query Plan", "query-plan@test.com")
+        UserModel.add_basket_item(object_id, {**items[0], "price": 1.0})
+        UserModel.update_basket_item_qty(object_id, object_id, 2)
+        UserModel.remove_basket_item(object_id, object_id)
+        UserModel.clear_basket(object_id)
+        UserModel.get_addresses(object_id)
+        UserModel.add_address(object_id, address)
+        UserModel.update_address(object_id, object_id, address)
+        UserModel.delete_address(object_id, object_id)
+        UserModel.delete_expired_users(now)
+        UserModel.delete_user(object_id)
+    finally:
+        query_recorder.enabled = False
+        db.users.delete_one({"email": "query-plan@test.com"})
+
+    assert check_query_plans(db, query_recorder.commands) == []
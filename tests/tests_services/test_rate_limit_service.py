@@ -0,0 +1,150 @@
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from src.services.rate_limit_service import (
+    MemoryRateLimitBackend,
+    MongoRateLimitBackend,
+    RateLimit,
+    rate_limit,
+)
+from src.utils.exception_handlers import ValueCustomError
+from tests.test_helpers import app
+
+LIMIT = RateLimit("ip", 2, 60)
+
+
+@pytest.fixture
+def mock_monotonic(mocker):
+    return mocker.patch(
+        "src.services.rate_limit_service.time.monotonic", return_value=1000.0
+    )
+
+
+@pytest.fixture
+def mock_db(mocker):
+    return mocker.patch("src.services.rate_limit_service.db")
+
+
+def test_memory_backend_rejects_when_bucket_is_empty(mock_monotonic):
+    backend = MemoryRateLimitBackend()
+
+    assert backend.consume("login:ip:1.1.1.1", LIMIT) is True
+    assert backend.consume("login:ip:1.1.1.1", LIMIT) is True
+    assert backend.consume("login:ip:1.1.1.1", LIMIT) is False
+    assert backend.consume("login:ip:2.2.2.2", LIMIT) is True
+
+
+def test_memory_backend_refills_over_time(mock_monotonic):
+    backend = MemoryRateLimitBackend()
+    backend.consume("key", LIMIT)
+    backend.consume("key", LIMIT)
+
+    mock_monotonic.return_value = 1030.0
+
+    assert backend.consume("key", LIMIT) is True
+    assert backend.consume("key", LIMIT) is False
+
+
+@pytest.mark.parametrize("allowed", [True, False])
+def test_mongo_backend_consume(mock_db, allowed):
+    mock_db.rate_limits.find_one_and_update.return_value = {
+        "_id": "key",
+        "allowed": allowed,
+    }
+
+    assert MongoRateLimitBackend().consume("key", LIMIT) is allowed
+    args, kwargs = mock_db.rate_limits.find_one_and_update.call_args
+    assert args[0] == {"_id": "key"}
+    assert kwargs["upsert"] is True
+
+
+def test_mongo_backend_retries_duplicate_key_on_first_upsert(mock_db):
+    mock_db.rate_limits.find_one_and_update.side_effect = [
+        DuplicateKeyError("E11000"),
+        {"_id": "key", "allowed": True},
+    ]
+
+    assert MongoRateLimitBackend().consume("key", LIMIT) is True
+    assert mock_db.rate_limits.find_one_and_update.call_count == 2
+
+
+def test_memory_backend_refund(mock_monotonic):
+    backend = MemoryRateLimitBackend()
+    backend.consume("key", LIMIT)
+    backend.consume("key", LIMIT)
+
+    backend.refund("key", LIMIT)
+    backend.refund("key", LIMIT)
+    backend.refund("key", LIMIT)
+
+    assert backend.consume("key", LIMIT) is True
+    assert backend.consume("key", LIMIT) is True
+    assert backend.consume("key", LIMIT) is False
+
+
+def test_mongo_backend_refund(mock_db):
+    MongoRateLimitBackend().refund("key", LIMIT)
+
+    args = mock_db.rate_limits.update_one.call_args.args
+    assert args[0] == {"_id": "key"}
+    assert args[1][0]["$set"]["tokens"]["$min"][0] == LIMIT.capacity
+
+
+@pytest.fixture
+def limited_function(mocker, app):
+    mocker.patch(
+        "src.services.rate_limit_service.get_identifier", return_value="1.1.1.1"
+    )
+    mocker.patch(
+        "src.services.rate_limit_service.rate_limit_backend",
+        new=MemoryRateLimitBackend(),
+    )
+    function = mocker.MagicMock(return_value="ok")
+    return function, rate_limit("login", RateLimit("ip", 2, 60, failures_only=True))(
+        function
+    )
+
+
+def test_rate_limit_failures_only_refunds_successes(app, limited_function):
+    function, limited = limited_function
+
+    with app.app_context():
+        for _ in range(3):
+            assert limited() == "ok"
+
+
+def test_rate_limit_failures_only_limits_concurrent_requests(app, limited_function):
+    function, limited = limited_function
+    requests = []
+
+    # Cada solicitud llega mientras la anterior sigue en curso
+    def handle_request():
+        requests.append("ok")
+        if len(requests) < 3:
+            try:
+                limited()
+            except ValueCustomError as error:
+                requests.append(error.error_type)
+        return "ok"
+
+    function.side_effect = handle_request
+
+    with app.app_context():
+        limited()
+
+    assert requests == ["ok", "ok", "rate_limited"]
+
+
+def test_rate_limit_failures_only_keeps_token_on_failure(app, limited_function):
+    function, limited = limited_function
+
+    with app.app_context():
+        function.side_effect = ValueCustomError("not_found", "usuario")
+        for _ in range(2):
+            with pytest.raises(ValueCustomError):
+                limited()
+        with pytest.raises(ValueCustomError) as error:
+            limited()
+
+    assert error.value.error_type == "rate_limited"
+    assert function.call_count == 2
@@ -0,0 +1,154 @@
+import pytest
+import time
+import uuid
+from datetime import datetime, timedelta
+from threading import Event, Thread
+
+from src.models.session_model import SessionModel
+from src.services.revocation_service import BloomFilter, RevocationFilter
+
+KEY = b"test_key"
+REVOKED_SESSION = {
+    "access_jti": "bb53e637-8627-457c-840f-6cae52a12e8b",
+    "refresh_jti": "cc53e637-8627-457c-840f-6cae52a12e8b",
+    "revoked_jtis": ["dd53e637-8627-457c-840f-6cae52a12e8b"],
+    "revoked": True,
+    "revoked_at": datetime(2030, 1, 1, 12, 0, 0),
+}
+ROTATED_SESSION = {
+    "access_jti": "ee53e637-8627-457c-840f-6cae52a12e8b",
+    "refresh_jti": "ff53e637-8627-457c-840f-6cae52a12e8b",
+    "revoked_jtis": ["aa53e637-8627-457c-840f-6cae52a12e8b"],
+    "revoked_at": datetime(2030, 1, 1, 12, 5, 0),
+}
+
+
+@pytest.fixture
+def mock_get_revoked_sessions(mocker):
+    return mocker.patch.object(SessionModel, "get_revoked_sessions", return_value=[])
+
+
+def test_bloom_filter_without_false_negatives():
+    bloom_filter = BloomFilter(1000, 0.01, KEY)
+    items = [str(uuid.uuid4()) for _ in range(1000)]
+    for item in items:
+        bloom_filter.add(item)
+    assert all(item in bloom_filter for item in items)
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom_filter = BloomFilter(1000, 0.01, KEY)
+    for _ in range(1000):
+        bloom_filter.add(str(uuid.uuid4()))
+    false_positives = sum(str(uuid.uuid4()) in bloom_filter for _ in range(10000))
+    assert false_positives / 10000 < 0.03
+    assert bloom_filter.estimated_false_positive_rate() == pytest.approx(0.01, rel=0.5)
+
+
+def test_bloom_filter_duplicated_items_are_counted_once():
+    bloom_filter = BloomFilter(100, 0.01, KEY)
+    bloom_filter.add("jti")
+    bloom_filter.add("jti")
+    assert bloom_filter.count == 1
+
+
+def test_bloom_filter_positions_depend_on_key():
+    first_filter = BloomFilter(100, 0.01, b"first_key")
+    second_filter = BloomFilter(100, 0.01, b"second_key")
+    assert list(first_filter._positions("jti")) != list(second_filter._positions("jti"))
+
+
+def test_revocation_filter_rebuild(mock_get_revoked_sessions):
+    mock_get_revoked_sessions.return_value = [REVOKED_SESSION, ROTATED_SESSION]
+    revocation_filter = RevocationFilter()
+
+    assert revocation_filter.might_be_revoked(REVOKED_SESSION["access_jti"])
+    assert revocation_filter.might_be_revoked(REVOKED_SESSION["refresh_jti"])
+    assert revocation_filter.might_be_revoked(REVOKED_SESSION["revoked_jtis"][0])
+    assert revocation_filter.might_be_revoked(ROTATED_SESSION["revoked_jtis"][0])
+    assert not revocation_filter.might_be_revoked(ROTATED_SESSION["access_jti"])
+    mock_get_revoked_sessions.assert_called_once_with(None)
+
+
+def test_revocation_filter_incremental_sync(mock_get_revoked_sessions):
+    mock_get_revoked_sessions.return_value = [REVOKED_SESSION]
+    revocation_filter = RevocationFilter(sync_seconds=0)
+    revocation_filter.sync(rebuild=True)
+    mock_get_revoked_sessions.return_value = [ROTATED_SESSION]
+
+    assert revocation_filter.might_be_revoked(ROTATED_SESSION["revoked_jtis"][0])
+    assert revocation_filter.might_be_revoked(REVOKED_SESSION["access_jti"])
+    since = mock_get_revoked_sessions.call_args_list[1].args[0]
+    assert since < REVOKED_SESSION["revoked_at"]
+    assert since > REVOKED_SESSION["revoked_at"] - timedelta(minutes=1)
+
+
+def test_revocation_filter_sync_not_due(mock_get_revoked_sessions):
+    revocation_filter = RevocationFilter(sync_seconds=3600)
+    revocation_filter.might_be_revoked("jti")
+    revocation_filter.might_be_revoked("jti")
+    mock_get_revoked_sessions.assert_called_once()
+
+
+def test_revocation_filter_concurrent_requests_sync_once(mock_get_revoked_sessions):
+    mock_get_revoked_sessions.side_effect = lambda since: time.sleep(0.05) or []
+    revocation_filter = RevocationFilter(sync_seconds=3600)
+    threads = [Thread(target=revocation_filter.sync_if_due) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    mock_get_revoked_sessions.assert_called_once()
+
+
+def test_revocation_filter_keeps_jtis_added_during_rebuild(mock_get_revoked_sessions):
+    revocation_filter = RevocationFilter()
+
+    # Una revocación de este proceso llega mientras se consulta la base de datos
+    def get_revoked_sessions(since):
+        revocation_filter.add_session(REVOKED_SESSION)
+        return [ROTATED_SESSION]
+
+    mock_get_revoked_sessions.side_effect = get_revoked_sessions
+    revocation_filter.sync(rebuild=True)
+
+    assert REVOKED_SESSION["access_jti"] in revocation_filter._filter
+    assert ROTATED_SESSION["revoked_jtis"][0] in revocation_filter._filter
+    assert revocation_filter._pending_jtis is None
+
+
+def test_revocation_filter_add_does_not_wait_for_sync(mock_get_revoked_sessions):
+    added = Event()
+    waited = []
+    mock_get_revoked_sessions.side_effect = (
+        lambda since: waited.append(added.wait(1)) or []
+    )
+    revocation_filter = RevocationFilter()
+    thread = Thread(target=revocation_filter.sync, kwargs={"rebuild": True})
+    thread.start()
+
+    revocation_filter.add_jti("jti")
+    added.set()
+    thread.join()
+
+    assert waited == [True]
+    assert "jti" in revocation_filter._filter
+
+
+def test_revocation_filter_metrics(mock_get_revoked_sessions):
+    revocation_filter = RevocationFilter()
+    revocation_filter.add_jti("jti")
+    revocation_filter.sync(rebuild=True)
+    revocation_filter.add_jti("jti")
+    revocation_filter.might_be_revoked("jti")
+    revocation_filter.might_be_revoked("other_jti")
+    revocation_filter.record_false_positive()
+    metrics = revocation_filter.get_metrics()
+
+    assert metrics["checks"] == 2
+    assert metrics["filter_hits"] == 1
+    assert metrics["false_positives"] == 1
+    assert metrics["observed_false_positive_rate"] == 0.5
+    assert metrics["items"] == 1
+    assert 0 < metrics["estimated_false_positive_rate"] < 0.001
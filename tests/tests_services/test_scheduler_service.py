@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+
+import pytest
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from src.services.scheduler_service import (
+    Job,
+    OWNER,
+    Scheduler,
+    acquire_lease,
+    release_lease,
+    seed_leases,
+)
+
+NOW = datetime(2025, 5, 10, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def mock_db(mocker):
+    return mocker.patch("src.services.scheduler_service.db")
+
+
+@pytest.fixture
+def function(mocker):
+    return mocker.Mock()
+
+
+@pytest.fixture
+def mock_seed_leases(mocker):
+    return mocker.patch("src.services.scheduler_service.seed_leases")
+
+
+def test_seed_leases_only_for_leader_jobs(mock_db, function):
+    mock_db.leases.update_one.side_effect = [None, DuplicateKeyError("dup")]
+
+    seed_leases(
+        [
+            Job("job", 60, function),
+            Job("warm", 300, function, leader_only=False),
+            Job("other_job", 60, function),
+        ],
+        NOW,
+    )
+
+    calls = mock_db.leases.update_one.call_args_list
+    assert [call.args[0] for call in calls] == [{"_id": "job"}, {"_id": "other_job"}]
+    assert calls[0].args[1] == {
+        "$setOnInsert": {"next_run_at": NOW, "locked_until": NOW}
+    }
+    assert calls[0].kwargs["upsert"] is True
+
+
+def test_acquire_lease_success(mock_db, function):
+    mock_db.leases.find_one_and_update.return_value = {"_id": "job", "owner": OWNER}
+
+    assert acquire_lease(Job("job", 60, function), NOW) is True
+    args, kwargs = mock_db.leases.find_one_and_update.call_args
+    query, update = args
+    assert query == {
+        "_id": "job",
+        "next_run_at": {"$lte": NOW},
+        "locked_until": {"$lte": NOW},
+    }
+    assert update["$set"]["owner"] == OWNER
+    assert "upsert" not in kwargs
+
+
+def test_acquire_lease_not_due_or_held_by_other_process(mock_db, function):
+    mock_db.leases.find_one_and_update.return_value = None
+
+    assert acquire_lease(Job("job", 60, function), NOW) is False
+
+
+def test_release_lease_schedules_next_run(mock_db, function):
+    release_lease(Job("job", 60, function), NOW)
+
+    query, update = mock_db.leases.update_one.call_args.args
+    assert query == {"_id": "job", "owner": OWNER}
+    assert (update["$set"]["next_run_at"] - NOW).total_seconds() == 60
+
+
+def test_tick_runs_leader_job_only_with_lease(mocker, function, mock_seed_leases):
+    mock_acquire = mocker.patch(
+        "src.services.scheduler_service.acquire_lease", side_effect=[True, False]
+    )
+    mock_release = mocker.patch("src.services.scheduler_service.release_lease")
+    scheduler = Scheduler([Job("job", 60, function)])
+
+    scheduler.tick()
+    scheduler.tick()
+
+    function.assert_called_once()
+    assert mock_acquire.call_count == 2
+    mock_release.assert_called_once()
+    assert "job" in scheduler.last_runs
+
+
+def test_tick_runs_local_job_once_per_interval(mocker, function, mock_seed_leases):
+    mock_acquire = mocker.patch("src.services.scheduler_service.acquire_lease")
+    scheduler = Scheduler([Job("warm", 300, function, leader_only=False)])
+
+    scheduler.tick()
+    scheduler.tick()
+
+    function.assert_called_once()
+    mock_acquire.assert_not_called()
+
+
+def test_tick_counts_job_errors(mocker, function, mock_seed_leases):
+    mocker.patch("src.services.scheduler_service.acquire_lease", return_value=True)
+    mock_release = mocker.patch("src.services.scheduler_service.release_lease")
+    mock_increment = mocker.patch("src.services.scheduler_service.increment")
+    function.side_effect = ValueError("error")
+    scheduler = Scheduler([Job("job", 60, function)])
+
+    scheduler.tick()
+
+    mock_increment.assert_called_once_with("scheduler.job.errors")
+    mock_release.assert_called_once()
+
+
+def test_tick_survives_database_errors(mocker, function, mock_seed_leases):
+    mocker.patch(
+        "src.services.scheduler_service.acquire_lease", side_effect=PyMongoError()
+    )
+    scheduler = Scheduler([Job("job", 60, function)])
+
+    scheduler.tick()
+
+    function.assert_not_called()
+
+
+def test_tick_seeds_leases_once(mocker, function, mock_seed_leases):
+    mock_seed_leases.side_effect = [PyMongoError(), None]
+    mocker.patch("src.services.scheduler_service.acquire_lease", return_value=False)
+    scheduler = Scheduler([Job("job", 60, function)])
+
+    scheduler.tick()
+    scheduler.tick()
+    scheduler.tick()
+
+    assert mock_seed_leases.call_count == 2
+    function.assert_not_called()
@@ -0,0 +1,91 @@
+import pytest
+
+from src.services.search_service import (
+    CatalogSnapshot,
+    PrefixTrie,
+    SearchIndex,
+    normalize,
+)
+
+CATALOG = [
+    {"_id": "1", "name": "Jamón ibérico"},
+    {"_id": "2", "name": "Croquetas de jamón"},
+    {"_id": "3", "name": "Piña colada"},
+    {"_id": "4", "name": "Tarta de queso"},
+    {"_id": "5", "name": "Pan"},
+]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Jamón Ibérico", "jamon iberico"),
+        ("CAFÉ", "cafe"),
+        ("Pingüino", "pinguino"),
+        ("Piña", "piña"),
+    ],
+)
+def test_normalize(text, expected):
+    assert normalize(text) == expected
+
+
+def test_prefix_trie_search():
+    trie = PrefixTrie()
+    trie.insert("jamon", 0)
+    trie.insert("jarra", 1)
+
+    assert trie.search("ja") == {0, 1}
+    assert trie.search("jam") == {0}
+    assert trie.search("jo") == set()
+
+
+@pytest.mark.parametrize(
+    "query, expected_ids",
+    [
+        ("jamon", ["1", "2"]),
+        ("JAMÓN", ["1", "2"]),
+        ("croq jam", ["2"]),
+        ("pa", ["5"]),
+        ("piña", ["3"]),
+        ("pina", []),
+        ("de", ["2", "4"]),
+        ("", []),
+        ("inexistente", []),
+    ],
+)
+def test_search_index_search(query, expected_ids):
+    search_index = SearchIndex("test", lambda: CATALOG)
+
+    results = search_index.search(query)
+
+    assert [result["_id"] for result in results] == expected_ids
+
+
+def test_search_index_limit():
+    search_index = SearchIndex("test", lambda: CATALOG)
+
+    results = search_index.search("jamon", 1)
+
+    assert results == [{"_id": "1", "name": "Jamón ibérico"}]
+
+
+def test_search_index_rebuilds_on_new_snapshot():
+    snapshots = [CATALOG, [{"_id": "6", "name": "Jamón york"}]]
+    search_index = SearchIndex("test", lambda: snapshots[0])
+
+    assert len(search_index.search("jamon")) == 2
+    snapshots.pop(0)
+    assert search_index.search("jamon") == [{"_id": "6", "name": "Jamón york"}]
+
+
+def test_catalog_snapshot_loads_once_until_invalidated(mocker):
+    loader = mocker.Mock(return_value=CATALOG)
+    catalog = CatalogSnapshot(loader)
+
+    catalog.get_snapshot()
+    catalog.get_snapshot()
+    assert loader.call_count == 1
+
+    catalog.invalidate()
+    catalog.get_snapshot()
+    assert loader.call_count == 2
@@ -1,8 +1,19 @@
 import pytest
 from datetime import datetime
+from typing import get_args
 from bson import ObjectId
 
-from src.utils.models_helpers import to_json_serializable
+from tests.test_helpers import app
+from src.utils.exception_handlers import ValueCustomError
+from src.utils.models_helpers import (
+    Address,
+    POSTAL_CODE_ZONES,
+    get_delivery_zone,
+    get_batch_ids,
+    get_fields_projection,
+    sort_by_ids,
+    to_json_serializable,
+)
 
 
 def test_to_json_serializable_datetime():
@@ -13,3 +24,59 @@ def test_to_json_serializable_datetime():
 def test_to_json_serializable_objectid():
     obj_id = ObjectId("507f1f77bcf86cd799439011")
     assert to_json_serializable(obj_id) == "507f1f77bcf86cd799439011"
+
+
+def test_postal_code_zones_cover_every_allowed_postal_code():
+    assert set(POSTAL_CODE_ZONES) == set(
+        get_args(Address.__annotations__["postal_code"])
+    )
+    assert get_delivery_zone("03001") == "centro"
+    assert get_delivery_zone("28001") is None
+
+
+@pytest.mark.parametrize(
+    "fields, expected_projection",
+    [
+        (None, {"name": 1}),
+        ("", {"name": 1}),
+        ("name,price", {"name": 1, "price": 1}),
+        (" name , price ,", {"name": 1, "price": 1}),
+    ],
+)
+def test_get_fields_projection(fields, expected_projection):
+    projection = get_fields_projection(fields, {"name", "price"}, {"name": 1})
+    assert projection == expected_projection
+
+
+@pytest.mark.parametrize("fields", ["password", "name,password", ","])
+def test_get_fields_projection_error(app, fields):
+    with app.app_context(), pytest.raises(ValueCustomError) as e:
+        get_fields_projection(fields, {"name", "price"})
+    assert e.value.error_type == "invalid_value"
+
+
+ID_1 = "507f1f77bcf86cd799439011"
+ID_2 = "507f1f77bcf86cd799439012"
+
+
+def test_get_batch_ids():
+    assert get_batch_ids(f"{ID_2}, {ID_1},{ID_2}") == [ID_2, ID_1]
+
+
+@pytest.mark.parametrize(
+    "ids", [",", "no-es-un-id", ",".join([ID_1[:-3] + f"{i:03d}" for i in range(101)])]
+)
+def test_get_batch_ids_error(app, ids):
+    with app.app_context(), pytest.raises(ValueCustomError) as e:
+        get_batch_ids(ids)
+    assert e.value.error_type == "invalid_value"
+
+
+def test_sort_by_ids():
+    documents = [{"_id": ID_1, "name": "uno"}, {"_id": ID_2, "name": "dos"}]
+    missing_id = "507f1f77bcf86cd799439013"
+
+    found, missing = sort_by_ids(documents, [ID_2, missing_id, ID_1])
+
+    assert found == [documents[1], documents[0]]
+    assert missing == [missing_id]